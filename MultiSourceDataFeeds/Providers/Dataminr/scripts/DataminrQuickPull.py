@@ -36,11 +36,11 @@ Accumulated_Alerts = dict()
 # MAIN SCRIPT
 #..........................................................................
 
-# Get Token value
+# Get Token value (cached between runs and shared by every list)
 credentials = get_authentication()
 client_id = credentials['client_id']
 client_secret = credentials['client_secret']
-token = get_dataminr_token(client_id, client_secret)
+client = get_dataminr_client(client_id, client_secret)
 
 if query_type == 'List':
     # Run the following if the query type is set to List
@@ -53,18 +53,15 @@ if query_type == 'List':
     for list_name, list_id in list_items.items():
         arcpy.AddMessage("List Name - {} | List ID {}".format(list_name, list_id))
 
-    # Loop through each list and append alerts
-    for list_name, list_id in list_items.items():
-        alert_dict = call_dataminr(token, client_id, client_secret, '', list_id, list_name, '')
-        Accumulated_Alerts.update(alert_dict)
+    # Pull every list in parallel and append alerts
+    Accumulated_Alerts.update(pull_dataminr(client, [(list_id, list_name, '') for list_name, list_id in list_items.items()], ''))
 else:
     if keyword_query == '':
         arcpy.AddError("Please enter a Keyword phrase to query.")
         sys.exit()
 
     arcpy.AddMessage("Keyword Query: {}\n\n".format(keyword_query))
-    alert_dict = call_dataminr(token, client_id, client_secret, '', '', '', keyword_query)
-    Accumulated_Alerts.update(alert_dict)
+    Accumulated_Alerts.update(pull_dataminr(client, [('', '', keyword_query)], ''))
 
 # Check if any results were returned.
 if not Accumulated_Alerts:
@@ -81,8 +81,11 @@ arcpy.AddMessage("Appending results to the hosted feature layer, {}".format(
     web_gold_service.title))
 add_features = sdf[sdf[Alert_Field_Name].isin(new_alertIDs)]
 if len(new_alertIDs) > 0:
-    res = web_gold_lyr.edit_features(
-        adds=add_features.spatial.to_featureset())['addResults']
+    # Add the new alerts in batches of 500
+    for i in range(0, len(add_features), 500):
+        res = web_gold_lyr.edit_features(
+            adds=add_features.iloc[i:i + 500].spatial.to_featureset())['addResults']
+        arcpy.AddMessage("Added {} of {} alerts".format(len([r for r in res if r['success']]), len(res)))
 else:
     arcpy.AddMessage('No new results to add')
 
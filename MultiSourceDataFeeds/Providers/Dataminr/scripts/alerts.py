@@ -0,0 +1,100 @@
+import threading
+
+
+class AlertStore(object):
+    '''
+    Alerts of a pull keyed by alertId, shared by every list and keyword pull of a run.
+
+    Each alert is parsed once with `parse` (extract_dataminr_content). An alert returned again, by another
+    list or an overlapping time window, is not parsed again; only the list it matched is added to its
+    membership. Membership is recorded the way extract_dataminr_content fills list_id and list_name: the
+    first watchlist the alert matched, or else the list that was pulled. Keyword queries are never recorded
+    as lists. to_dict() returns the parsed alerts with list_id and list_name holding every membership,
+    joined with '; ', the list the alert was first parsed from leading.
+    '''
+
+    def __init__(self, parse):
+        self.parse = parse
+        self.alerts = dict()
+        self.members = dict()
+        self.lock = threading.Lock()
+        self.stats = {'received': 0, 'parsed': 0, 'duplicates': 0}
+
+    @staticmethod
+    def membership(alertObj, list_id='', list_name=''):
+        '''
+        Return the (list id, list name) extract_dataminr_content records for an alert, the id as text.
+        '''
+        try:
+            matched_id = alertObj['watchlistsMatchedByType'][0]['id']
+        except (KeyError, IndexError, TypeError):
+            matched_id = list_id
+        try:
+            matched_name = alertObj['watchlistsMatchedByType'][0]['name']
+        except (KeyError, IndexError, TypeError):
+            matched_name = list_name
+        return ('' if matched_id is None else str(matched_id)), matched_name
+
+    def add(self, events_list, list_id='', list_name=''):
+        '''
+        Add the alerts of one response. Returns the number of alerts that were new to the store.
+        '''
+        with self.lock:
+            new = list()
+            claimed = list()
+            for alertObj in events_list:
+                rec_id = alertObj['alertId']
+                member_id, member_name = self.membership(alertObj, list_id, list_name)
+                members = self.members.setdefault(rec_id, dict())
+                if member_id and member_id not in members:
+                    members[member_id] = member_name
+                    claimed.append((rec_id, member_id))
+                if rec_id in self.alerts:
+                    self.stats['duplicates'] += 1
+                else:
+                    self.alerts[rec_id] = None
+                    new.append(alertObj)
+            self.stats['received'] += len(events_list)
+
+        # Parsing happens outside the lock; the alerts were already claimed above.
+        try:
+            parsed = self.parse(new, list_id, list_name)
+        except Exception:
+            # Release the claims, so the alerts are parsed when another list or window returns them
+            with self.lock:
+                new_ids = set(alertObj['alertId'] for alertObj in new)
+                for rec_id in new_ids:
+                    self.alerts.pop(rec_id, None)
+                for rec_id, member_id in claimed:
+                    if rec_id in new_ids:
+                        self.members.get(rec_id, dict()).pop(member_id, None)
+            raise
+
+        with self.lock:
+            self.alerts.update(parsed)
+            self.stats['parsed'] += len(parsed)
+
+        return len(new)
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def to_dict(self):
+        '''
+        Return {alertId: attributes} with every list the alert matched.
+        '''
+        output = dict()
+        for rec_id, attributes in self.alerts.items():
+            if attributes is None:
+                continue
+            attributes = dict(attributes)
+            first = '' if attributes['list_id'] is None else str(attributes['list_id'])
+            members = self.members.get(rec_id, dict())
+            others = sorted(m for m in members if m != first)
+            if others:
+                ids = ([first] if first else []) + others
+                names = ([attributes['list_name']] if first else []) + [members[m] for m in others]
+                attributes['list_id'] = '; '.join(ids)
+                attributes['list_name'] = '; '.join(str(n) for n in names)
+            output[rec_id] = attributes
+        return output
@@ -0,0 +1,94 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+ALERT_URL = 'https://gateway.dataminr.com/alerts/2/get_alert?alertversion=14'
+
+
+class TokenBucket(object):
+    '''
+    Thread-safe token bucket. Allows bursts of up to `burst` requests and `rate` requests per second on average.
+    '''
+
+    def __init__(self, rate=3, burst=6):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DataminrClient(object):
+    '''
+    Alert requests shared by every list and keyword pull of a run.
+
+    All requests go through one pooled HTTP session and one token bucket, so the rate limit holds across
+    workers (`workers` lists or queries at a time, each requesting its windows concurrently). A 429 is retried after its Retry-After delay; without one, the token is renewed first (see
+    TokenManager.invalidate). Other responses are returned as they are.
+    '''
+
+    def __init__(self, token_manager, rate=3, burst=6, workers=4, max_retries=3):
+        self.token_manager = token_manager
+        self.limiter = TokenBucket(rate, burst)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=workers * 4))
+        self.stats = {'requests': 0, 'throttled': 0}
+        self.lock = threading.Lock()
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def retry_after(response):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, params):
+        '''
+        Request alerts and return the response object.
+        '''
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            token, payload = self.token_manager.header()
+            response = self.session.get(ALERT_URL, params=params, headers=payload, timeout=60)
+            self.count('requests')
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            self.count('throttled')
+            delay = self.retry_after(response)
+            if delay is None:
+                self.token_manager.invalidate(token)
+                delay = 2 ** attempt
+            time.sleep(delay)
+
+        return response
+
+    def request(self, start_time='', end_time='', list_id='', keyword=''):
+        '''
+        Query alerts using either a list or a keyword, optionally between a start and end time.
+        '''
+        params = {'query': keyword} if keyword else {'lists': list_id}
+        params['pagesize'] = '100'
+        if start_time and end_time:
+            params.update({'start_time': start_time, 'end_time': end_time})
+        return self.get(params)
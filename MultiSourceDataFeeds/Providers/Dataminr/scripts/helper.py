@@ -6,34 +6,38 @@ import os
 import string
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from alerts import AlertStore
+from client import DataminrClient
+from planner import WindowPlanner
+from tokens import TokenManager, request_dataminr_token
 arcpy.env.overwriteOutput = True
 
-def call_dataminr(token, client_id, client_secret, total_minutes_back='', listID='', listName='', query_term=''):
+def call_dataminr(client, total_minutes_back='', listID='', listName='', query_term='', store=None, planner=None):
     '''
     This is the main function that initiates calling the Dataminr API and processing requests.
     
-    The following three are required: token, client_id, client_secret.
+    client is required. It is a DataminrClient (see client.py) shared by every list and query of the run.
     
     total_minutes_back is an optional time based parameter.  If no time is specified, a maximum of 100 alerts can be process.  This the max threshold for alert requests.
 
     The listID/listName and query_term parameters are based on the the type of query the user selects in the GP tool.
 
     Other dependant functions called throughout are:
-    - get_dataminr_token (called when the max threshold for Requests have been made; 180)
-    - make_dataminr_request (Make a request against the Dataminr API)
-    - prep_dataminr_time_request (Prep the start/end time thresholds before making request. See function for more details)
-    - process_alerts_obj (Loop through each item from the response)
+    - DataminrClient.request (Make a rate limited request against the Dataminr API. 429s are retried and the token is renewed as needed)
+    - WindowPlanner.fetch (Split the time frame into windows sized from the learned alert density and request them concurrently. See planner.py)
+    - AlertStore.add (Parse alerts not already in the store with extract_dataminr_content and record the list they matched)
 
-    The return object is a dictionary.  The outer key is based on the alert ID and the inner key are the alert attributes.  The attributes are controlled 
+    Alerts are added to store, an AlertStore (see alerts.py) that may be shared by other pulls; a new one is created if none is passed.
+    Time frames are planned by planner, a WindowPlanner shared the same way; without one, a planner is created and saved by this call.
+    The store is returned. Its to_dict function returns a dictionary.  The outer key is based on the alert ID and the inner key are the alert attributes.  The attributes are controlled 
     by the default_dataminr_attributes function.  The values assigned to each attribute are defined by the dataminr API schema path found in the 
     extract_dataminr_content function.
     '''     
-    # Counter for API Calls
-    query_counter = 1
-
-    #Collection dictionary to store alerts for the current list
-    alerts_dict = dict()
+    #Collection store for alerts of the current list, shared with other lists when passed in
+    if store is None:
+        store = AlertStore(extract_dataminr_content)
 
     #Output message to user based on query type.
     if query_term:
@@ -44,49 +48,28 @@ def call_dataminr(token, client_id, client_secret, total_minutes_back='', listID
     # Created an additional Logic check If user decides to pull data based on a time frame.
     if total_minutes_back:
 
-        # Lookback interval logic check based on the user specified time frame.
-        if total_minutes_back > 1440:
-            lookback_interval = 1440 # Default lookback interval if more than a day. Currently set to 1 day or 1440 minutes
-        else:
-            lookback_interval = total_minutes_back # Default lookback interval if less than a day
-
         end_time = int(time.mktime(datetime.now().timetuple()) * 1000) #Set default end time parameter to current time in epoch time milliseconds.  This represents alerts triggered before this time
-        start_time = (end_time - lookback_interval * 60 * 1000) # Set default start time parameter in epoch time. This represents alerts triggered after this time
         end_time_frame = (end_time - total_minutes_back * 60 * 1000) # Set end time frame based on the number of minutes the user specified to look back to.
-        arcpy.AddMessage('Start time: {}  |  End Time: {}'.format(start_time, end_time))
-
-        while end_time > end_time_frame:
-            # Check if we reached maximum query calls with out token
-            if query_counter > 180:
-                token = get_dataminr_token(client_id, client_secret)
-                arcpy.AddMessage('{}Acquiring new token since we reached out call limit'.format('.....'*5))
-                query_counter = 0 # Reset counter
-            
-            # Increase counter
-            query_counter += 1
-
-            # Poll alerts for list.
-            payload = {'Authorization': 'dmauth {}'.format(token)}
-            response_object, lookback_interval, start_time, end_time = prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID, query_term)
-
-            #Check status of response object. Make sure it's ok before moving on.
-            if response_object.status_code == 200:
-                pass
-            elif response_object.status_code == 400:
-                # a return of error code 400 means that we have reached the end time frame and no alerts were captured in the last frame query.
-                break
-            elif response_object.status_code == 429:
-                arcpy.AddMessage('Exceeded rate limit, getting a new token')
-                token = get_dataminr_token(client_id, client_secret)
-                payload = {'Authorization': 'dmauth {}'.format(token)}
-                response_object, lookback_interval, start_time, end_time = prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID, query_term)
-            else:
-                arcpy.AddMessage('Internal Server Error: The Dataminr server experienced an error. | Code: {}.'.format(response_object.status_code))
-                break
-
-            # Convert response object to json so we process alerts.
-            EventsList = json.loads(response_object.text)
-
+        arcpy.AddMessage('Start time: {}  |  End Time: {}'.format(end_time_frame, end_time))
+
+        # The client is shared by the concurrent window requests.
+        def request_window(start_time, end_time):
+            response_object = client.request(start_time, end_time, listID, query_term)
+            if response_object.status_code != 200:
+                return response_object.status_code, []
+            return 200, json.loads(response_object.text)
+
+        # Windows are planned from the alert density learned for this list or query on earlier pulls.
+        key = 'query:{}'.format(query_term) if query_term else 'list:{}'.format(listID)
+        own_planner = planner is None
+        if own_planner:
+            planner = WindowPlanner(get_cache_path('window_density.json'))
+        windows, messages = planner.fetch(key, end_time_frame, end_time, request_window)
+
+        for message in messages:
+            arcpy.AddWarning(message)
+
+        for start_time, end_time, EventsList in windows:
             # Message to end user on the number of alerts that will be processed.
             arcpy.AddMessage("{} alerts were captured between {} and {}.".format(
                 len(EventsList),
@@ -94,38 +77,75 @@ def call_dataminr(token, client_id, client_secret, total_minutes_back='', listID
                 datetime.fromtimestamp(int(end_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p')
                 ))
 
-            alerts_dict.update(extract_dataminr_content(EventsList, listID, listName))
+            store.add(EventsList, listID, listName)
 
-            # Update time parameters for next request
-            end_time = start_time
-            start_time -= lookback_interval * 60 * 1000
-
-            # Make sure start time is not less than end time frame.
-            if start_time < end_time_frame:
-                diff = end_time_frame - start_time
-                start_time += diff
+        if own_planner:
+            planner.save()
+            add_planner_message(planner)
     else:
         # Request alerts
-        payload = {'Authorization': 'dmauth {}'.format(token)}
-        response_object = make_dataminr_request(payload, '', '', listID, query_term)
+        response_object = client.request('', '', listID, query_term)
 
         # Check status of response object. Make sure it's ok before moving on.
         if response_object.status_code == 200:
             pass
         elif response_object.status_code == 400:
             # a return of error code 400 means that we have reached the end of the time frame and no alerts were captured in the last query.
-            return alerts_dict
+            return store
         else:
             arcpy.AddError('Internal Server Error: The Dataminr server experienced an error. | Code: {}.'.format(response_object.status_code))
-            return alerts_dict
+            return store
 
         # Convert response object to json so we process alerts.
         EventsList = json.loads(response_object.text)
         arcpy.AddMessage("{} alerts were captured.".format(len(EventsList)))
 
-        alerts_dict.update(extract_dataminr_content(EventsList, listID, listName))
+        store.add(EventsList, listID, listName)
+
+    return store
+
+
+def pull_dataminr(client, queries, total_minutes_back=''):
+    '''
+    Run call_dataminr for several lists or keyword queries in parallel workers sharing one client.
+
+    queries is a list of (listID, listName, query_term) tuples.  Every pull adds its alerts to one AlertStore, so an alert
+    matching several lists is parsed once and keeps all of them.  Time frame pulls share one WindowPlanner, whose learned
+    densities are saved once all pulls are done.  The dictionary of the store, keyed by alert ID, is returned.
+    '''
+    store = AlertStore(extract_dataminr_content)
+    planner = WindowPlanner(get_cache_path('window_density.json')) if total_minutes_back else None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(client.workers, len(queries)))) as executor:
+        futures = {executor.submit(call_dataminr, client, total_minutes_back, list_id, list_name, query_term, store, planner): list_name or query_term
+                   for list_id, list_name, query_term in queries}
+
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as ex:
+                arcpy.AddWarning('Unable to pull alerts for {}. | {}'.format(futures[future], ex))
+                continue
+            arcpy.AddMessage('Finished pulling alerts for {}. {} unique alerts so far.'.format(futures[future], len(store)))
+
+    if planner is not None:
+        planner.save()
+        add_planner_message(planner)
+
+    client.token_manager.flush()
 
-    return alerts_dict
+    arcpy.AddMessage('{} requests made ({} rate limited).'.format(client.stats['requests'], client.stats['throttled']))
+    arcpy.AddMessage('{} alerts received, {} parsed, {} duplicates skipped.'.format(
+        store.stats['received'], store.stats['parsed'], store.stats['duplicates']))
+    return store.to_dict()
+
+
+def add_planner_message(planner):
+    '''
+    Report the window requests of a WindowPlanner.
+    '''
+    arcpy.AddMessage('{} window requests made ({} saturated windows split, {} empty, {} failed).'.format(
+        planner.stats['requests'], planner.stats['saturated'], planner.stats['empty'], planner.stats['failed']))
 
 
 def convert_time_value(time_value, units):
@@ -346,6 +366,16 @@ def get_authentication():
     return credential_dict
 
 
+def get_cache_path(file_name):
+    '''
+    Return the path of a file in the user's cache folder (%LOCALAPPDATA%\\Dataminr on Windows, ~/.cache/Dataminr elsewhere),
+    creating the folder. The cached token and the learned window densities are kept there rather than next to the scripts.
+    '''
+    cache_dir = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache'), 'Dataminr')
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, file_name)
+
+
 def get_columns(input_dict):
     '''
     Retrieve the keys of the first item of the dictionary.
@@ -361,23 +391,51 @@ def get_columns(input_dict):
 
 def get_dataminr_token(client_id, client_secret):
     '''
-    Authenticate and retrieve dataminr token using client id and client secret
+    Authenticate and retrieve dataminr token using client id and client secret.
+
+    Invalid credentials, no internet, the API being down or a response without a dmaToken are
+    reported as errors and end the script. Use get_token_manager to share and cache tokens.
     '''
-    myUrl = 'https://gateway.dataminr.com/auth/2/token'
-    grant_type = 'api_key'
-    payload = {'grant_type': grant_type, 'client_id': client_id, 'client_secret': client_secret}
-    r = requests.post(myUrl, data=payload)
-    tokenDetails = json.loads(r.text)
-    #TODO: Add better error handeling to account for:
-    # - invalid credentials
-    # - no internet
-    # If dataminr site API is down
-    # If dataminr changes name of token attribute of dmaToken
-    token = tokenDetails["dmaToken"]
+    try:
+        token, expires = request_dataminr_token(client_id, client_secret)
+    except Exception as ex:
+        arcpy.AddError(str(ex))
+        sys.exit()
 
     return token
 
 
+def get_dataminr_client(client_id, client_secret):
+    '''
+    Return a DataminrClient with a cached token manager and the rate limits from the 'Dataminr API Limits'
+    section of config.ini (3 requests per second, bursts of 6 and 4 workers by default).
+    '''
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
+
+    return DataminrClient(
+        get_token_manager(client_id, client_secret),
+        rate=config.getfloat('Dataminr API Limits', 'requests_per_second', fallback=3),
+        burst=config.getint('Dataminr API Limits', 'burst', fallback=6),
+        workers=config.getint('Dataminr API Limits', 'workers', fallback=4)
+    )
+
+
+def get_token_manager(client_id, client_secret):
+    '''
+    Return a TokenManager cached in the user's cache folder (token_cache.json, see get_cache_path) holding a valid token.
+    Errors getting the first token are reported and end the script.
+    '''
+    token_manager = TokenManager(client_id, client_secret, get_cache_path('token_cache.json'))
+    try:
+        token_manager.get()
+    except Exception as ex:
+        arcpy.AddError(str(ex))
+        sys.exit()
+
+    return token_manager
+
+
 def input_check(Input_Layer):
     '''
     Check if there is a filepath from the input layers. If not, pre-pend the path. Also extract the Layer names.
@@ -403,96 +461,6 @@ def is_empty(fc):
         return False
 
 
-def make_dataminr_request(payload, start_time='', end_time='', list_id='', keyword=''):
-    '''
-    Function to query alerts using either lists or query parameters.
-
-    Start time represents alerts triggered after specified time.
-    End time represents alerts triggered before specified time.
-    '''
-    # Should look into adding this URL to the top of the script if it ever changes
-    list_url = 'https://gateway.dataminr.com/alerts/2/get_alert?alertversion=14'
-    if keyword:
-        if start_time and end_time:
-            response_obj = requests.get(list_url, params={'query': keyword, 'pagesize': '100', 'start_time': start_time, 'end_time': end_time}, headers=payload)
-        else:
-            response_obj = requests.get(list_url, params={'query': keyword, 'pagesize': '100'}, headers=payload)
-    
-    if list_id:
-        if start_time and end_time:
-            response_obj = requests.get(list_url, params={'lists': list_id, 'pagesize': '100', 'start_time': start_time, 'end_time': end_time}, headers=payload)
-        else:
-            response_obj = requests.get(list_url, params={'lists': list_id, 'pagesize': '100'}, headers=payload)
-    return response_obj
-
-
-def prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID='', keyword=''):
-    '''
-    Function to retrieve alerts from based on user input time constraints.  This function is recursive in order to dynamically adjust time frame between the start and end time parameters. 
-    This ensures we are under our max return alert size.
-    '''
-    # Request alerts
-    response_object = make_dataminr_request(payload, start_time, end_time, listID, keyword)
-    
-    # Check status of response object. Make sure it's ok before moving on.
-    # If not, modify start/end time frame and recall prep_dataminr_time_request function.
-    if response_object.status_code == 200:
-        pass
-    elif response_object.status_code == 400:
-        if start_time <= end_time_frame: # Only look back to user specified end time frame.
-            arcpy.AddMessage('No content was found from {} to {}. This is the end of the user specified time frame.'.format(
-                datetime.fromtimestamp(int(start_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p'),
-                datetime.fromtimestamp(int(end_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p')
-            ))
-            # Returned object will be error code 400 and will exit in the logic gate in the process alerts function. 
-            return response_object, lookback_interval, start_time, end_time
-        arcpy.AddMessage('No content was found from {} to {}. Skipping to next time frame and trying again'.format(
-            datetime.fromtimestamp(int(start_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p'),
-            datetime.fromtimestamp(int(end_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p')
-            ))
-        end_time = start_time
-        start_time -= lookback_interval * 60 * 1000
-        return prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID, keyword)
-    # TODO May need to account for times when the API rate limit is exceeded.  In order work around this, will need to get a new token
-    # and then recall this function. Will need to look into make the client id and client secrete global variables.
-    # elif response_content.status_code is 429:
-    #     arcpy.AddMessage('Exceeded rate limit, getting a new token')
-    #     token = get_dataminr_token(client_id, client_secret)
-    #     payload = {'Authorization': 'dmauth {}'.format(token)}
-    #     return prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID, keyword)
-    else:
-        arcpy.AddError('Internal Server Error: The Dataminr server experienced an error. | Code: {}.'.format(response_object.status_code))
-        sys.exit()
-
-    # If response was ok, check the following cases
-    json_object = json.loads(response_object.text) # Convert response to json object so we can count the number of alerts.
-
-    if 10 < len(json_object) < 100: # enough alerts.
-        return response_object, lookback_interval, start_time, end_time
-    elif len(json_object) == 100: # Too many alerts
-        if lookback_interval <= 1: # Unable to retrieve alerts when the start and end times are 1 minute or less.
-            arcpy.AddWarning("CAUTION: Reached minimum time range between start and end time parameters. Some alert's may be missing")
-            return response_object, lookback_interval, start_time, end_time
-        else:
-            lookback_interval = int(lookback_interval/2)
-        start_time = (end_time - (lookback_interval * 60 * 1000))
-        arcpy.AddMessage('Maximum Alerts returned. Cutting time interval in half. Checking new timeframe: from {} to {}.'.format(
-            datetime.fromtimestamp(int(start_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p'),
-            datetime.fromtimestamp(int(end_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p')
-            ))
-        return prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID, keyword)
-    elif len(json_object) <= 10: # Too few alerts
-        lookback_interval = int(lookback_interval * 2)
-        start_time = (end_time - (lookback_interval * 60 * 1000))
-        if start_time <= end_time_frame: # Only look back to user specified time frame.
-            return response_object, lookback_interval, start_time, end_time
-        arcpy.AddMessage('Returned too few alerts. Doubling time interval. Checking new timeframe: from {} to {}.'.format(
-            datetime.fromtimestamp(int(start_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p'),
-            datetime.fromtimestamp(int(end_time/1000)).strftime('%Y-%m-%d %I:%M:%S %p')
-            ))
-        return prep_dataminr_time_request(payload, start_time, end_time, lookback_interval, end_time_frame, listID, keyword)
-
-
 # def process_alerts_obj(response_obj, list_id='', list_name=''):
 #     '''
 #     This function will take a dataminr response object that's converted to JSON and loop through
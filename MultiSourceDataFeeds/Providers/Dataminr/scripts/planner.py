@@ -0,0 +1,145 @@
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class WindowPlanner(object):
+    '''
+    Plan and fetch the time windows of a Dataminr time range pull.
+
+    Alert density (alerts per minute) is learned per list or query from earlier responses and persisted
+    to a JSON file. A range is split into disjoint windows expected to return about target_fill of the
+    page cap, the windows are requested concurrently, and only windows that come back saturated (a full
+    page) are split in half and requested again. Splitting is iterative, so there is no recursion limit,
+    and stops at min_minutes.
+
+    One planner is shared by every list and query of a pull: the file is read once (a missing or unreadable
+    file starts empty) and written once with save() when the pull is done.
+    '''
+
+    def __init__(self, path, page_cap=100, target_fill=0.5, default_density=0.05, min_minutes=1, workers=4, smoothing=0.3):
+        self.path = path
+        self.page_cap = page_cap
+        self.target_fill = target_fill
+        self.default_density = default_density
+        self.min_ms = min_minutes * 60 * 1000
+        self.workers = workers
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        self.densities = dict()
+        self.stats = {'requests': 0, 'saturated': 0, 'empty': 0, 'failed': 0}
+
+        self.densities.update(self.read())
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                densities = json.load(f)
+        except (OSError, ValueError):
+            return dict()
+        return densities if isinstance(densities, dict) else dict()
+
+    def save(self):
+        '''
+        Write the densities, keeping keys another run saved meanwhile. The file is replaced in one step, so an
+        interrupted save never leaves it half written.
+        '''
+        with self.lock:
+            densities = self.read()
+            densities.update(self.densities)
+            temp_path = '{}.tmp'.format(self.path)
+            with open(temp_path, 'w') as f:
+                json.dump(densities, f, indent=2)
+            os.replace(temp_path, self.path)
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def density(self, key):
+        return max(self.densities.get(key, self.default_density), 1e-6)
+
+    def learn(self, key, count, start_time, end_time, saturated=False):
+        '''
+        Blend the observed alerts per minute into the density of the key. A saturated window only gives a lower
+        bound, so it can raise the density but never lower it.
+        '''
+        observed = count / max((end_time - start_time) / 60000, 1e-6)
+        with self.lock:
+            current = self.densities.get(key)
+            if current is None:
+                self.densities[key] = observed
+            elif saturated:
+                self.densities[key] = max(current, observed)
+            else:
+                self.densities[key] = (1 - self.smoothing) * current + self.smoothing * observed
+
+    def plan(self, key, start_time, end_time):
+        '''
+        Return disjoint (start, end) windows in epoch milliseconds covering the range, newest first.
+        '''
+        window_ms = max(int(self.target_fill * self.page_cap / self.density(key) * 60 * 1000), self.min_ms)
+        count = max(math.ceil((end_time - start_time) / window_ms), 1)
+        bounds = [end_time - i * window_ms for i in range(count)] + [start_time]
+        return [(max(b, start_time), a) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def fetch(self, key, start_time, end_time, request):
+        '''
+        Fetch every alert of the range. request(start, end) returns (status code, list of alerts). A 400 means the
+        window holds no alerts; any other non-200 status is reported and the window is skipped.
+
+        Returns a list of (start, end, alerts) for the windows that were fetched, newest first, and a list of
+        messages for the windows that failed or were cut short.
+        '''
+        windows = self.plan(key, start_time, end_time)
+        results = list()
+        messages = list()
+        capped = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(request, s, e): (s, e) for s, e in windows}
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    s, e = pending.pop(future)
+                    self.count('requests')
+
+                    try:
+                        status, alerts = future.result()
+                    except Exception as ex:
+                        status, alerts = str(ex), []
+
+                    if status == 400:
+                        self.count('empty')
+                        status, alerts = 200, []
+
+                    if status != 200:
+                        self.count('failed')
+                        messages.append('Request for {} to {} failed | Code: {}.'.format(s, e, status))
+                        continue
+
+                    saturated = len(alerts) >= self.page_cap
+                    self.learn(key, len(alerts), s, e, saturated)
+
+                    # Only saturated windows are requested again, as two halves
+                    if saturated and e - s > self.min_ms:
+                        self.count('saturated')
+                        middle = s + (e - s) // 2
+                        for sub in [(middle, e), (s, middle)]:
+                            pending[executor.submit(request, *sub)] = sub
+                        continue
+
+                    if saturated:
+                        capped += 1
+
+                    results.append((s, e, alerts))
+
+        if capped:
+            messages.append("CAUTION: {} windows reached the minimum time range between start and end time parameters and "
+                            "were still full. Some alerts may be missing".format(capped))
+
+        return sorted(results, key=lambda r: r[1], reverse=True), messages
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+
+TOKEN_URL = 'https://gateway.dataminr.com/auth/2/token'
+
+
+def request_dataminr_token(client_id, client_secret, default_lifetime=3600):
+    '''
+    Authenticate with the client id and client secret. Returns the token and its expiry in epoch seconds.
+
+    Raises an exception with a readable message when the API can't be reached, the credentials are rejected,
+    the API returns an error or the response no longer holds a dmaToken.
+    '''
+    payload = {'grant_type': 'api_key', 'client_id': client_id, 'client_secret': client_secret}
+    try:
+        r = requests.post(TOKEN_URL, data=payload, timeout=30)
+    except requests.exceptions.RequestException as ex:
+        raise Exception('Unable to reach the Dataminr API. Check the internet connection. | {}'.format(ex))
+
+    if r.status_code in (400, 401, 403):
+        raise Exception('Dataminr rejected the client id and client secret in config.ini. | Code: {}.'.format(r.status_code))
+    if r.status_code != 200:
+        raise Exception('The Dataminr API is unavailable. | Code: {}.'.format(r.status_code))
+
+    try:
+        tokenDetails = json.loads(r.text)
+        token = tokenDetails['dmaToken']
+    except (ValueError, KeyError):
+        raise Exception('The Dataminr token response did not include a dmaToken. The API may have changed.')
+
+    # Expiry is returned in epoch milliseconds; fall back to a default lifetime if it's missing.
+    expire = tokenDetails.get('expire')
+    expires = expire / 1000 if expire else time.time() + default_lifetime
+    return token, expires
+
+
+class TokenManager(object):
+    '''
+    Thread-safe Dataminr token cache shared by every request of a run.
+
+    The token, its expiry and the number of calls made with it are kept in memory and in a JSON file, so the
+    next run reuses a valid token. The file is written when a new token is issued and by flush() at the end of a
+    run, which records the calls made since. The file is only readable by the current user and identifies the client by a
+    hash of its id; a file that can't be read or lacks a field is ignored. A new token is requested
+    refresh_margin seconds before expiry or after max_calls calls, one refresh at a time; workers asking for a
+    token meanwhile wait for that refresh.
+    '''
+
+    def __init__(self, client_id, client_secret, cache_path=None, max_calls=180, refresh_margin=300):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_path = cache_path
+        self.max_calls = max_calls
+        self.refresh_margin = refresh_margin
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires = 0
+        self.calls = 0
+        self.refreshes = 0
+        self.load()
+
+    def client_key(self):
+        return hashlib.sha256(str(self.client_id).encode('utf-8')).hexdigest()
+
+    def load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached.get('client') != self.client_key():
+                return
+            token, expires, calls = cached['token'], float(cached['expires']), int(cached['calls'])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return
+        self.token, self.expires, self.calls = token, expires, calls
+
+    def save(self):
+        if not self.cache_path:
+            return
+        # Written to a temporary file created for the current user only, then swapped in
+        temp_path = '{}.tmp'.format(self.cache_path)
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            json.dump({'client': self.client_key(), 'token': self.token, 'expires': self.expires, 'calls': self.calls}, f)
+        os.replace(temp_path, self.cache_path)
+
+    def valid(self):
+        return self.token is not None and time.time() < self.expires - self.refresh_margin and self.calls < self.max_calls
+
+    def refresh(self):
+        # Caller holds the lock
+        self.token, self.expires = request_dataminr_token(self.client_id, self.client_secret)
+        self.calls = 0
+        self.refreshes += 1
+        self.save()
+
+    def get(self):
+        '''
+        Return a valid token and count one call against it.
+        '''
+        with self.lock:
+            if not self.valid():
+                self.refresh()
+            self.calls += 1
+            return self.token
+
+    def invalidate(self, token):
+        '''
+        Drop a token the API refused (i.e. 429). Only the first worker reporting the current token triggers a refresh.
+        '''
+        with self.lock:
+            if token == self.token:
+                self.refresh()
+
+    def flush(self):
+        '''
+        Record the calls made with the current token. Call once when the run is done.
+        '''
+        with self.lock:
+            self.save()
+
+    def header(self):
+        token = self.get()
+        return token, {'Authorization': 'dmauth {}'.format(token)}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Tool Scripts Import Their Modules From the scripts Folder, the Way ArcGIS Pro Runs Them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
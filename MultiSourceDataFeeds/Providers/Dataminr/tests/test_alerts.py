@@ -0,0 +1,77 @@
+import pytest
+from alerts import AlertStore
+
+
+def parse(events_list, list_id='', list_name=''):
+    '''
+    Records list_id & list_name the way extract_dataminr_content does.
+    '''
+    parsed = dict()
+    for alertObj in events_list:
+        try:
+            matched = alertObj['watchlistsMatchedByType'][0]
+            list_id, list_name = matched['id'], matched['name']
+        except (KeyError, IndexError):
+            pass
+        parsed[alertObj['alertId']] = {'alert_id': alertObj['alertId'], 'list_id': list_id, 'list_name': list_name}
+    return parsed
+
+
+def alert(alert_id, *watchlists):
+    return {'alertId': alert_id, 'watchlistsMatchedByType': [{'id': i, 'name': n} for i, n in watchlists]}
+
+
+def test_alerts_are_parsed_once_and_keep_every_list():
+    store = AlertStore(parse)
+
+    assert store.add([alert('a1'), alert('a2')], 'L1', 'Floods') == 2
+    assert store.add([alert('a1')], 'L2', 'Fires') == 0
+
+    output = store.to_dict()
+    assert output['a1']['list_id'] == 'L1; L2' and output['a1']['list_name'] == 'Floods; Fires'
+    assert output['a2']['list_id'] == 'L1'
+    assert store.stats == {'received': 3, 'parsed': 2, 'duplicates': 1}
+
+
+def test_matched_watchlist_is_recorded_like_the_parser_records_it():
+    store = AlertStore(parse)
+
+    # The Alert Names Watchlist 999 While List L1 Was Pulled, Twice
+    store.add([alert('a1', (999, 'Topic'))], 'L1', 'Floods')
+    store.add([alert('a1', (999, 'Topic'))], 'L1', 'Floods')
+
+    assert store.to_dict()['a1']['list_id'] == 999
+
+
+def test_numeric_watchlist_ids_are_joined_as_text():
+    store = AlertStore(parse)
+
+    store.add([alert('a1', (123, 'Topic A'))], 'L1', 'Floods')
+    store.add([alert('a1', (456, 'Topic B'))], 'L2', 'Fires')
+
+    output = store.to_dict()['a1']
+    assert output['list_id'] == '123; 456' and output['list_name'] == 'Topic A; Topic B'
+
+
+def test_keyword_pulls_keep_the_query_out_of_the_list_fields():
+    store = AlertStore(parse)
+
+    store.add([alert('a1'), alert('a2')], '', '')
+    store.add([alert('a2')], 'L1', 'Floods')
+
+    output = store.to_dict()
+    assert output['a1']['list_id'] == '' and output['a1']['list_name'] == ''
+    assert output['a2']['list_id'] == 'L1' and output['a2']['list_name'] == 'Floods'
+
+
+def test_failed_parse_releases_the_claimed_alerts():
+    def fail(events_list, list_id='', list_name=''):
+        raise ValueError('unexpected schema')
+
+    store = AlertStore(fail)
+    with pytest.raises(ValueError):
+        store.add([alert('a1')], 'L1', 'Floods')
+
+    store.parse = parse
+    assert store.add([alert('a1')], 'L2', 'Fires') == 1
+    assert store.to_dict()['a1']['list_id'] == 'L2'
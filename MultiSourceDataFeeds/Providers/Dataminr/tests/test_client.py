@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+import client
+from client import DataminrClient, TokenBucket
+
+
+class Clock(object):
+    '''
+    Stand-in for time.monotonic and time.sleep; sleeping moves the clock.
+    '''
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_allows_a_burst_then_the_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(client.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(client.time, 'sleep', clock.sleep)
+
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(5):
+        bucket.acquire()
+
+    # Three Tokens Up Front, Then One Every Half Second
+    assert clock.now == 1.0
+
+
+class Response(object):
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class Tokens(object):
+
+    def __init__(self):
+        self.token = 'token1'
+        self.invalidated = []
+
+    def header(self):
+        return self.token, {'Authorization': 'dmauth {}'.format(self.token)}
+
+    def invalidate(self, token):
+        self.invalidated.append(token)
+        self.token = 'token2'
+
+
+def test_429_is_retried_after_its_delay_or_with_a_new_token(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(client.time, 'sleep', sleeps.append)
+
+    tokens = Tokens()
+    dm = DataminrClient(tokens, rate=1000, burst=1000)
+    responses = iter([Response(429, {'Retry-After': '1.5'}), Response(429), Response(200)])
+    sent = []
+
+    def get(url, params=None, headers=None, timeout=None):
+        sent.append((params, headers['Authorization']))
+        return next(responses)
+
+    dm.session.get = get
+    response = dm.request(1, 2, list_id='L1')
+
+    assert response.status_code == 200
+    assert sleeps == [1.5, 2]
+    assert tokens.invalidated == ['token1'] and sent[-1][1] == 'dmauth token2'
+    assert sent[0][0] == {'lists': 'L1', 'pagesize': '100', 'start_time': 1, 'end_time': 2}
+    assert dm.stats == {'requests': 3, 'throttled': 2}
+
+
+def test_keyword_query_and_last_429_is_returned(monkeypatch):
+    monkeypatch.setattr(client.time, 'sleep', lambda seconds: None)
+
+    dm = DataminrClient(Tokens(), rate=1000, burst=1000, max_retries=1)
+    sent = []
+
+    def get(url, params=None, headers=None, timeout=None):
+        sent.append(params)
+        return Response(429, {'Retry-After': '0'})
+
+    dm.session.get = get
+
+    assert dm.request(keyword='flood').status_code == 429
+    assert sent == [{'query': 'flood', 'pagesize': '100'}] * 2
+
+
+def test_request_counts_hold_across_workers(monkeypatch):
+    monkeypatch.setattr(client.time, 'sleep', lambda seconds: None)
+
+    dm = DataminrClient(Tokens(), rate=10 ** 6, burst=10 ** 6, workers=8)
+    dm.session.get = lambda url, params=None, headers=None, timeout=None: Response(200)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: dm.request(list_id='L1'), range(400)))
+
+    assert dm.stats == {'requests': 400, 'throttled': 0}
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from planner import WindowPlanner
+import json
+
+MINUTE = 60 * 1000
+
+
+def planner(tmp_path, **kwargs):
+
+    return WindowPlanner(str(tmp_path / 'window_density.json'), workers=2, **kwargs)
+
+
+def test_plan_sizes_windows_from_the_learned_density(tmp_path):
+
+    p = planner(tmp_path)
+    p.densities['list'] = 1.0
+
+    # 50 Alerts per Window at 1 Alert per Minute
+    windows = p.plan('list', 0, 120 * MINUTE)
+
+    assert windows == [(70 * MINUTE, 120 * MINUTE), (20 * MINUTE, 70 * MINUTE), (0, 20 * MINUTE)]
+
+
+def test_saturated_windows_are_split_until_they_fit(tmp_path):
+
+    p = planner(tmp_path)
+    p.densities['list'] = 1.0
+    alerts = list(range(150 * 60))
+
+    # One Alert per Second: Windows of More Than 100 Seconds Come Back Full
+    def request(start, end):
+        found = [a for a in alerts if start <= a * 1000 < end]
+        return 200, found[:100]
+
+    results, messages = p.fetch('list', 0, 4 * MINUTE, request)
+
+    assert messages == []
+    assert sorted(a for _, _, page in results for a in page) == alerts[:4 * 60]
+    assert p.stats['saturated'] > 0
+    assert [r[1] for r in results] == sorted((r[1] for r in results), reverse=True)
+
+
+def test_windows_full_at_the_minimum_range_are_reported_once(tmp_path):
+
+    p = planner(tmp_path)
+    p.densities['list'] = 1000.0
+
+    results, messages = p.fetch('list', 0, 3 * MINUTE, lambda start, end: (200, [0] * 100))
+
+    assert len(results) == 3
+    assert len(messages) == 1 and messages[0].startswith('CAUTION: 3 windows')
+
+
+def test_empty_and_failed_windows(tmp_path):
+
+    p = planner(tmp_path)
+    p.densities['list'] = 1.0
+    statuses = iter([400, 500, 200])
+
+    results, messages = p.fetch('list', 0, 150 * MINUTE, lambda start, end: (next(statuses), []))
+
+    assert len(results) == 2 and p.stats['empty'] == 1
+    assert len(messages) == 1 and 'Code: 500' in messages[0]
+
+
+def test_one_planner_learns_every_list_and_saves_once(tmp_path):
+
+    path = tmp_path / 'window_density.json'
+    path.write_text(json.dumps({'list:other': 2.0}))
+    p = planner(tmp_path)
+
+    # Lists Pulled Concurrently Share the Planner; Nothing is Written Until save
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda key: p.fetch(key, 0, 60 * MINUTE, lambda start, end: (200, [0] * 30)), ['list:a', 'list:b']))
+
+    assert json.loads(path.read_text()) == {'list:other': 2.0}
+
+    p.save()
+    saved = json.loads(path.read_text())
+
+    assert sorted(saved) == ['list:a', 'list:b', 'list:other'] and saved['list:b'] == 0.5
+    assert saved['list:a'] == 0.5 and p.stats['requests'] == 2
+
+
+def test_unreadable_density_file_starts_empty(tmp_path):
+
+    (tmp_path / 'window_density.json').write_text('{"list:a": 1.0, "list')
+    p = planner(tmp_path)
+
+    assert p.densities == {}
+
+    p.learn('list:a', 10, 0, MINUTE)
+    p.save()
+
+    assert json.loads((tmp_path / 'window_density.json').read_text()) == {'list:a': 10.0}
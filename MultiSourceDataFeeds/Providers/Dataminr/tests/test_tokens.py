@@ -0,0 +1,88 @@
+import json
+import os
+import time
+import pytest
+import tokens
+from tokens import TokenManager
+
+
+@pytest.fixture
+def issued(monkeypatch):
+    issued = []
+
+    def request(client_id, client_secret):
+        issued.append('token{}'.format(len(issued) + 1))
+        return issued[-1], time.time() + 3600
+
+    monkeypatch.setattr(tokens, 'request_dataminr_token', request)
+    return issued
+
+
+def test_token_is_reused_until_max_calls(tmp_path, issued):
+    manager = TokenManager('client', 'secret', str(tmp_path / 'token_cache.json'), max_calls=2)
+
+    assert [manager.get() for _ in range(3)] == ['token1', 'token1', 'token2']
+    assert manager.refreshes == 2
+
+
+def test_cache_is_private_and_reused_by_the_next_run(tmp_path, issued):
+    path = str(tmp_path / 'token_cache.json')
+    TokenManager('client-1234', 'secret', path).get()
+
+    with open(path) as f:
+        text = f.read()
+    assert 'client-1234' not in text and json.loads(text)['token'] == 'token1'
+    if os.name == 'posix':
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    assert TokenManager('client-1234', 'secret', path).get() == 'token1'
+    assert TokenManager('other', 'secret', path).get() == 'token2'
+
+
+@pytest.mark.parametrize('content', ['{', '[]', '{"client": null}', '{"token": "t", "expires": 1}'])
+def test_unusable_cache_is_ignored(tmp_path, issued, content):
+    path = tmp_path / 'token_cache.json'
+    path.write_text(content)
+
+    manager = TokenManager('client', 'secret', str(path))
+
+    assert manager.token is None and manager.get() == 'token1'
+
+
+def test_cache_missing_a_field_is_ignored(tmp_path, issued):
+    path = str(tmp_path / 'token_cache.json')
+    TokenManager('client', 'secret', path).get()
+
+    with open(path) as f:
+        cached = json.load(f)
+    del cached['calls']
+    with open(path, 'w') as f:
+        json.dump(cached, f)
+
+    assert TokenManager('client', 'secret', path).token is None
+
+
+def test_only_the_current_token_is_invalidated(tmp_path, issued):
+    manager = TokenManager('client', 'secret')
+    manager.get()
+
+    manager.invalidate('token1')
+    manager.invalidate('token1')
+
+    assert manager.get() == 'token2' and manager.refreshes == 2
+
+
+def test_cache_is_written_on_refresh_and_flush_only(tmp_path, issued):
+    path = str(tmp_path / 'token_cache.json')
+    manager = TokenManager('client', 'secret', path)
+    manager.get()
+    manager.get()
+
+    with open(path) as f:
+        assert json.load(f)['calls'] == 0
+
+    manager.flush()
+
+    with open(path) as f:
+        assert json.load(f)['calls'] == 2
+    assert TokenManager('client', 'secret', path).calls == 2
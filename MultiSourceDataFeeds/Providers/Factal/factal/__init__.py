@@ -1,2 +1,9 @@
 from .factal import *
-from .schema import *
\ No newline at end of file
+from .schema import *
+from .state import SyncState
+from .fetcher import ItemFetcher, RateLimiter, WatermarkFile
+from .topics import TopicSync
+from .publisher import Publisher, PushError
+from .retention import Retention
+from .receiver import MicroBatcher, Receiver, replay
+from .backfill import Backfill
@@ -1,4 +1,8 @@
 import factal.schema as schema
+from factal.index import IdIndex
+from factal.columnar import parse_columns
+from factal.publisher import Publisher, PushError
+from concurrent.futures import Future
 from arcgis.features import GeoAccessor
 from arcgis.gis import GIS
 from datetime import datetime, timedelta
@@ -14,6 +18,24 @@ class Extractor(object):
         self.urls  = self.get_urls()
         self.gis   = None
 
+        # GIS Items Already Found by get_gis_item
+        self.gis_items = {}
+
+        # ID Indexes per Layer URL; See get_index
+        self.indexes = {}
+
+        # Optional Local Store of Pushed Item Dates & Hashes Used for Update Detection; See state.py
+        self.state = None
+
+        # Optional Paged, Watermark-Driven Fetcher Used by run_solution; See fetcher.py
+        self.fetcher = None
+
+        # Optional Diff-Based Sync of the Topics Table Replacing Delete & Re-Add; See topics.py
+        self.topic_sync = None
+
+        # Batching, Retries & Concurrent Item/Topic Streams for Every Push; See publisher.py
+        self.publisher = Publisher()
+
     @staticmethod
     def get_urls():
 
@@ -25,21 +47,76 @@ class Extractor(object):
         }
 
 
-    def add(self, lyr, sdf, id_field):
+    def add(self, lyr, sdf, id_field, state=None):
 
-        incoming_ids = sdf[id_field].tolist()
-        existing_ids = [f.attributes[id_field] for f in lyr.query().features]
-        new_item_ids = list(set(incoming_ids).difference(set(existing_ids)))
-
-        add_features = sdf[sdf[id_field].isin(new_item_ids)]
+        index = self.get_index(lyr, id_field)
+        add_features = index.missing(sdf)
 
         if len(add_features) > 0:
-            res = lyr.edit_features(adds=add_features.spatial.to_featureset())['addResults']
-            return len([i for i in res if i['success']])
+            return self.push_edits(lyr, add_features, 'add', index=index, state=state)
         else:
             return 0
 
 
+    def apply_retention(self, retention, content_itemID, content_topicID):
+
+        """ Archive & Delete Expired Items & Topic Rows, Then Drop Them From the Indexes & Sync State """
+
+        curr_lyr = self.get_gis_item(content_itemID).layers[0]
+        topics_tbl = self.get_gis_item(content_topicID).tables[0]
+
+        items, topics = retention.run(curr_lyr, topics_tbl)
+
+        for lyr, deleted in [(curr_lyr, items), (topics_tbl, topics)]:
+            oids = deleted[lyr.properties.objectIdField].tolist()
+            if lyr.url in self.indexes:
+                self.indexes[lyr.url].record('delete', None, [{'success': True, 'objectId': o} for o in oids])
+
+        if self.topic_sync is not None:
+            oid_field = self.topic_sync.oid_field
+            self.topic_sync.frame = self.topic_sync.frame[~self.topic_sync.frame[oid_field].isin(topics[oid_field])]
+
+        if self.state is not None and len(items):
+            self.state.forget(items[schema.itm_id].astype(str).tolist())
+
+        return [f'{content_itemID}: Items Expired {len(items)}', f'{content_topicID}: Topics Expired {len(topics)}']
+
+
+    def bulk_load(self, backfill, content_itemID, content_topicID):
+
+        """ Add Every Backfilled Item & Topic Row Missing From the Layers in One Pass of Concurrent Batched Adds """
+
+        itms, topics = backfill.frames()
+
+        if not len(itms):
+            return [f'{content_itemID}: No Backfilled Items']
+
+        itm_df = self.convert_item_to_df(itms)
+        topics_df = self.convert_topic_to_df(topics)
+
+        curr_lyr = self.get_gis_item(content_itemID).layers[0]
+        topics_tbl = self.get_gis_item(content_topicID).tables[0]
+
+        results = self.publisher.run_streams({
+            'items': lambda: self.add(curr_lyr, itm_df, schema.itm_id, state=self.state),
+            'topics': lambda: self.add(topics_tbl, topics_df, schema.topic_id)
+        })
+
+        responses = []
+        for name, item_id in [('items', content_itemID), ('topics', content_topicID)]:
+            res = results[name]
+            if res['success']:
+                responses.append(f"{item_id}: {name.title()} Backfilled {res['result']}")
+            else:
+                responses.append(f"{item_id}: {name.title()} Backfill Failed After {res['seconds']}s: {res['error']}")
+
+        # Incremental Runs Pick Up From the Newest Backfilled Item
+        if all(res['success'] for res in results.values()):
+            backfill.fetcher.commit()
+
+        return responses
+
+
     def build_incident_hfl(self):
 
         incidents, arcs = self.parse_items(self.fetch_items())
@@ -82,23 +159,16 @@ class Extractor(object):
 
     def delete_features(self, lyr, id_field, id_list):
         '''
+        Delete every row whose ID is in the list. Object IDs come from the cached ID index.
         '''
-        
-        # Get Existing AGOL Features from topics layer
-        exist_df = lyr.query().features
 
-        # Return if the existing layer dataframe has no records
-        if len(exist_df) > 0:
+        index = self.get_index(lyr, id_field)
+        del_ids = index.oids(id_list)
 
-            # Selection OIDs from the topics layer for deletion.
-            # if item id from layer is in list, capture OID and store in list
-            the_oid = lyr.properties.objectIdField
-            del_ids = [str(f.attributes[the_oid])
-                       for f in exist_df if f.attributes[id_field] in id_list]
-
-            if len(del_ids) > 0:
-                res = lyr.delete_features(deletes=','.join(del_ids))['deleteResults']
-                print('Deleted {} rows'.format(len([i for i in res if i['success']])))
+        for batch in [del_ids[i:i + 500] for i in range(0, len(del_ids), 500)]:
+            res = lyr.delete_features(deletes=','.join(str(oid) for oid in batch))['deleteResults']
+            index.record('delete', None, res)
+            print('Deleted {} rows'.format(len([i for i in res if i['success']])))
 
 
     def fetch_items(self, endpoint='item', limit=250, **kwargs):
@@ -130,14 +200,34 @@ class Extractor(object):
 
     def get_gis_item(self, item_id):
 
+        # Micro-Batches Publish Every Few Seconds; Search Each Item Once
+        if item_id in self.gis_items:
+            return self.gis_items[item_id]
+
         results = self.gis.content.search(f'id: {item_id}')
 
         if len(results) != 1:
             raise Exception(f'Empty of Ambiguous Result for Item ID: {item_id}')
 
+        self.gis_items[item_id] = results[0]
+
         return results[0]
 
 
+    def get_index(self, lyr, id_field, time_field=None):
+
+        """ Return the ID Index of a Layer, Building it on First Use """
+
+        if lyr.url not in self.indexes:
+            self.indexes[lyr.url] = IdIndex(lyr, id_field, time_field)
+
+        # An Index First Built Without Dates (i.e. by add or retention) Gains Them Here
+        elif time_field and self.indexes[lyr.url].time_field != time_field:
+            self.indexes[lyr.url].track_time(time_field)
+
+        return self.indexes[lyr.url]
+
+
     def get_location(self, location_list):
 
         for loc in location_list:
@@ -147,6 +237,33 @@ class Extractor(object):
 
         return sorted_locs[0]['latitude'], sorted_locs[0]['longitude'], sorted_locs[0]['category'], sorted_locs[0]['name']
 
+    def push_edits(self, lyr, sdf, operation, index=None, state=None):
+
+        """ Push Adds or Updates as Size-Bounded, Retried JSON Batches & Return the Number of Successful Edits """
+
+        try:
+            results = self.publisher.push(lyr, sdf, operation)
+        except PushError as push_exc:
+            # Batches Applied Before the Failure Are Still Recorded; the Failed Rows Mark the Sync State Dirty
+            self.record_edits(operation, sdf, push_exc.results, index, state)
+            raise
+
+        self.record_edits(operation, sdf, results, index, state)
+
+        return len([i for i in results if i['success']])
+
+
+    @staticmethod
+    def record_edits(operation, sdf, results, index=None, state=None):
+
+        """ Keep the ID Index & Sync State in Step With the Layer Without Querying it Again """
+
+        if index is not None:
+            index.record(operation, sdf, results)
+
+        if state is not None:
+            state.record(sdf, schema.itm_id, schema.itm_time_check, results)
+
     def parse_items(self, item_list):
 
         """ Iterates Through Item Dictionaries & Returns Item Features & Related Arcs """
@@ -250,50 +367,50 @@ class Extractor(object):
 
     def update_items(self, lyr, sdf, id_field, time_field):
 
-        # Get Existing AGOL Features
-        exist_df = lyr.query().sdf
+        if self.state is not None:
+            return self.update_items_from_state(lyr, sdf, id_field, time_field)
 
-        # Return if the Existing Dataframe Has No Records
-        if len(exist_df) < 1: return 0, None
+        # Existing Object IDs & Dates Come From the Cached ID Index Instead of a Download of the Layer
+        index = self.get_index(lyr, id_field, time_field)
+        merge_df = index.lookup(sdf)
 
-        # Define UTC for Comparison Against Current API Query Data Frame
-        exist_df[time_field] = pd.to_datetime(exist_df[time_field], utc=True)
-        
-        # https://stackoverflow.com/a/57980631: This call correctly modifies the precision so both DFs are both in seconds.
-        exist_df[time_field] = exist_df[time_field].dt.ceil(freq='s')
-        sdf[time_field] = sdf[time_field].dt.ceil(freq='s')
-        #exist_df[time_field] = exist_df[time_field].map(lambda x: x.replace(microsecond=0))
-        #sdf[time_field] = sdf[time_field].map(lambda x: x.replace(microsecond=0))
-
-        # Convert datetimes to epoch seconds
-        # https://stackoverflow.com/a/35630179: This approach is significantly faster for conversion
-        #exist_df[time_field] = exist_df[time_field].astype('int64')//1e9
-        #sdf[time_field] = sdf[time_field].astype('int64')//1e9
-
-        # Join on ID & Compare Dates
-        merge_df = exist_df.merge(sdf, on=id_field, suffixes=('_e', '_i'))
+        # Return if None of the Incoming Items Are in the Layer Yet
+        if len(merge_df) < 1: return 0, None
 
-        # If the timestamps coming in are newer than existing timestamps, overwrite existing with newer
-        # timestamps and add the suffix _i
-        merge_df = merge_df[merge_df[f'{time_field}_i'] > merge_df[f'{time_field}_e']]
+        # https://stackoverflow.com/a/57980631: Ceil Both Sides to the Second, the Precision Kept by the Layer
+        newer = merge_df[time_field].dt.ceil(freq='s') > merge_df[f'{time_field}_e'].dt.ceil(freq='s')
 
-        # We Just Want to Keep the OBJECTID Field from the Existing Features
-        # Any timestamps with the suffix _i are kept for applying updates.
-        update_df = merge_df[[c for c in merge_df.columns if not c.endswith('_e')]]
-
-        # Remove the suffix _i.  They are no longer needed to identify what's been updated.
-        update_df.columns = update_df.columns.str.replace('_i', '')
+        # Keep the Incoming Values & the Object ID of the Existing Feature
+        update_df = merge_df[newer].drop(columns=f'{time_field}_e')
 
         # Get list of updated item ids. This list will be returned to records for the related topics
         updated_item_ids = update_df[id_field].values
 
         if len(update_df) > 0:
-            res = lyr.edit_features(updates=update_df.spatial.to_featureset())['updateResults']
-            results = len([i for i in res if i['success']])
+            results = self.push_edits(lyr, update_df, 'update', index=index)
             return results, updated_item_ids
         else:
             return '0', None
 
+    def update_items_from_state(self, lyr, sdf, id_field, time_field):
+
+        """ Update Items Found Newer or Changed in the Local Sync State; the Layer is Only Read to Reconcile """
+
+        index = self.get_index(lyr, id_field, time_field)
+        self.state.oid_field = index.oid_field
+
+        if self.state.needs_reconcile():
+            self.state.reconcile(index)
+
+        update_df = self.state.changes(sdf, id_field, time_field)
+
+        if len(update_df) > 0:
+            results = self.push_edits(lyr, update_df, 'update', index=index, state=self.state)
+            return results, update_df[id_field].values
+        else:
+            return '0', None
+
+
     def update_topics(self, lyr, sdf, id_field, item_ids):
         '''
         '''
@@ -304,17 +421,35 @@ class Extractor(object):
         sdf_selection = sdf[sdf[id_field].isin(item_ids)]
 
         if len(sdf_selection) > 0:
-            res = lyr.edit_features(adds=sdf_selection.spatial.to_featureset())[
-                'addResults']
-            return len([i for i in res if i['success']])
+            return self.push_edits(lyr, sdf_selection, 'add', index=self.get_index(lyr, id_field))
         else:
             return 0
 
 
     def run_solution(self, content_itemID, content_topicID):
 
+        # Pages Stream Straight Into the Columnar Parser
+        responses, success = self.publish_items(self.fetcher.items() if self.fetcher else self.fetch_items(),
+                                                content_itemID, content_topicID)
+
+        # Only Move the Watermark Once Everything Fetched Was Pushed
+        if self.fetcher and success:
+            self.fetcher.commit()
+
+        return responses
+
+
+    def publish_items(self, item_list, content_itemID, content_topicID):
+
+        """ Parse Factal API Items & Push Them Through the Update & Add Logic; Return (Log Strings, All Streams Succeeded) """
+
         # Build SpatialDataFrames From Factal API Items
-        itms, topics = self.parse_items(self.fetch_items())
+        itms, topics = parse_columns(item_list)
+
+        # Incremental Fetches Can be Empty When Nothing Changed Since the Watermark
+        if not len(itms):
+            return [f'{content_itemID}: No Updated Items'], True
+
         itm_df = self.convert_item_to_df(itms)
         topics_df = self.convert_topic_to_df(topics)
 
@@ -326,23 +461,46 @@ class Extractor(object):
         curr_lyr = curr_itm.layers[0]
         topics_tbl = topics_itm.tables[0]
 
-        # Run Updates
-        curr_itm_upd_res, item_IDs = self.update_items(curr_lyr, itm_df, schema.itm_id, schema.itm_time_check)
-        topic_upd_res= self.update_topics(topics_tbl, topics_df, schema.topic_id, item_IDs)
+        # Item IDs Updated by the Item Stream; the Delete & Re-Add Topic Path Waits on Them
+        updated_ids = Future()
+
+        def item_stream():
+
+            try:
+                upd_res, item_IDs = self.update_items(curr_lyr, itm_df, schema.itm_id, schema.itm_time_check)
+            except Exception as gen_exc:
+                updated_ids.set_exception(gen_exc)
+                raise
+
+            updated_ids.set_result(item_IDs)
 
-        # Run Adds
-        curr_itm_add_res = self.add(curr_lyr, itm_df, schema.itm_id)
-        topic_add_res = self.add(topics_tbl, topics_df, schema.topic_id)
+            return {'added': self.add(curr_lyr, itm_df, schema.itm_id, state=self.state), 'updated': upd_res}
 
-        # Add Log Strings
-        curr_add_str = f'{content_itemID}: Items Added {curr_itm_add_res}'
-        topic_add_str = f'{content_topicID}: Topics Added {topic_add_res}'
+        def topic_stream():
 
-        # Update Log Strings
-        curr_upd_str = f'{content_itemID}: Items Updated {curr_itm_upd_res}'
-        topics_upd_str = f'{content_topicID}: Topics Updated {topic_upd_res}'
+            # Topics Are Either Diffed Against the Cached Topic Index or Deleted & Re-Added per Updated Item
+            if self.topic_sync is not None:
+                counts = self.topic_sync.sync(topics_df)
+                return {'added': counts['adds'], 'updated': f"{counts['updates']} (Deleted {counts['deletes']})"}
+
+            upd_res = self.update_topics(topics_tbl, topics_df, schema.topic_id, updated_ids.result())
+
+            return {'added': self.add(topics_tbl, topics_df, schema.topic_id), 'updated': upd_res}
+
+        # Push Items & Topics Concurrently
+        results = self.publisher.run_streams({'items': item_stream, 'topics': topic_stream})
+
+        # Add & Update Log Strings per Stream
+        responses = []
+        for name, item_id in [('items', content_itemID), ('topics', content_topicID)]:
+            res = results[name]
+            if res['success']:
+                responses.append(f"{item_id}: {name.title()} Added {res['result']['added']}")
+                responses.append(f"{item_id}: {name.title()} Updated {res['result']['updated']}")
+            else:
+                responses.append(f"{item_id}: {name.title()} Failed After {res['seconds']}s: {res['error']}")
 
-        return [curr_add_str, curr_upd_str, topic_add_str, topics_upd_str]
+        return responses, all(res['success'] for res in results.values())
 
 
 
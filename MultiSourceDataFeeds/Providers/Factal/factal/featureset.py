@@ -0,0 +1,160 @@
+"""
+Fast Esri JSON encoding of data frames for edit batches.
+
+Each provider is deployed & run from its own folder without a shared package on the path, so this
+module is vendored into the two providers that push large edit batches (GDELT/extractor & Factal/factal).
+The copies must stay identical; GDELT/tests/test_featureset.py checks that they do.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+
+
+def _dump(value):
+    """
+    JSON encode a single value from an object column. Missing values are returned as null.
+    """
+
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return 'null'
+
+    if isinstance(value, pd.Timestamp):
+        return str(value.value // 10 ** 6)
+
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return json.dumps(value.item())
+
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _encode_uniques(values):
+    """
+    Return an object array with the JSON representation of an array of unique, non-null values.
+    """
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.DatetimeIndex(values)
+        if values.tz is not None:
+            values = values.tz_convert('UTC').tz_localize(None)
+        return values.values.astype('datetime64[ms]').astype('int64').astype(str).astype(object)
+
+    values = np.asarray(values)
+
+    if values.dtype.kind == 'b':
+        return np.where(values, 'true', 'false').astype(object)
+
+    if values.dtype.kind in 'iu':
+        return values.astype(str).astype(object)
+
+    if values.dtype.kind == 'f':
+        encoded = values.astype(str).astype(object)
+        encoded[~np.isfinite(values)] = 'null'
+        return encoded
+
+    return np.array([_dump(v) for v in values], dtype=object)
+
+
+def encode_column(series):
+    """
+    Return an object array with the JSON representation of every value in a column. Values are
+    factorized first so each distinct value is only encoded once; datetimes are written as epoch
+    milliseconds and NaN/NaT as null.
+    """
+
+    try:
+        codes, uniques = pd.factorize(series)
+    except TypeError:
+        # Unhashable Values (i.e. Geometry Dictionaries) Are Encoded One by One
+        return np.array([_dump(v) for v in series.values], dtype=object)
+
+    encoded = np.append(_encode_uniques(uniques), 'null').astype(object)
+
+    # Missing Values Have a Code of -1, Which Picks the Trailing null
+    return encoded[codes]
+
+
+def encode_features(df, x_field=None, y_field=None, wkid=4326, geometry_field='SHAPE'):
+    """
+    Encode every row of a data frame as an Esri JSON feature string without building Feature objects.
+
+    Attributes are built from all columns except the geometry column. Point geometry is built from the
+    x/y fields when given (missing coordinates give an empty point); otherwise the geometry column is
+    dumped as is (arcgis geometries are dicts). Pass geometry_field=None with no x/y fields to encode
+    rows of a table.
+    """
+
+    columns = [c for c in df.columns if c != geometry_field]
+
+    if not len(df):
+        return []
+
+    # Encode Every Column Once & Fill a Single Row Template per Feature
+    values = [encode_column(df[c]) for c in columns]
+    template = '{"attributes":{' + ','.join(json.dumps(str(c)).replace('%', '%%') + ':%s' for c in columns) + '}'
+
+    if x_field and y_field:
+        values.append(encode_column(df[x_field].astype('float64')))
+        values.append(encode_column(df[y_field].astype('float64')))
+        template += ',"geometry":{"x":%s,"y":%s,"spatialReference":{"wkid":' + str(int(wkid)) + '}}'
+
+    elif geometry_field and geometry_field in df.columns:
+        values.append(encode_column(df[geometry_field]))
+        template += ',"geometry":%s'
+
+    template += '}'
+
+    return [template % row for row in zip(*values)]
+
+
+def to_edit_json(df, x_field=None, y_field=None, wkid=4326, batch_size=500, max_bytes=None, geometry_field='SHAPE'):
+    """
+    Generator returning edit-ready JSON arrays of features; each batch holds at most batch_size
+    features and, when max_bytes is given, is closed before it grows past that many bytes.
+    """
+
+    features = encode_features(df, x_field, y_field, wkid, geometry_field)
+
+    if not max_bytes:
+        for i in range(0, len(features), batch_size):
+            yield '[' + ','.join(features[i:i + batch_size]) + ']'
+        return
+
+    sizes = [len(f.encode('utf-8')) + 1 for f in features]
+
+    batch_start = 0
+    batch_bytes = 2
+
+    for i, size in enumerate(sizes):
+        if i > batch_start and (i - batch_start >= batch_size or batch_bytes + size > max_bytes):
+            yield '[' + ','.join(features[batch_start:i]) + ']'
+            batch_start, batch_bytes = i, 2
+        batch_bytes += size
+
+    if batch_start < len(features):
+        yield '[' + ','.join(features[batch_start:]) + ']'
+
+
+def apply_edits(lyr, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+    """
+    Post edits produced by to_edit_json to the layer's applyEdits endpoint as they are, through the
+    layer's connection (which adds the token & raises on service errors). FeatureLayer.edit_features
+    would need the features as dictionaries & encode them again. Returns the response dictionary with
+    all three result lists present.
+    """
+
+    params = {'f': 'json', 'rollbackOnFailure': 'true' if rollback_on_failure else 'false'}
+
+    if adds:
+        params['adds'] = adds
+    if updates:
+        params['updates'] = updates
+    if deletes:
+        params['deletes'] = deletes
+
+    res = lyr._con.post_multipart(path=f'{lyr.url}/applyEdits', postdata=params) or {}
+
+    for key in ['addResults', 'updateResults', 'deleteResults']:
+        res.setdefault(key, [])
+
+    return res
@@ -0,0 +1,126 @@
+import pandas as pd
+
+
+class IdIndex(object):
+
+    """
+    Local Map of a Layer's Factal IDs to Object IDs (& Optionally Updated Dates).
+
+    The map is built from ID & OID only queries paged by object ID, so neither the service's
+    maxRecordCount nor the size of the features limits it. Once built, it is kept current from the
+    results of the edits pushed through Extractor.push_edits instead of querying the layer again.
+    Topic tables hold several rows per item ID, so an ID can map to several object IDs.
+    """
+
+    def __init__(self, lyr, id_field, time_field=None, page_size=None):
+
+        self.lyr        = lyr
+        self.id_field   = id_field
+        self.time_field = time_field
+        self.oid_field  = lyr.properties.objectIdField
+        self.page_size  = page_size or lyr.properties.get('maxRecordCount', 1000)
+        self.fields     = [self.oid_field, id_field] + ([time_field] if time_field else [])
+        self.frame      = pd.DataFrame(columns=self.fields)
+
+        self.refresh()
+
+
+    def refresh(self):
+
+        """ Rebuild the Index From the Layer One Page of Object IDs at a Time """
+
+        pages = [pd.DataFrame(columns=self.fields)]
+        last_oid = -1
+
+        while True:
+            features = self.lyr.query(
+                where=f'{self.oid_field} > {last_oid}',
+                out_fields=','.join(self.fields),
+                order_by_fields=f'{self.oid_field} ASC',
+                result_record_count=self.page_size,
+                return_geometry=False
+            ).features
+
+            # Services May Return Fewer Rows Than Requested; Only an Empty Page Ends the Scan
+            if not features:
+                break
+
+            page = pd.DataFrame([f.attributes for f in features])
+            pages.append(page)
+            last_oid = page[self.oid_field].max()
+
+        self.frame = pd.concat(pages, ignore_index=True)[self.fields]
+        self.frame[self.id_field] = self.frame[self.id_field].astype(str)
+
+        if self.time_field:
+            self.frame[self.time_field] = pd.to_datetime(self.frame[self.time_field], unit='ms', utc=True)
+
+        print(f'Indexed {len(self.frame)} Rows of {self.lyr.properties.name}')
+
+
+    def track_time(self, time_field):
+
+        """ Add the Updated Dates to an Index Built Without Them & Rebuild It """
+
+        self.time_field = time_field
+        self.fields     = [self.oid_field, self.id_field, time_field]
+
+        self.refresh()
+
+
+    def ids(self):
+
+        return set(self.frame[self.id_field])
+
+
+    def missing(self, sdf):
+
+        """ Return the Rows of a Data Frame Whose ID is Not in the Layer """
+
+        return sdf[~sdf[self.id_field].astype(str).isin(self.frame[self.id_field])]
+
+
+    def oids(self, id_list):
+
+        """ Return the Object IDs of Every Row Matching the IDs """
+
+        id_list = [str(i) for i in id_list]
+
+        return self.frame.loc[self.frame[self.id_field].isin(id_list), self.oid_field].tolist()
+
+
+    def lookup(self, sdf):
+
+        """ Return a Data Frame With the Object ID (& Indexed Date) Joined to the Rows Already in the Layer """
+
+        sdf = sdf.assign(**{self.id_field: sdf[self.id_field].astype(str)})
+        exist = self.frame.drop_duplicates(self.id_field)
+
+        if self.time_field:
+            exist = exist.rename(columns={self.time_field: f'{self.time_field}_e'})
+
+        return sdf.merge(exist, on=self.id_field)
+
+
+    def record(self, operation, sdf, results):
+
+        """ Apply the Results of Edits Pushed From a Data Frame (Results in Row Order) to the Index """
+
+        success = pd.Series([r.get('success', False) for r in results], dtype=bool)
+        oids = [r.get('objectId') for r in results]
+
+        if operation == 'delete':
+            deleted = [o for o, s in zip(oids, success) if s]
+            self.frame = self.frame[~self.frame[self.oid_field].isin(deleted)]
+            return
+
+        rows = sdf.reset_index(drop=True)[success.values]
+        new = pd.DataFrame({self.oid_field: [o for o, s in zip(oids, success) if s],
+                            self.id_field: rows[self.id_field].astype(str).values})
+
+        if self.time_field:
+            new[self.time_field] = pd.to_datetime(rows[self.time_field].values, utc=True)
+
+        # Updated Rows Replace Their Previous Entries; Added Rows Are Appended
+        self.frame = pd.concat([self.frame[~self.frame[self.oid_field].isin(new[self.oid_field])], new],
+                               ignore_index=True)
@@ -0,0 +1,113 @@
+from factal.featureset import to_edit_json, apply_edits
+from concurrent.futures import ThreadPoolExecutor
+import traceback
+import requests
+import time
+import re
+
+
+class PushError(Exception):
+
+    """ A Batch Failed After Earlier Batches of the Push Were Applied; results Holds Every Row's Result in Row Order """
+
+    def __init__(self, results, error):
+
+        super().__init__(str(error))
+        self.results = results
+
+
+class Publisher(object):
+
+    """
+    Batched, Retrying Edit Pushes & Concurrent Edit Streams.
+
+    Every push is split into batches of at most batch_size features & max_bytes of JSON. Each batch is
+    posted with rollbackOnFailure, so a failed batch leaves nothing behind. Transport errors & 5xx
+    responses are retried up to `retries` times with exponential backoff; a batch the service rolled
+    back (i.e. one invalid feature) would fail again & is returned as failed results. When a batch
+    still raises, push raises a PushError holding the results of the batches already applied.
+    Streams (i.e. items & topics) run on their own threads & report their results, or their error,
+    separately.
+    """
+
+    def __init__(self, batch_size=500, max_bytes=2000000, retries=3, backoff=2):
+
+        self.batch_size = batch_size
+        self.max_bytes  = max_bytes
+        self.retries    = retries
+        self.backoff    = backoff
+
+
+    @staticmethod
+    def transient(exc):
+
+        """ Return True for Errors Worth Retrying: Connection Failures, Timeouts & 5xx Responses """
+
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError, TimeoutError)):
+            return True
+
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+        if status is not None:
+            return status >= 500
+
+        # The arcgis API Raises Service Errors as Plain Exceptions Ending in (Error Code: 500)
+        return re.search(r'Error Code: 5\d\d', str(exc)) is not None
+
+
+    def post(self, lyr, operation, edits):
+
+        """ Post One Batch & Return its Edit Results, Retrying Transport Errors & 5xx Responses """
+
+        for attempt in range(self.retries + 1):
+            try:
+                return apply_edits(lyr, rollback_on_failure=True, **{f'{operation}s': edits})[f'{operation}Results']
+            except Exception as gen_exc:
+                if attempt == self.retries or not self.transient(gen_exc):
+                    raise
+                print(f'Retrying {operation.title()} Batch After Error: {gen_exc}')
+
+            time.sleep(self.backoff * 2 ** attempt)
+
+
+    def push(self, lyr, sdf, operation):
+
+        """ Push Adds or Updates From a Data Frame & Return the Edit Results in Row Order """
+
+        # Incident Features Carry Point Geometry; Topic Rows Go to a Table
+        if 'SHAPE' in sdf.columns:
+            batches = to_edit_json(sdf, 'longitude', 'latitude', batch_size=self.batch_size, max_bytes=self.max_bytes)
+        else:
+            batches = to_edit_json(sdf, batch_size=self.batch_size, max_bytes=self.max_bytes, geometry_field=None)
+
+        results = []
+        for edits in batches:
+            try:
+                results += self.post(lyr, operation, edits)
+            except Exception as gen_exc:
+                # Rows From the Failed Batch On Were Not Applied
+                raise PushError(results + [{'objectId': None, 'success': False}] * (len(sdf) - len(results)), gen_exc) from gen_exc
+
+        return results
+
+
+    @staticmethod
+    def run_stream(func):
+
+        """ Run One Stream & Capture its Result or Traceback With its Run Time """
+
+        start = time.time()
+
+        try:
+            return {'success': True, 'result': func(), 'seconds': round(time.time() - start, 1)}
+        except Exception:
+            return {'success': False, 'error': traceback.format_exc(), 'seconds': round(time.time() - start, 1)}
+
+
+    def run_streams(self, streams):
+
+        """ Run Named Callables Concurrently & Return {Name: {success, result or error, seconds}} """
+
+        with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+            futures = {name: executor.submit(self.run_stream, func) for name, func in streams.items()}
+
+        return {name: future.result() for name, future in futures.items()}
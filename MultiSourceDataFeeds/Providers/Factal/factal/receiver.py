@@ -0,0 +1,244 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import traceback
+import requests
+import hmac
+import json
+import time
+
+
+def items_from_payload(payload):
+
+    """ Return the Item List of a Pushed Payload: One Item, a List of Items or an API Page With Results """
+
+    if isinstance(payload, dict):
+        payload = payload['results'] if 'results' in payload else [payload]
+
+    if not isinstance(payload, list) or not all(isinstance(i, dict) and 'id' in i and 'topics' in i for i in payload):
+        raise ValueError('Expected Factal Items With id & topics')
+
+    return payload
+
+
+class MicroBatcher(object):
+
+    """
+    Coalesce Pushed Factal Items Into Micro-Batches.
+
+    Items are held by ID (the latest updated_date wins) until max_items are pending or max_seconds
+    have passed since the first pending item, then handed to the handler on a single worker thread.
+    A handler raising or returning False marks the batch failed. The handler runs under `lock`, which
+    anything else publishing to the same layers (i.e. the polling reconciliation) must also hold.
+    """
+
+    def __init__(self, handler, max_items=500, max_seconds=2):
+
+        self.handler     = handler
+        self.max_items   = max_items
+        self.max_seconds = max_seconds
+        self.lock        = threading.Lock()
+        self.cond        = threading.Condition()
+        self.pending     = {}
+        self.first       = None
+        self.running     = False
+        self.thread      = None
+        self.stats       = {'received': 0, 'coalesced': 0, 'batches': 0, 'failed': 0}
+
+
+    def add(self, item_list):
+
+        with self.cond:
+            for item in item_list:
+                key = str(item['id'])
+                prev = self.pending.get(key)
+
+                if prev is not None:
+                    self.stats['coalesced'] += 1
+                if prev is None or str(item.get('updated_date', '')) >= str(prev.get('updated_date', '')):
+                    self.pending[key] = item
+
+            self.stats['received'] += len(item_list)
+
+            if self.pending and self.first is None:
+                self.first = time.time()
+
+            self.cond.notify()
+
+        return len(item_list)
+
+
+    def due(self):
+
+        return len(self.pending) >= self.max_items or \
+            (self.first is not None and time.time() - self.first >= self.max_seconds)
+
+
+    def take(self):
+
+        """ Remove & Return Up to max_items Pending Items (Caller Holds the Condition) """
+
+        keys = list(self.pending)[:self.max_items]
+        batch = [self.pending.pop(k) for k in keys]
+        self.first = time.time() if self.pending else None
+
+        return batch
+
+
+    def flush(self, batch):
+
+        with self.lock:
+            start = time.time()
+            try:
+                if self.handler(batch) is False:
+                    self.stats['failed'] += 1
+                    print(f'Publishing Batch of {len(batch)} Items Failed After {round(time.time() - start, 2)}s')
+                    return
+
+                self.stats['batches'] += 1
+                print(f'Published Batch of {len(batch)} Items in {round(time.time() - start, 2)}s')
+            except Exception:
+                self.stats['failed'] += 1
+                print(f'Publishing Batch of {len(batch)} Items Failed:\n{traceback.format_exc()}')
+
+
+    def run(self):
+
+        while True:
+            with self.cond:
+                while self.running and not self.due():
+                    timeout = None if self.first is None else max(0, self.first + self.max_seconds - time.time())
+                    self.cond.wait(timeout)
+
+                # Stopping Drains Whatever is Still Pending
+                if not self.running and not self.pending:
+                    return
+
+                batch = self.take()
+
+            if batch:
+                self.flush(batch)
+
+
+    def start(self):
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='factal-batcher', daemon=True)
+        self.thread.start()
+
+
+    def stop(self):
+
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+        if self.thread:
+            self.thread.join()
+
+
+class Receiver(object):
+
+    """
+    Local HTTP Endpoint Accepting Pushed Factal Items.
+
+    POSTs to `path` carry one item, a list of items or an API page ({"results": [...]}). Items are
+    added to the micro-batcher & acknowledged with 202 before they are published. When a secret is set,
+    requests must send it as "Authorization: Token <secret>".
+    """
+
+    def __init__(self, batcher, host='127.0.0.1', port=8765, path='/factal', secret=None):
+
+        self.batcher = batcher
+        self.host    = host
+        self.port    = port
+        self.path    = path
+        self.secret  = secret
+        self.server  = None
+        self.thread  = None
+
+
+    def handler_class(self):
+
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def reply(self, status, body):
+
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+
+                if self.path != receiver.path:
+                    return self.reply(404, {'error': 'Not Found'})
+
+                self.reply(200, receiver.batcher.stats)
+
+            def do_POST(self):
+
+                if self.path != receiver.path:
+                    return self.reply(404, {'error': 'Not Found'})
+
+                if receiver.secret and not hmac.compare_digest(self.headers.get('Authorization', ''), f'Token {receiver.secret}'):
+                    return self.reply(401, {'error': 'Unauthorized'})
+
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                    item_list = items_from_payload(payload)
+                except ValueError as val_err:
+                    return self.reply(400, {'error': str(val_err)})
+
+                self.reply(202, {'accepted': receiver.batcher.add(item_list)})
+
+            def log_message(self, format, *args):
+
+                pass
+
+        return Handler
+
+
+    def start(self):
+
+        self.batcher.start()
+        self.server = ThreadingHTTPServer((self.host, self.port), self.handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, name='factal-receiver', daemon=True)
+        self.thread.start()
+
+        print(f'Listening for Factal Items on http://{self.host}:{self.server.server_port}{self.path}')
+
+
+    def stop(self):
+
+        """ Stop Accepting Items, Then Publish Whatever is Still Pending """
+
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+        self.batcher.stop()
+
+
+def replay(url, item_list, batch_size=50, delay=0, secret=None):
+
+    """ POST Items to a Receiver in Batches & Return the Response Time of Each Request """
+
+    session = requests.Session()
+    if secret:
+        session.headers.update({'Authorization': f'Token {secret}'})
+
+    times = []
+    for i in range(0, len(item_list), batch_size):
+        start = time.time()
+        response = session.post(url, json=item_list[i:i + batch_size])
+        response.raise_for_status()
+        times.append(time.time() - start)
+
+        if delay:
+            time.sleep(delay)
+
+    return times
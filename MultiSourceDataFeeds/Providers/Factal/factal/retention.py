@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+import importlib.util
+import pandas as pd
+import os
+
+
+def require_parquet():
+
+    """ Raise a Readable Error Before Any Work Starts When Neither Parquet Engine is Installed """
+
+    if not any(importlib.util.find_spec(engine) for engine in ['pyarrow', 'fastparquet']):
+        raise ImportError('Writing Parquet Needs pyarrow or fastparquet; Install One (i.e. pip install pyarrow) in the Python Environment')
+
+
+class Retention(object):
+
+    """
+    Status & Age Based Retention of the Factal Incident Layer & Topics Table.
+
+    An item expires once it has not been updated for max_age_days, or sooner (status_hours) when its
+    status is one of `statuses`. Expired items are paged out of the layer by object ID with a where
+    clause, written to Parquet under archive_dir & only then deleted with the same where clause bounded
+    to the archived object IDs. The topic rows of deleted items are archived & deleted the same way,
+    so topic rows always leave with their item. Writing Parquet needs pyarrow or fastparquet.
+    """
+
+    def __init__(self, archive_dir, max_age_days=30, statuses=(), status_hours=24, status_field='status',
+                 time_field='updated_date', id_field='id', topic_id_field='item_id', batch_size=1000):
+
+        self.archive_dir      = archive_dir
+        self.max_age_days     = max_age_days
+        self.statuses         = list(statuses)
+        self.status_hours     = status_hours
+        self.status_field     = status_field
+        self.time_field       = time_field
+        self.id_field         = id_field
+        self.topic_id_field   = topic_id_field
+        self.batch_size       = batch_size
+
+        require_parquet()
+
+
+    @staticmethod
+    def timestamp(value):
+
+        return f"TIMESTAMP '{value:%Y-%m-%d %H:%M:%S}'"
+
+
+    @staticmethod
+    def quoted(values):
+
+        return ','.join("'{}'".format(str(v).replace("'", "''")) for v in values)
+
+
+    def item_where(self, now=None):
+
+        """ Return the Where Clause Matching Expired Items """
+
+        now = now or datetime.utcnow()
+        clauses = [f'{self.time_field} < {self.timestamp(now - timedelta(days=self.max_age_days))}']
+
+        if self.statuses:
+            cutoff = self.timestamp(now - timedelta(hours=self.status_hours))
+            clauses.append(f'({self.status_field} IN ({self.quoted(self.statuses)}) AND {self.time_field} < {cutoff})')
+
+        return ' OR '.join(clauses)
+
+
+    def pages(self, lyr, where):
+
+        """ Yield Pages of Matching Rows (Attributes Only) in Object ID Order """
+
+        oid_field = lyr.properties.objectIdField
+        last_oid = -1
+
+        while True:
+            features = lyr.query(
+                where=f'({where}) AND {oid_field} > {last_oid}',
+                out_fields='*',
+                order_by_fields=f'{oid_field} ASC',
+                result_record_count=self.batch_size,
+                return_geometry=False
+            ).features
+
+            if not features:
+                break
+
+            page = pd.DataFrame([f.attributes for f in features])
+            last_oid = page[oid_field].max()
+
+            yield page
+
+
+    def archive(self, lyr, page):
+
+        """ Write a Page to Parquet (Date Fields as UTC Datetimes) & Return the File Path """
+
+        oid_field = lyr.properties.objectIdField
+        page = page.copy()
+
+        for field in lyr.properties.fields:
+            if field['type'] == 'esriFieldTypeDate' and field['name'] in page.columns:
+                page[field['name']] = pd.to_datetime(page[field['name']], unit='ms', utc=True)
+
+        name = f"{lyr.properties.name}_{datetime.utcnow():%Y%m%d_%H%M%S}_{page[oid_field].min()}_{page[oid_field].max()}.parquet"
+        path = os.path.join(self.archive_dir, name)
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        page.to_parquet(path, index=False)
+
+        return path
+
+
+    def expire(self, lyr, where):
+
+        """ Archive Then Delete Every Row Matching the Where Clause, a Page at a Time; Return the Deleted Rows """
+
+        oid_field = lyr.properties.objectIdField
+        deleted = [pd.DataFrame(columns=[oid_field])]
+
+        for page in self.pages(lyr, where):
+
+            path = self.archive(lyr, page)
+
+            # Bounding the Clause to the Archived Range Keeps Rows Expiring Mid-Run Out of This Delete
+            bounded = f'({where}) AND {oid_field} >= {page[oid_field].min()} AND {oid_field} <= {page[oid_field].max()}'
+            res = lyr.delete_features(where=bounded)['deleteResults']
+            oids = [r['objectId'] for r in res if r['success']]
+
+            if len(oids) != len(page):
+                print(f'Archived {len(page)} Rows to {path} but Deleted {len(oids)}')
+
+            deleted.append(page[page[oid_field].isin(oids)])
+
+        return pd.concat(deleted, ignore_index=True)
+
+
+    def run(self, lyr, tbl, now=None):
+
+        """ Expire Items, Then the Topics of the Deleted Items; Return (Deleted Items, Deleted Topic Rows) """
+
+        now = now or datetime.utcnow()
+
+        items = self.expire(lyr, self.item_where(now))
+        item_ids = items[self.id_field].astype(str).tolist() if len(items) else []
+
+        topics = [pd.DataFrame(columns=[tbl.properties.objectIdField])]
+        for i in range(0, len(item_ids), self.batch_size):
+            topics.append(self.expire(tbl, f'{self.topic_id_field} IN ({self.quoted(item_ids[i:i + self.batch_size])})'))
+
+        topics = pd.concat(topics, ignore_index=True)
+
+        print(f'Retention Removed {len(items)} Items & {len(topics)} Topic Rows')
+
+        return items, topics
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+import pandas as pd
+import sqlite3
+
+
+class SyncState(object):
+
+    """
+    SQLite Store of What Was Last Pushed for Every Factal Item.
+
+    Each item ID keeps the updated_date (epoch milliseconds, ceiled to the second like the hosted
+    layer), a hash of its content & its object ID. Finding the items to update is an indexed lookup
+    of the incoming IDs instead of a download of the layer. The store is reconciled with the layer
+    every reconcile_hours, or on the next run after an edit failed.
+    """
+
+    def __init__(self, path, reconcile_hours=24, oid_field='OBJECTID'):
+
+        self.path            = path
+        self.reconcile_hours = reconcile_hours
+        self.oid_field       = oid_field
+
+        # Edits Are Recorded From the Item Stream's Thread
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.execute('CREATE TABLE IF NOT EXISTS items (id TEXT PRIMARY KEY, updated_date INTEGER, content_hash TEXT, oid INTEGER)')
+        self.con.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.con.commit()
+
+
+    @staticmethod
+    def to_epoch(series):
+
+        """ Return Datetimes as Epoch Milliseconds, Ceiled to the Second """
+
+        return (pd.to_datetime(series, utc=True).dt.ceil(freq='s') - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)
+
+
+    def content_hash(self, sdf):
+
+        """ Return One 64-Bit Hash per Row of Every Attribute (Geometry & Object ID Excluded) as Text """
+
+        fields = sorted(c for c in sdf.columns if c not in ['SHAPE', self.oid_field])
+
+        return pd.util.hash_pandas_object(sdf[fields].astype(str), index=False).astype(str).values
+
+
+    def get_meta(self, key, default=None):
+
+        row = self.con.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+
+        return row[0] if row else default
+
+
+    def set_meta(self, key, value):
+
+        self.con.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+        self.con.commit()
+
+
+    def lookup(self, id_list):
+
+        """ Return the Stored Rows of the IDs, Queried in Batches to Stay Under SQLite's Variable Limit """
+
+        id_list = [str(i) for i in id_list]
+        frames = [pd.DataFrame(columns=['id', 'updated_date', 'content_hash', 'oid'])]
+
+        for i in range(0, len(id_list), 900):
+            batch = id_list[i:i + 900]
+            frames.append(pd.read_sql_query(
+                f"SELECT id, updated_date, content_hash, oid FROM items WHERE id IN ({','.join('?' * len(batch))})",
+                self.con, params=batch
+            ))
+
+        return pd.concat(frames, ignore_index=True)
+
+
+    def changes(self, sdf, id_field, time_field):
+
+        """ Return the Incoming Rows Already Pushed Whose Date is Newer or Content Changed, With Their Object ID """
+
+        incoming = sdf.assign(**{
+            id_field: sdf[id_field].astype(str),
+            '_updated': self.to_epoch(sdf[time_field]).values,
+            '_hash': self.content_hash(sdf)
+        })
+
+        stored = self.lookup(incoming[id_field].tolist()).rename(columns={
+            'id': id_field, 'updated_date': '_stored_date', 'content_hash': '_stored_hash', 'oid': self.oid_field
+        })
+        merged = incoming.merge(stored, on=id_field)
+
+        # Rows Restored by a Reconcile Have No Hash; Only Their Dates Are Compared
+        newer = merged['_updated'] > merged['_stored_date'].astype('int64')
+        edited = merged['_stored_hash'].notna() & (merged['_hash'] != merged['_stored_hash'])
+
+        changed = merged[newer | edited]
+
+        return changed.drop(columns=['_updated', '_hash', '_stored_date', '_stored_hash'])
+
+
+    def record(self, sdf, id_field, time_field, results):
+
+        """ Store the Rows Whose Edits Succeeded (Results in Row Order) & Flag the Store if Any Failed """
+
+        success = [bool(r.get('success')) for r in results]
+        rows = sdf.reset_index(drop=True)[success]
+
+        if not all(success):
+            self.set_meta('dirty', 1)
+
+        if not len(rows):
+            return
+
+        values = zip(rows[id_field].astype(str),
+                     self.to_epoch(rows[time_field]).tolist(),
+                     self.content_hash(rows).tolist(),
+                     [r.get('objectId') for r, s in zip(results, success) if s])
+
+        self.con.executemany('INSERT OR REPLACE INTO items (id, updated_date, content_hash, oid) VALUES (?, ?, ?, ?)', values)
+        self.con.commit()
+
+
+    def forget(self, id_list):
+
+        """ Remove Items Deleted From the Layer """
+
+        id_list = [str(i) for i in id_list]
+
+        for i in range(0, len(id_list), 900):
+            batch = id_list[i:i + 900]
+            self.con.execute(f"DELETE FROM items WHERE id IN ({','.join('?' * len(batch))})", batch)
+
+        self.con.commit()
+
+
+    def needs_reconcile(self):
+
+        last = self.get_meta('last_reconcile')
+
+        if self.get_meta('dirty', '0') == '1' or last is None:
+            return True
+
+        return datetime.utcnow() - datetime.fromisoformat(last) > timedelta(hours=self.reconcile_hours)
+
+
+    def reconcile(self, index):
+
+        """ Replace the Store With the IDs, Dates & Object IDs of a Freshly Refreshed IdIndex (Hashes Are Kept When the Date Matches) """
+
+        index.refresh()
+
+        frame = index.frame.drop_duplicates(index.id_field)
+        layer = pd.DataFrame({
+            'id': frame[index.id_field].astype(str).values,
+            'updated_date': self.to_epoch(frame[index.time_field]).values,
+            'oid': frame[index.oid_field].astype('int64').values
+        })
+
+        stored = self.lookup(layer['id'].tolist())[['id', 'updated_date', 'content_hash']]
+        layer = layer.merge(stored, on=['id', 'updated_date'], how='left')
+
+        self.con.execute('DELETE FROM items')
+        self.con.executemany(
+            'INSERT INTO items (id, updated_date, content_hash, oid) VALUES (?, ?, ?, ?)',
+            [(i, int(u), None if pd.isna(h) else h, int(o))
+             for i, u, h, o in layer[['id', 'updated_date', 'content_hash', 'oid']].itertuples(index=False)]
+        )
+        self.con.commit()
+
+        self.set_meta('last_reconcile', datetime.utcnow().isoformat())
+        self.set_meta('dirty', 0)
+
+        print(f'Reconciled Sync State With {len(layer)} Items')
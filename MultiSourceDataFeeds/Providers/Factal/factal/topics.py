@@ -0,0 +1,176 @@
+from factal.publisher import Publisher, PushError
+import pandas as pd
+
+
+class TopicSync(object):
+
+    """
+    Diff-Based Sync of the Factal Topics Table.
+
+    Topic rows are keyed by (item_id, topic id). A cached index of the table holds the object ID of
+    every key & a hash of the fields that change in place (relevance, name, description & latest_item_date
+    by default, so the rows of an updated item carry its new date like a full re-add did). Syncing a
+    topic frame diffs it against the index for the items it contains & only sends the adds, updates
+    & deletes needed, in batches. The index is kept current from the edit results.
+    """
+
+    def __init__(self, tbl, item_field='item_id', topic_field='id', compare_fields=('relevance', 'name', 'description', 'latest_item_date'),
+                 batch_size=500, page_size=None, publisher=None):
+
+        self.tbl            = tbl
+        self.item_field     = item_field
+        self.topic_field    = topic_field
+        self.compare_fields = list(compare_fields)
+        self.batch_size     = batch_size
+        self.oid_field      = tbl.properties.objectIdField
+        self.page_size      = page_size or tbl.properties.get('maxRecordCount', 1000)
+        self.publisher      = publisher or Publisher(batch_size=batch_size)
+        self.frame          = pd.DataFrame(columns=[self.oid_field, item_field, topic_field, '_hash'])
+
+        self.refresh()
+
+
+    def row_hash(self, df):
+
+        """ Hash the Compared Fields After Normalizing Them the Same Way for Layer & API Values """
+
+        norm = pd.DataFrame(index=df.index)
+
+        for field in self.compare_fields:
+            values = df[field] if field in df.columns else pd.Series(index=df.index, dtype=object)
+            if pd.api.types.is_datetime64_any_dtype(values):
+                # Dates Compare as the Epoch Milliseconds the Layer Returns
+                values = (pd.to_datetime(values, utc=True) - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)
+            if pd.api.types.is_numeric_dtype(values):
+                values = values.astype(float).round(4)
+            norm[field] = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+
+        return pd.util.hash_pandas_object(norm, index=False).values
+
+
+    def keyed(self, df):
+
+        return df.assign(**{self.item_field: df[self.item_field].astype(str), self.topic_field: df[self.topic_field].astype(str)})
+
+
+    def refresh(self):
+
+        """ Rebuild the Index From Key & Compared Field Only Queries Paged by Object ID """
+
+        fields = [self.oid_field, self.item_field, self.topic_field] + self.compare_fields
+        pages = [pd.DataFrame(columns=fields)]
+        last_oid = -1
+
+        while True:
+            features = self.tbl.query(
+                where=f'{self.oid_field} > {last_oid}',
+                out_fields=','.join(fields),
+                order_by_fields=f'{self.oid_field} ASC',
+                result_record_count=self.page_size,
+                return_geometry=False
+            ).features
+
+            if not features:
+                break
+
+            page = pd.DataFrame([f.attributes for f in features])
+            pages.append(page)
+            last_oid = page[self.oid_field].max()
+
+        # The Empty Seed Page Leaves Every Column as Object; Restore Numeric Types (i.e. Epoch Dates) Before Hashing
+        rows = self.keyed(pd.concat(pages, ignore_index=True).infer_objects())
+        rows['_hash'] = self.row_hash(rows)
+
+        self.frame = rows[[self.oid_field, self.item_field, self.topic_field, '_hash']]
+
+        print(f'Indexed {len(self.frame)} Topic Rows')
+
+
+    def diff(self, topics_df):
+
+        """ Return (Adds, Updates With Object IDs, Object IDs to Delete) for the Items in the Topic Frame """
+
+        keys = [self.item_field, self.topic_field]
+
+        incoming = topics_df.reset_index(drop=True)
+        keyed = self.keyed(incoming)[keys].assign(_row=range(len(incoming)), _hash=self.row_hash(incoming))
+        keyed = keyed.drop_duplicates(keys)
+
+        existing = self.frame[self.frame[self.item_field].isin(keyed[self.item_field])]
+
+        # Extra Rows Sharing a Key Are Left Over From Earlier Duplicated Adds
+        dupes = existing[existing.duplicated(keys)]
+        existing = existing.drop_duplicates(keys)
+
+        merged = keyed.merge(existing, on=keys, how='outer', suffixes=('', '_e'), indicator=True)
+
+        # Adds & Updates Keep the Incoming Values (& Types); Updates Carry the Object ID of the Row They Replace
+        add_rows = merged[merged['_merge'] == 'left_only']
+        upd_rows = merged[(merged['_merge'] == 'both') & (merged['_hash'] != merged['_hash_e'])]
+
+        adds = incoming.iloc[add_rows['_row'].astype(int)]
+        upds = incoming.iloc[upd_rows['_row'].astype(int)].assign(**{self.oid_field: upd_rows[self.oid_field].astype('int64').values})
+        dels = merged.loc[merged['_merge'] == 'right_only', self.oid_field].tolist() + dupes[self.oid_field].tolist()
+
+        return adds, upds, [int(o) for o in dels]
+
+
+    def apply(self, operation, sdf):
+
+        """ Push Adds or Updates in Batches & Record the Successful Ones in the Index """
+
+        try:
+            results = self.publisher.push(self.tbl, sdf, operation)
+        except PushError as push_exc:
+            # Batches Applied Before the Failure Are Still Indexed
+            self.record(sdf, push_exc.results)
+            raise
+
+        return self.record(sdf, results)
+
+
+    def record(self, sdf, results):
+
+        """ Index the Rows Whose Edits Succeeded (Results in Row Order) & Return Their Count """
+
+        rows = self.keyed(sdf.reset_index(drop=True))[[r.get('success', False) for r in results]]
+        new = rows[[self.item_field, self.topic_field]].assign(**{
+            self.oid_field: [r['objectId'] for r in results if r.get('success')],
+            '_hash': self.row_hash(rows)
+        })
+
+        self.frame = pd.concat([self.frame[~self.frame[self.oid_field].isin(new[self.oid_field])], new], ignore_index=True)
+
+        return len(new)
+
+
+    def delete(self, oids):
+
+        deleted = []
+        for i in range(0, len(oids), self.batch_size):
+            res = self.tbl.delete_features(deletes=','.join(str(o) for o in oids[i:i + self.batch_size]))['deleteResults']
+            deleted += [r['objectId'] for r in res if r['success']]
+
+        self.frame = self.frame[~self.frame[self.oid_field].isin(deleted)]
+
+        return len(deleted)
+
+
+    def sync(self, topics_df):
+
+        """ Send the Minimal Edits to Make the Table Match the Topic Frame for Its Items & Return the Counts """
+
+        if not len(topics_df):
+            return {'adds': 0, 'updates': 0, 'deletes': 0}
+
+        adds, upds, dels = self.diff(topics_df)
+
+        counts = {
+            'deletes': self.delete(dels) if dels else 0,
+            'updates': self.apply('update', upds) if len(upds) else 0,
+            'adds': self.apply('add', adds) if len(adds) else 0
+        }
+
+        print(f"Synced Topics: {counts['adds']} Added, {counts['updates']} Updated, {counts['deletes']} Deleted")
+
+        return counts
@@ -0,0 +1,96 @@
+import factal
+from factal.columnar import parse_columns
+
+import pandas as pd
+import argparse
+import random
+import time
+
+
+def synthetic_items(count, seed=0):
+
+    """ Return a List of Factal-Like Item Dictionaries With 2-8 Topics Each """
+
+    rnd = random.Random(seed)
+    categories = list(factal.schema.loc_pref.keys()) + ['Continent', None]
+    kinds = ['arc', 'location', 'location', 'region', 'tag', 'vertical']
+    items = []
+
+    for i in range(count):
+        date = f'2024-01-{rnd.randint(1, 28):02d}T{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00.{rnd.randint(0, 999999):06d}Z'
+        item = {
+            'id': 1000000 + i,
+            'resource_uri': f'/api/v2/item/{i}/',
+            'permalink': f'https://www.factal.com/item/{i}',
+            'slug': f'item-{i}',
+            'url_domain': 'twitter.com',
+            'url': '' if rnd.random() < 0.2 else f'https://example.com/{i}',
+            'tweet_id': 10 ** 12 + i,
+            'type': 'report',
+            'content': f'Synthetic incident {i}',
+            'source': 'synthetic',
+            'date': date,
+            'created_date': date,
+            'updated_date': date,
+            'severity': rnd.choice([1, 2, 3, 4, 5, None]),
+            'status': 'published',
+            'submitter': 'benchmark',
+            'pushed': False,
+            'pushed_major': False,
+            'pushed_emerging': False,
+            'tweeted': False,
+            'topics': []
+        }
+
+        for j in range(rnd.randint(2, 8)):
+            kind = rnd.choice(kinds)
+            item['topics'].append({
+                'relevance': rnd.random(),
+                'topic': {
+                    'id': rnd.randint(1, 50000),
+                    'resource_uri': f'/api/v2/topic/{j}/',
+                    'permalink': f'https://www.factal.com/topic/{j}',
+                    'slug': f'topic-{j}',
+                    'active': True,
+                    'visible': True,
+                    'name': f'{kind} {rnd.randint(1, 5000)}',
+                    'kind': kind,
+                    'category': rnd.choice(categories) if kind == 'location' else None,
+                    'latitude': rnd.uniform(-80, 80),
+                    'longitude': rnd.uniform(-180, 180),
+                    'description': f'Description {j}',
+                    'latest_item_date': date
+                }
+            })
+
+        items.append(item)
+
+    return items
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Compare parse_items against the columnar parser.')
+    parser.add_argument('--items', type=int, default=100000, help='Number of synthetic items')
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items)
+    e = factal.Extractor(None)
+
+    # Row-Wise Parser Followed by the Data Frame Build Done in convert_item_to_df / convert_topic_to_df
+    start = time.time()
+    itms, topics = e.parse_items(items)
+    row_itm_df, row_topic_df = pd.DataFrame(itms), pd.DataFrame(topics)
+    row_time = time.time() - start
+
+    start = time.time()
+    col_itm_df, col_topic_df = parse_columns(items)
+    col_time = time.time() - start
+
+    # Both Parsers Must Produce the Same Frames (Column Order Aside)
+    pd.testing.assert_frame_equal(row_itm_df[col_itm_df.columns], col_itm_df, check_dtype=False)
+    pd.testing.assert_frame_equal(row_topic_df[col_topic_df.columns], col_topic_df, check_dtype=False)
+
+    print(f'{args.items} Items, {len(col_topic_df)} Topics, {len(col_itm_df)} Located Items')
+    print(f'parse_items: {round(row_time, 2)}s')
+    print(f'parse_columns: {round(col_time, 2)}s ({round(row_time / col_time, 1)}x)')
@@ -0,0 +1,30 @@
+from factal.receiver import replay
+from parse_benchmark import synthetic_items
+
+import argparse
+import json
+import time
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Replay Factal items against a local receiver (runner.py --listen).')
+    parser.add_argument('--url', default='http://127.0.0.1:8765/factal', help='Receiver URL')
+    parser.add_argument('--file', help='JSON file of items or a saved API page; synthetic items when omitted')
+    parser.add_argument('--items', type=int, default=1000, help='Number of synthetic items')
+    parser.add_argument('--batch-size', type=int, default=50, help='Items per request')
+    parser.add_argument('--delay', type=float, default=0, help='Seconds between requests')
+    parser.add_argument('--secret', help='Receiver secret')
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file) as f:
+            items = json.load(f)
+        items = items['results'] if isinstance(items, dict) else items
+    else:
+        items = synthetic_items(args.items, seed=int(time.time()))
+
+    times = replay(args.url, items, batch_size=args.batch_size, delay=args.delay, secret=args.secret)
+
+    print(f'Replayed {len(items)} Items in {len(times)} Requests')
+    print(f'Mean Response: {round(1000 * sum(times) / len(times), 1)}ms, Max: {round(1000 * max(times), 1)}ms')
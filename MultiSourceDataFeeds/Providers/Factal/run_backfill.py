@@ -0,0 +1,75 @@
+import factal
+
+from configparser import ConfigParser
+import argparse
+import time
+import os
+
+
+if __name__ == "__main__":
+
+    start_time = time.time()
+
+    parser = argparse.ArgumentParser(description='Backfill Factal history by date window, then bulk load it.')
+    parser.add_argument('--start', required=True, help='First updated_date to backfill (UTC), e.g. 2024-01-01')
+    parser.add_argument('--end', default=None, help='End of the range (UTC, exclusive); defaults to now')
+    parser.add_argument('--skip-load', action='store_true', help='Only fetch & checkpoint windows')
+    args = parser.parse_args()
+
+    # Get Current Directory
+    this_dir = os.path.split(os.path.realpath(__file__))[0]
+
+    # Read Configuration File
+    config = ConfigParser()
+    config.read(os.path.join(this_dir, 'config.ini'))
+
+    factal_token = config.get('Factal', 'token')
+    incident_item_id = config.get('AGOL', 'incident_item_id')
+    topic_layer_id = config.get('AGOL', 'topic_layer_id')
+
+    e = factal.Extractor(factal_token)
+
+    # Bulk Loaded Items Are Recorded in the Sync State & the Watermark Moves to the Newest One
+    if config.get('State', 'path', fallback=''):
+        e.state = factal.SyncState(config.get('State', 'path'), config.getint('State', 'reconcile_hours', fallback=24))
+
+    # One Rate Limiter Shared by Every Window; the Watermark Goes Where runner.py Reads It
+    fetcher = factal.ItemFetcher(
+        factal_token,
+        e.urls['item'],
+        store=e.state if e.state is not None else factal.WatermarkFile(
+            config.get('Fetch', 'watermark_path', fallback='') or os.path.join(this_dir, 'watermark.json')
+        ),
+        page_size=config.getint('Fetch', 'page_size', fallback=250),
+        workers=config.getint('Backfill', 'workers', fallback=4),
+        rate=config.getfloat('Backfill', 'rate', fallback=5)
+    )
+
+    backfill = factal.Backfill(
+        fetcher,
+        config.get('Backfill', 'out_dir', fallback='') or os.path.join(this_dir, 'backfill'),
+        window_hours=config.getfloat('Backfill', 'window_hours', fallback=24),
+        workers=config.getint('Backfill', 'workers', fallback=4),
+        start_param=config.get('Backfill', 'start_param', fallback='updated_date__gte'),
+        end_param=config.get('Backfill', 'end_param', fallback='updated_date__lt'),
+        # History Includes Items That Are No Longer Active
+        params={'active': None if config.getboolean('Backfill', 'include_inactive', fallback=True) else 'True'}
+    )
+
+    failed = backfill.run(args.start, args.end or time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime()))
+
+    if failed:
+        print(f'{len(failed)} Windows Failed; Run Again to Retry Them Before Loading')
+
+    elif not args.skip_load:
+        e.connect(config.get('AGOL', 'agol_url'), config.get('AGOL', 'user_name'), config.get('AGOL', 'password'))
+        e.publisher = factal.Publisher(
+            batch_size=config.getint('Publish', 'batch_size', fallback=500),
+            max_bytes=config.getint('Publish', 'max_bytes', fallback=2000000),
+            retries=config.getint('Publish', 'retries', fallback=3)
+        )
+
+        for response in e.bulk_load(backfill, incident_item_id, topic_layer_id):
+            print(response)
+
+    print(f'Backfill Run Time: {round(((time.time() - start_time) / 60), 2)} Minute(s)')
@@ -1,7 +1,9 @@
 import factal
 
 from configparser import ConfigParser
+import argparse
 import datetime
+import traceback
 import logging
 import time
 import os
@@ -45,6 +47,11 @@ if __name__ == "__main__":
     # Get Start Timie
     start_time = time.time()
 
+    # Run Once (Scheduled Polling) or Keep Running as a Push Receiver With Polling Reconciliation
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--listen', action='store_true', help='Accept pushed items on the [Receiver] endpoint')
+    args = parser.parse_args()
+
     # Get Current Directory
     this_dir = os.path.split(os.path.realpath(__file__))[0]
 
@@ -75,8 +82,95 @@ if __name__ == "__main__":
     # Connect to GIS & Populate with Current Factal API Feed
     e.connect(agol_url, username, password)
 
-    # Run Baseline Solution Logic
-    responses = e.run_solution(incident_item_id, topic_layer_id)
+    # Detect Updated Items From the Local Sync State Instead of Downloading the Incident Layer
+    if config.get('State', 'path', fallback=''):
+        e.state = factal.SyncState(config.get('State', 'path'), config.getint('State', 'reconcile_hours', fallback=24))
+
+    # Page Through Everything Updated Since the Last Run (Watermark Kept in the Sync State, or a File Without One)
+    if config.getboolean('Fetch', 'enabled', fallback=False):
+        e.fetcher = factal.ItemFetcher(
+            factal_token,
+            e.urls['item'],
+            store=e.state if e.state is not None else factal.WatermarkFile(
+                config.get('Fetch', 'watermark_path', fallback='') or os.path.join(this_dir, 'watermark.json')
+            ),
+            page_size=config.getint('Fetch', 'page_size', fallback=250),
+            workers=config.getint('Fetch', 'workers', fallback=4),
+            rate=config.getfloat('Fetch', 'rate', fallback=5),
+            watermark_param=config.get('Fetch', 'watermark_param', fallback='updated_date__gte'),
+            order_by=config.get('Fetch', 'order_by', fallback='id')
+        )
+
+    # Size-Bounded, Retried Edit Batches
+    e.publisher = factal.Publisher(
+        batch_size=config.getint('Publish', 'batch_size', fallback=500),
+        max_bytes=config.getint('Publish', 'max_bytes', fallback=2000000),
+        retries=config.getint('Publish', 'retries', fallback=3)
+    )
+
+    # Send Only the Topic Rows That Changed Instead of Deleting & Re-Adding Every Topic of an Updated Item
+    if config.getboolean('Topics', 'diff_sync', fallback=False):
+        e.topic_sync = factal.TopicSync(e.get_gis_item(topic_layer_id).tables[0], publisher=e.publisher)
+
+    # Archive & Remove Closed or Stale Items So the Live Layers Stay Small
+    retention = None
+    if config.getboolean('Retention', 'enabled', fallback=False):
+        retention = factal.Retention(
+            config.get('Retention', 'archive_dir', fallback=os.path.join(this_dir, 'archive')) or os.path.join(this_dir, 'archive'),
+            max_age_days=config.getint('Retention', 'max_age_days', fallback=30),
+            statuses=[s.strip() for s in config.get('Retention', 'statuses', fallback='').split(',') if s.strip()],
+            status_hours=config.getint('Retention', 'status_hours', fallback=24),
+            batch_size=config.getint('Retention', 'batch_size', fallback=1000)
+        )
+
+    if args.listen:
+
+        def publish(items):
+
+            responses, success = e.publish_items(items, incident_item_id, topic_layer_id)
+            print('\n'.join(responses))
+
+            # A Failed Stream Counts the Batch as Failed; Polling Picks its Items Up Again
+            return success
+
+        # Pushed Items Are Published in Micro-Batches; Polling Still Runs to Catch Anything Missed
+        batcher = factal.MicroBatcher(
+            publish,
+            max_items=config.getint('Receiver', 'max_items', fallback=500),
+            max_seconds=config.getfloat('Receiver', 'max_seconds', fallback=2)
+        )
+        receiver = factal.Receiver(
+            batcher,
+            host=config.get('Receiver', 'host', fallback='127.0.0.1'),
+            port=config.getint('Receiver', 'port', fallback=8765),
+            path=config.get('Receiver', 'path', fallback='/factal'),
+            secret=config.get('Receiver', 'secret', fallback='') or None
+        )
+        receiver.start()
+
+        try:
+            while True:
+                # A Failed Poll is Logged & Retried on the Next One; the Receiver Keeps Running
+                try:
+                    with batcher.lock:
+                        responses = e.run_solution(incident_item_id, topic_layer_id)
+                        if retention:
+                            responses += e.apply_retention(retention, incident_item_id, topic_layer_id)
+                    print('\n'.join(responses))
+                except Exception:
+                    print(f'Polling Run Failed:\n{traceback.format_exc()}')
+
+                time.sleep(60 * config.getfloat('Receiver', 'poll_minutes', fallback=15))
+        except KeyboardInterrupt:
+            receiver.stop()
+
+    else:
+
+        # Run Baseline Solution Logic
+        responses = e.run_solution(incident_item_id, topic_layer_id)
+
+        if retention:
+            responses += e.apply_retention(retention, incident_item_id, topic_layer_id)
 
     # # Write Responses to Logger
     # for response in responses:
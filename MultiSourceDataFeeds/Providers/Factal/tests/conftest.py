@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Runners & the factal Package are Imported From the Factal Folder, the Way runner.bat Runs Them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
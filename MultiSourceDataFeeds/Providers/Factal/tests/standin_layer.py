@@ -0,0 +1,158 @@
+from datetime import datetime, timezone
+import pandas as pd
+import sqlite3
+import json
+import re
+
+
+class Properties(dict):
+    """
+    Layer properties readable as keys or attributes, like the arcgis PropertyMap.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class Feature(object):
+
+    def __init__(self, attributes):
+
+        self.attributes = attributes
+
+
+class FeatureSet(object):
+
+    def __init__(self, features):
+
+        self.features = features
+
+
+class StandInConnection(object):
+    """
+    Connection of a stand-in layer. applyEdits posts are decoded & handed to the layer's edit_features.
+    """
+
+    def __init__(self, lyr):
+
+        self.lyr   = lyr
+        self.posts = []
+
+    def post_multipart(self, path, postdata=None):
+
+        self.posts.append((path, postdata))
+
+        return self.lyr.edit_features(
+            adds=json.loads(postdata['adds']) if 'adds' in postdata else None,
+            updates=json.loads(postdata['updates']) if 'updates' in postdata else None,
+            deletes=postdata.get('deletes'),
+            rollback_on_failure=postdata['rollbackOnFailure'] == 'true'
+        )
+
+
+class StandInLayer(object):
+    """
+    Hosted layer or table kept as a list of attribute dictionaries (dates as epoch milliseconds).
+
+    query evaluates its where clause with SQLite (TIMESTAMP literals become epoch milliseconds) and honours
+    result_record_count, so paging by object ID behaves like a service. edit_features applies adds, updates
+    & deletes; each entry of `responses` is used up by one call: an exception is raised, 'rollback' fails
+    every edit of the call without applying it.
+    """
+
+    def __init__(self, rows=(), name='layer', url=None, oid_field='OBJECTID', date_fields=(), max_record_count=1000):
+
+        self.url        = url or f'https://standin/{name}/FeatureServer/0'
+        self.rows       = [dict(r) for r in rows]
+        self.columns    = list(dict.fromkeys([oid_field] + [k for r in self.rows for k in r]))
+        self.next_oid   = max([r[oid_field] for r in self.rows], default=0) + 1
+        self.responses  = []
+        self.calls      = []
+        self.queries    = 0
+        self._con       = StandInConnection(self)
+        self.properties = Properties(
+            name=name, objectIdField=oid_field, maxRecordCount=max_record_count,
+            fields=[{'name': f, 'type': 'esriFieldTypeDate'} for f in date_fields]
+        )
+
+    @staticmethod
+    def epoch(value):
+
+        return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    def select(self, where):
+
+        oid_field = self.properties.objectIdField
+        where = re.sub(r"TIMESTAMP '([^']+)'", lambda m: str(self.epoch(m.group(1))), where or '1=1')
+
+        con = sqlite3.connect(':memory:')
+        pd.DataFrame(self.rows, columns=self.columns).to_sql('t', con, index=False)
+        oids = {o for (o,) in con.execute(f'SELECT {oid_field} FROM t WHERE {where}')}
+        con.close()
+
+        return [r for r in self.rows if r[oid_field] in oids]
+
+    def query(self, where='1=1', out_fields='*', order_by_fields=None, result_record_count=None, return_geometry=True):
+
+        self.queries += 1
+        oid_field = self.properties.objectIdField
+        rows = sorted(self.select(where), key=lambda r: r[oid_field])[:result_record_count]
+
+        if out_fields != '*':
+            rows = [{f: r.get(f) for f in out_fields.split(',')} for r in rows]
+
+        return FeatureSet([Feature(dict(r)) for r in rows])
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=True):
+
+        self.calls.append({'adds': adds, 'updates': updates, 'deletes': deletes})
+        oid_field = self.properties.objectIdField
+
+        response = self.responses.pop(0) if self.responses else None
+        if isinstance(response, Exception):
+            raise response
+
+        if response == 'rollback':
+            return {'addResults': [{'objectId': None, 'success': False} for _ in adds or []],
+                    'updateResults': [{'objectId': f['attributes'].get(oid_field), 'success': False} for f in updates or []],
+                    'deleteResults': []}
+
+        add_results = []
+        for feature in adds or []:
+            self.rows.append(dict(feature['attributes'], **{oid_field: self.next_oid}))
+            self.columns += [k for k in feature['attributes'] if k not in self.columns]
+            add_results.append({'objectId': self.next_oid, 'success': True})
+            self.next_oid += 1
+
+        update_results = []
+        for feature in updates or []:
+            oid = feature['attributes'][oid_field]
+            matches = [r for r in self.rows if r[oid_field] == oid]
+            for r in matches:
+                r.update(feature['attributes'])
+            update_results.append({'objectId': oid, 'success': bool(matches)})
+
+        delete_results = []
+        if deletes:
+            oids = [int(o) for o in str(deletes).split(',')]
+            delete_results = self.delete(oids)
+
+        return {'addResults': add_results, 'updateResults': update_results, 'deleteResults': delete_results}
+
+    def delete(self, oids):
+
+        oid_field = self.properties.objectIdField
+        present = {r[oid_field] for r in self.rows}
+        self.rows = [r for r in self.rows if r[oid_field] not in oids]
+
+        return [{'objectId': o, 'success': o in present} for o in oids]
+
+    def delete_features(self, deletes=None, where=None):
+
+        oid_field = self.properties.objectIdField
+        oids = [int(o) for o in str(deletes).split(',')] if deletes else [r[oid_field] for r in self.select(where)]
+
+        return {'deleteResults': self.delete(oids)}
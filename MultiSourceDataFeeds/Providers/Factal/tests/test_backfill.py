@@ -0,0 +1,109 @@
+from factal.backfill import Backfill
+from factal.factal import Extractor
+from factal.publisher import Publisher
+from parse_benchmark import synthetic_items
+from standin_layer import StandInLayer
+import pandas as pd
+import json
+
+
+class WindowFetcher(object):
+
+    """ Serves Items by updated_date Window; Windows Starting at a Date in `fail` Raise Once """
+
+    def __init__(self, items, fail=()):
+
+        self.item_list = items
+        self.fail      = set(fail)
+        self.requests  = []
+        self.commits   = 0
+
+    def items(self, **params):
+
+        start, end = pd.Timestamp(params['updated_date__gte']), pd.Timestamp(params['updated_date__lt'])
+        self.requests.append(start)
+
+        if start in self.fail:
+            self.fail.discard(start)
+            raise Exception('Fetching Factal Items Returned Status: 503')
+
+        return [i for i in self.item_list if start <= pd.Timestamp(i['updated_date']) < end]
+
+    def commit(self):
+
+        self.commits += 1
+
+
+def located(items):
+
+    # Every Item Gets a Location so it Reaches the Items Frame
+    for i in items:
+        i['topics'][0]['topic'].update(kind='location', category='Town')
+
+    return items
+
+
+def dated(items, dates):
+
+    for i, date in zip(items, dates):
+        i['updated_date'] = date
+        for t in i['topics']:
+            t['topic']['latest_item_date'] = date
+
+    return items
+
+
+def test_windows_resume_from_the_checkpoint(tmp_path):
+
+    items = dated(located(synthetic_items(3)), ['2024-01-01T06:00:00Z', '2024-01-02T06:00:00Z', '2024-01-03T06:00:00Z'])
+    fetcher = WindowFetcher(items, fail=[pd.Timestamp('2024-01-02', tz='UTC')])
+    backfill = Backfill(fetcher, str(tmp_path), window_hours=24, workers=2)
+
+    failed = backfill.run('2024-01-01', '2024-01-04')
+
+    assert failed == [(pd.Timestamp('2024-01-02', tz='UTC'), pd.Timestamp('2024-01-03', tz='UTC'))]
+    assert len(json.load(open(tmp_path / 'checkpoint.json'))) == 2
+
+    # Only the Failed Window is Requested Again
+    fetcher.requests = []
+    assert backfill.run('2024-01-01', '2024-01-04') == []
+    assert fetcher.requests == [pd.Timestamp('2024-01-02', tz='UTC')]
+
+    itm_df, _ = backfill.frames()
+    assert sorted(itm_df['id']) == sorted(str(i['id']) for i in items)
+
+
+def test_items_seen_in_two_windows_keep_their_newest_version(tmp_path):
+
+    # Both Versions Share the Item ID; the Newer One Lost a Topic
+    old, new = located(synthetic_items(1)), located(synthetic_items(1))
+    old = dated(old, ['2024-01-01T06:00:00Z'])
+    new = dated(new, ['2024-01-02T06:00:00Z'])
+    new[0]['topics'] = new[0]['topics'][:1]
+
+    backfill = Backfill(WindowFetcher(old + new), str(tmp_path), window_hours=24)
+    backfill.run('2024-01-01', '2024-01-03')
+    itm_df, topic_df = backfill.frames()
+
+    assert itm_df['updated_date'].tolist() == ['2024-01-02T06:00:00Z']
+    assert topic_df['latest_item_date'].tolist() == ['2024-01-02T06:00:00Z']
+
+
+def test_bulk_load_adds_missing_rows_and_moves_the_watermark(tmp_path):
+
+    items = dated(located(synthetic_items(4)), ['2024-01-01T06:00:00Z'] * 4)
+    fetcher = WindowFetcher(items)
+    backfill = Backfill(fetcher, str(tmp_path), window_hours=24)
+    backfill.run('2024-01-01', '2024-01-02')
+
+    lyr = StandInLayer([{'OBJECTID': 1, 'id': str(items[0]['id'])}], name='items')
+    tbl = StandInLayer(name='topics')
+
+    e = Extractor('token')
+    e.publisher = Publisher(backoff=0)
+    e.gis_items = {'items': type('Item', (), {'layers': [lyr]}), 'topics': type('Item', (), {'tables': [tbl]})}
+
+    responses = e.bulk_load(backfill, 'items', 'topics')
+
+    assert responses == ['items: Items Backfilled 3', f"topics: Topics Backfilled {sum(len(i['topics']) for i in items)}"]
+    assert len(lyr.rows) == 4 and fetcher.commits == 1
@@ -0,0 +1,60 @@
+from factal.columnar import parse_columns
+from factal.factal import Extractor
+from parse_benchmark import synthetic_items
+import pandas as pd
+
+
+def row_wise(items):
+
+    itms, topics = Extractor(None).parse_items(items)
+
+    return pd.DataFrame(itms), pd.DataFrame(topics)
+
+
+def assert_same(items):
+
+    row_itm_df, row_topic_df = row_wise(items)
+    col_itm_df, col_topic_df = parse_columns(items)
+
+    pd.testing.assert_frame_equal(row_itm_df[col_itm_df.columns], col_itm_df, check_dtype=False)
+    pd.testing.assert_frame_equal(row_topic_df[col_topic_df.columns], col_topic_df, check_dtype=False)
+
+    return col_itm_df, col_topic_df
+
+
+def test_columnar_parse_matches_parse_items():
+
+    itm_df, topic_df = assert_same(synthetic_items(300, seed=3))
+
+    assert len(topic_df) > len(itm_df) > 0
+
+
+def test_items_without_a_location_keep_their_topics_only():
+
+    items = synthetic_items(3, seed=1)
+    items[0]['topics'][0]['topic'].update(kind='location', category='Town')
+    for topic in items[1]['topics']:
+        topic['topic']['kind'] = 'tag'
+    items[2]['topics'] = []
+
+    itm_df, topic_df = assert_same(items)
+
+    assert itm_df['id'].tolist() == [str(items[0]['id'])]
+    assert set(topic_df['item_id']) == {str(items[0]['id']), str(items[1]['id'])}
+
+
+def test_blank_urls_point_to_the_tweet():
+
+    items = synthetic_items(1)
+    items[0]['url'] = ''
+
+    itm_df, _ = assert_same(items)
+
+    assert itm_df['url'].iloc[0] == f"https://twitter.com/status/{items[0]['tweet_id']}"
+
+
+def test_no_items():
+
+    itm_df, topic_df = parse_columns(iter([]))
+
+    assert itm_df.empty and topic_df.empty
@@ -0,0 +1,91 @@
+from factal.fetcher import ItemFetcher, WatermarkFile
+import pandas as pd
+
+
+class Response(object):
+
+    def __init__(self, body):
+
+        self.status_code = 200
+        self.body        = body
+
+    def json(self):
+
+        return self.body
+
+
+def fetcher(store, items, page_size=2, page_overlap=0, change=None, workers=4):
+
+    f = ItemFetcher('token', 'https://factal/item', store=store, page_size=page_size, page_overlap=page_overlap,
+                    rate=0, workers=workers)
+    f.requests = []
+
+    # change(items) Runs After the First Page, Like Edits Made While the Fetch is Paging
+    def get(url, params=None):
+        f.requests.append(params)
+        page = items[params['offset']:params['offset'] + params['limit']]
+        count = len(items)
+        if change and len(f.requests) == 1:
+            change(items)
+        return Response({'count': count, 'results': page})
+
+    f.session.get = get
+
+    return f
+
+
+def test_pages_are_fetched_in_order_from_the_watermark(tmp_path):
+
+    store = WatermarkFile(str(tmp_path / 'watermark.json'))
+    store.set_meta('watermark', '2024-01-01T00:10:00+00:00')
+
+    items = [{'id': i, 'updated_date': f'2024-01-01T00:{i:02d}:00Z'} for i in range(11, 16)]
+    f = fetcher(store, items)
+
+    assert [i['id'] for i in f.items()] == [11, 12, 13, 14, 15]
+    assert [r['offset'] for r in f.requests] == [0, 2, 4]
+
+    # The Mark Steps Back by the Overlap
+    assert f.requests[0]['updated_date__gte'] == '2024-01-01T00:05:00+00:00'
+
+
+def test_watermark_file_keeps_the_mark_between_processes(tmp_path):
+
+    path = str(tmp_path / 'watermark.json')
+    f = fetcher(WatermarkFile(path), [{'id': 1, 'updated_date': '2024-01-02T00:00:00Z'}])
+
+    list(f.items())
+    f.commit()
+
+    assert pd.Timestamp(fetcher(WatermarkFile(path), []).watermark) == pd.Timestamp('2024-01-02', tz='UTC')
+
+
+def test_unreadable_watermark_file_starts_over(tmp_path):
+
+    path = tmp_path / 'watermark.json'
+    path.write_text('{')
+
+    assert WatermarkFile(str(path)).get_meta('watermark') is None
+
+
+def test_missing_store_is_reported(capsys):
+
+    fetcher(None, [])
+
+    assert 'No Store for the Fetch Watermark' in capsys.readouterr().out
+
+
+def test_items_leaving_or_joining_mid_fetch_are_not_skipped(tmp_path):
+
+    items = [{'id': i, 'updated_date': '2024-01-01T00:00:00Z'} for i in range(1, 13)]
+
+    # Item 2 Closes & Item 13 is Created After the Count Was Taken
+    def change(items):
+        items.pop(1)
+        items.append({'id': 13, 'updated_date': '2024-01-01T00:01:00Z'})
+
+    f = fetcher(None, items, page_size=4, page_overlap=1, change=change, workers=1)
+    ids = [i['id'] for i in f.items()]
+
+    assert sorted(ids) == list(range(1, 14)) and len(ids) == len(set(ids))
+    assert all(r['order_by'] == 'id' for r in f.requests)
@@ -0,0 +1,74 @@
+from factal.factal import Extractor
+from factal.index import IdIndex
+from factal.state import SyncState
+from standin_layer import StandInLayer
+import pandas as pd
+
+
+def items_layer():
+
+    return StandInLayer([
+        {'OBJECTID': 1, 'id': '10', 'updated_date': 1700000000000},
+        {'OBJECTID': 2, 'id': '11', 'updated_date': 1700000060000},
+        {'OBJECTID': 3, 'id': '12', 'updated_date': 1700000120000},
+    ], name='items', max_record_count=2)
+
+
+def test_refresh_pages_by_object_id():
+
+    lyr = items_layer()
+    index = IdIndex(lyr, 'id', 'updated_date')
+
+    # Two Full Pages of at Most Two Rows, Then the Empty Page Ending the Scan
+    assert lyr.queries == 3
+    assert index.ids() == {'10', '11', '12'}
+    assert index.oids([11, 12]) == [2, 3]
+    assert index.frame['updated_date'].iloc[0] == pd.Timestamp(1700000000000, unit='ms', tz='UTC')
+
+
+def test_record_adds_updates_and_deletes():
+
+    index = IdIndex(items_layer(), 'id')
+    sdf = pd.DataFrame({'id': ['13', '14']})
+
+    index.record('add', sdf, [{'success': True, 'objectId': 4}, {'success': False, 'objectId': None}])
+    index.record('delete', None, [{'success': True, 'objectId': 1}])
+
+    assert index.ids() == {'11', '12', '13'}
+    assert len(index.missing(pd.DataFrame({'id': [11, 14]}))) == 1
+
+
+def test_index_built_without_dates_gains_them_for_reconcile(tmp_path):
+
+    lyr = items_layer()
+    e = Extractor('token')
+
+    # add Builds the Index First, Without the Time Field
+    e.get_index(lyr, 'id')
+    index = e.get_index(lyr, 'id', 'updated_date')
+
+    assert index is e.indexes[lyr.url]
+    assert index.time_field == 'updated_date'
+
+    state = SyncState(str(tmp_path / 'state.db'))
+    state.reconcile(index)
+
+    assert state.lookup(['10'])['updated_date'].tolist() == [1700000000000]
+
+
+def test_updates_without_state_come_from_the_index():
+
+    lyr = items_layer()
+    e = Extractor('token')
+    e.publisher.backoff = 0
+
+    sdf = pd.DataFrame({'id': ['10', '11', '13'], 'content': ['a', 'b', 'c'],
+                        'updated_date': pd.to_datetime([1700000000000, 1700000090000, 1700000000000], unit='ms', utc=True)})
+
+    assert e.update_items(lyr, sdf, 'id', 'updated_date')[0] == 1
+    queries = lyr.queries
+
+    # The Second Batch Finds Item 11 Already Current Without Reading the Layer Again
+    assert e.update_items(lyr, sdf, 'id', 'updated_date') == ('0', None)
+    assert lyr.queries == queries
+    assert [r['content'] for r in lyr.rows if r['OBJECTID'] == 2] == ['b']
@@ -0,0 +1,79 @@
+from factal.factal import Extractor
+from factal.publisher import Publisher, PushError
+from factal.index import IdIndex
+from factal.state import SyncState
+from standin_layer import StandInLayer
+import pandas as pd
+import requests
+import pytest
+
+
+def items(count):
+
+    return pd.DataFrame({'id': [str(i) for i in range(count)],
+                         'updated_date': pd.Timestamp('2024-01-01', tz='UTC'),
+                         'content': 'text'})
+
+
+def test_transport_errors_and_5xx_are_retried():
+
+    lyr = StandInLayer()
+    lyr.responses = [requests.exceptions.ConnectionError('reset'), Exception('Unable to add.\n(Error Code: 503)')]
+
+    results = Publisher(backoff=0).push(lyr, items(2), 'add')
+
+    assert [r['success'] for r in results] == [True, True]
+    assert len(lyr.calls) == 3
+
+
+def test_rolled_back_batch_is_not_retried():
+
+    lyr = StandInLayer()
+    lyr.responses = ['rollback']
+
+    results = Publisher(backoff=0).push(lyr, items(2), 'add')
+
+    assert [r['success'] for r in results] == [False, False]
+    assert len(lyr.calls) == 1
+
+
+def test_failed_batch_reports_the_batches_already_applied():
+
+    lyr = StandInLayer()
+    lyr.responses = [None, Exception('Unable to add.\n(Error Code: 400)')]
+
+    with pytest.raises(PushError) as push_exc:
+        Publisher(batch_size=2, backoff=0).push(lyr, items(5), 'add')
+
+    assert [r['success'] for r in push_exc.value.results] == [True, True, False, False, False]
+    assert len(lyr.calls) == 2 and len(lyr.rows) == 2
+
+
+def test_push_edits_records_applied_batches_and_marks_the_state_dirty(tmp_path):
+
+    lyr = StandInLayer(name='items')
+    lyr.responses = [None, Exception('Unable to add.\n(Error Code: 400)')]
+
+    e = Extractor('token')
+    e.publisher = Publisher(batch_size=2, backoff=0)
+    index = IdIndex(lyr, 'id', 'updated_date')
+    state = SyncState(str(tmp_path / 'state.db'))
+    state.set_meta('dirty', 0)
+
+    with pytest.raises(PushError):
+        e.push_edits(lyr, items(3), 'add', index=index, state=state)
+
+    assert index.ids() == {'0', '1'}
+    assert state.lookup(['0', '1', '2'])['oid'].tolist() == [1, 2]
+    assert state.get_meta('dirty') == '1'
+
+
+def test_streams_report_results_and_errors_separately():
+
+    def fail():
+        raise ValueError('bad stream')
+
+    results = Publisher().run_streams({'ok': lambda: 3, 'bad': fail})
+
+    assert results['ok']['success'] and results['ok']['result'] == 3
+    assert not results['bad']['success'] and 'bad stream' in results['bad']['error']
@@ -0,0 +1,71 @@
+from factal.receiver import MicroBatcher, Receiver, items_from_payload, replay
+import requests
+import pytest
+
+
+def item(i, updated='2024-01-01'):
+
+    return {'id': i, 'updated_date': updated, 'topics': []}
+
+
+def test_payloads_are_one_item_a_list_or_a_page():
+
+    assert items_from_payload(item(1)) == [item(1)]
+    assert items_from_payload({'results': [item(1), item(2)]}) == [item(1), item(2)]
+
+    with pytest.raises(ValueError):
+        items_from_payload([{'id': 1}])
+
+
+def test_batches_coalesce_items_by_id():
+
+    batches = []
+    batcher = MicroBatcher(batches.append, max_items=10, max_seconds=60)
+
+    batcher.add([item(1, '2024-01-02'), item(2)])
+    batcher.add([item(1, '2024-01-01'), item(3)])
+    batcher.start()
+    batcher.stop()
+
+    assert [[(i['id'], i['updated_date']) for i in b] for b in batches] == [[(1, '2024-01-02'), (2, '2024-01-01'), (3, '2024-01-01')]]
+    assert batcher.stats == {'received': 4, 'coalesced': 1, 'batches': 1, 'failed': 0}
+
+
+def test_batches_the_handler_reports_failed_are_counted_as_failed():
+
+    results = iter([False, True])
+    batcher = MicroBatcher(lambda items: next(results))
+
+    batcher.flush([item(1)])
+    batcher.flush([item(2)])
+
+    assert batcher.stats['failed'] == 1 and batcher.stats['batches'] == 1
+
+
+def test_handler_errors_are_counted_as_failed():
+
+    def fail(items):
+        raise RuntimeError('layer unavailable')
+
+    batcher = MicroBatcher(fail)
+    batcher.flush([item(1)])
+
+    assert batcher.stats['failed'] == 1 and batcher.stats['batches'] == 0
+
+
+def test_receiver_accepts_authorized_posts():
+
+    batches = []
+    receiver = Receiver(MicroBatcher(batches.append, max_seconds=0.1), port=0, secret='s3cret')
+    receiver.start()
+
+    url = f'http://127.0.0.1:{receiver.server.server_port}/factal'
+
+    try:
+        assert requests.post(url, json=[item(1)]).status_code == 401
+        assert requests.post(url, json={'nope': 1}, headers={'Authorization': 'Token s3cret'}).status_code == 400
+        assert len(replay(url, [item(i) for i in range(5)], batch_size=2, secret='s3cret')) == 3
+    finally:
+        receiver.stop()
+
+    assert sorted(i['id'] for b in batches for i in b) == [0, 1, 2, 3, 4]
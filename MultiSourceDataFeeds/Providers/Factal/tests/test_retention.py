@@ -0,0 +1,75 @@
+from factal.factal import Extractor
+from factal.retention import Retention
+import factal.retention as retention
+from standin_layer import StandInLayer
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+import glob
+
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def epoch(value):
+
+    return int(pd.Timestamp(value, tz='UTC').timestamp() * 1000)
+
+
+OLD = epoch(NOW - timedelta(days=60))
+NEW = epoch(NOW - timedelta(days=1))
+
+
+def layers():
+
+    lyr = StandInLayer([
+        {'OBJECTID': 1, 'id': '1', 'updated_date': OLD, 'status': 'published'},
+        {'OBJECTID': 2, 'id': '2', 'updated_date': NEW, 'status': 'published'},
+        {'OBJECTID': 3, 'id': '3', 'updated_date': NEW, 'status': 'closed'},
+        {'OBJECTID': 4, 'id': '4', 'updated_date': epoch(NOW - timedelta(hours=1)), 'status': 'closed'},
+    ], name='items', date_fields=['updated_date'], max_record_count=1)
+
+    # Topic Rows Leave With Their Item, Whatever Their Own Date
+    tbl = StandInLayer([
+        {'OBJECTID': 1, 'item_id': '1', 'id': 10, 'latest_item_date': OLD},
+        {'OBJECTID': 2, 'item_id': '2', 'id': 10, 'latest_item_date': OLD},
+        {'OBJECTID': 3, 'item_id': '3', 'id': 11, 'latest_item_date': NEW},
+    ], name='topics', date_fields=['latest_item_date'])
+
+    return lyr, tbl
+
+
+def test_expired_items_and_their_topics_are_archived_then_deleted(tmp_path):
+
+    lyr, tbl = layers()
+    items, topics = Retention(str(tmp_path), statuses=['closed'], status_hours=12, batch_size=1).run(lyr, tbl, now=NOW)
+
+    assert sorted(items['id']) == ['1', '3']
+    assert sorted(topics['item_id']) == ['1', '3']
+    assert [r['id'] for r in lyr.rows] == ['2', '4']
+    assert [r['item_id'] for r in tbl.rows] == ['2']
+
+    archived = pd.concat([pd.read_parquet(p) for p in glob.glob(str(tmp_path / 'items_*.parquet'))])
+    assert sorted(archived['id']) == ['1', '3']
+    assert str(archived['updated_date'].dt.tz) == 'UTC'
+
+
+def test_apply_retention_drops_deleted_rows_from_the_index(tmp_path):
+
+    lyr, tbl = layers()
+    e = Extractor('token')
+    e.gis_items = {'items': type('Item', (), {'layers': [lyr]}), 'topics': type('Item', (), {'tables': [tbl]})}
+    index = e.get_index(lyr, 'id')
+
+    responses = e.apply_retention(Retention(str(tmp_path)), 'items', 'topics')
+
+    assert responses == ['items: Items Expired 1', 'topics: Topics Expired 1']
+    assert index.ids() == {'2', '3', '4'}
+
+
+def test_missing_parquet_engine_is_reported_up_front(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(retention.importlib.util, 'find_spec', lambda name: None)
+
+    with pytest.raises(ImportError, match='pyarrow or fastparquet'):
+        Retention(str(tmp_path))
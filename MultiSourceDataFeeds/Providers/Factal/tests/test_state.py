@@ -0,0 +1,59 @@
+from factal.state import SyncState
+from datetime import datetime, timedelta
+import pandas as pd
+
+
+def frame(ids, dates, content):
+
+    return pd.DataFrame({'id': ids, 'updated_date': pd.to_datetime(dates, utc=True, format='ISO8601'), 'content': content})
+
+
+def pushed(tmp_path):
+
+    state = SyncState(str(tmp_path / 'state.db'))
+    sdf = frame([1, 2], ['2024-01-01 00:00:00', '2024-01-01 00:00:00'], ['a', 'b'])
+    state.record(sdf, 'id', 'updated_date', [{'success': True, 'objectId': 7}, {'success': True, 'objectId': 8}])
+
+    return state
+
+
+def test_changes_returns_newer_or_edited_rows_with_object_ids(tmp_path):
+
+    state = pushed(tmp_path)
+
+    # Item 1 is Newer Once Ceiled to the Second, Item 2 Only Changed Content     # Sub-Second Changes Are Ceiled Like the Hosted Layer; Only a Content Change Marks Item 2 Item 3 Was Never Pushed
+    incoming = frame(['1', '2', '3'], ['2024-01-01 00:00:00.4', '2024-01-01 00:00:00', '2024-01-02'], ['a', 'c', 'd'])
+    changed = state.changes(incoming, 'id', 'updated_date')
+
+    assert changed['id'].tolist() == ['1', '2']
+    assert changed['OBJECTID'].tolist() == [7, 8]
+
+    incoming = frame(['1'], ['2024-01-01 00:00:00'], ['a'])
+    assert state.changes(incoming, 'id', 'updated_date').empty
+
+
+def test_failed_edit_is_not_stored_and_flags_a_reconcile(tmp_path):
+
+    state = pushed(tmp_path)
+    state.set_meta('last_reconcile', datetime.utcnow().isoformat())
+    state.set_meta('dirty', 0)
+
+    assert not state.needs_reconcile()
+
+    sdf = frame([3], ['2024-01-02'], ['c'])
+    state.record(sdf, 'id', 'updated_date', [{'success': False, 'objectId': None}])
+
+    assert state.lookup(['3']).empty
+    assert state.needs_reconcile()
+
+
+def test_reconcile_window_and_forget(tmp_path):
+
+    state = pushed(tmp_path)
+    state.set_meta('last_reconcile', (datetime.utcnow() - timedelta(hours=25)).isoformat())
+    state.set_meta('dirty', 0)
+
+    assert state.needs_reconcile()
+
+    state.forget([1])
+    assert state.lookup(['1', '2'])['id'].tolist() == ['2']
@@ -0,0 +1,75 @@
+from factal.topics import TopicSync
+from factal.publisher import Publisher
+from standin_layer import StandInLayer
+import pandas as pd
+
+
+def topic_table():
+
+    row = {'relevance': 0.5, 'name': 'Paris', 'description': ' ', 'latest_item_date': 1700000000000}
+
+    return StandInLayer([
+        dict(row, OBJECTID=1, item_id='1', id=10),
+        dict(row, OBJECTID=2, item_id='1', id=11),
+        dict(row, OBJECTID=3, item_id='1', id=12),
+        dict(row, OBJECTID=4, item_id='1', id=12),
+        dict(row, OBJECTID=5, item_id='2', id=10),
+    ], name='topics', max_record_count=2)
+
+
+def incoming(rows):
+
+    return pd.DataFrame([dict({'relevance': 0.5, 'name': 'Paris', 'description': ' ',
+                               'latest_item_date': pd.Timestamp(1700000000000, unit='ms', tz='UTC')}, **r) for r in rows])
+
+
+def test_diff_only_touches_the_items_in_the_frame():
+
+    sync = TopicSync(topic_table(), publisher=Publisher(backoff=0))
+
+    # Topic 10 is Unchanged, 11 Moved, 12 is Gone (With a Duplicate Row) & 13 is New
+    adds, upds, dels = sync.diff(incoming([
+        {'item_id': '1', 'id': 10},
+        {'item_id': '1', 'id': 11, 'relevance': 0.9},
+        {'item_id': '1', 'id': 13},
+    ]))
+
+    assert adds['id'].tolist() == [13]
+    assert upds[['id', 'OBJECTID']].values.tolist() == [[11, 2]]
+    assert sorted(dels) == [3, 4]
+
+
+def test_sync_applies_the_edits_and_keeps_the_index_current():
+
+    tbl = topic_table()
+    sync = TopicSync(tbl, publisher=Publisher(backoff=0))
+
+    counts = sync.sync(incoming([
+        {'item_id': '1', 'id': 10},
+        {'item_id': '1', 'id': 11, 'relevance': 0.9},
+        {'item_id': '1', 'id': 13},
+    ]))
+
+    assert counts == {'adds': 1, 'updates': 1, 'deletes': 2}
+    assert sorted((r['item_id'], r['id']) for r in tbl.rows) == [('1', 10), ('1', 11), ('1', 13), ('2', 10)]
+    assert [r['relevance'] for r in tbl.rows if r['id'] == 11] == [0.9]
+
+    # A Second Sync of the Same Frame Has Nothing Left to Send
+    assert sync.sync(incoming([
+        {'item_id': '1', 'id': 10},
+        {'item_id': '1', 'id': 11, 'relevance': 0.9},
+        {'item_id': '1', 'id': 13},
+    ])) == {'adds': 0, 'updates': 0, 'deletes': 0}
+
+
+def test_a_newer_item_date_rewrites_its_topic_rows():
+
+    tbl = topic_table()
+    sync = TopicSync(tbl, publisher=Publisher(backoff=0))
+    newer = pd.Timestamp('2024-01-01 00:00:00.123456', tz='UTC')
+
+    counts = sync.sync(incoming([{'item_id': '2', 'id': 10, 'latest_item_date': newer}]))
+
+    assert counts == {'adds': 0, 'updates': 1, 'deletes': 0}
+    assert [r['latest_item_date'] for r in tbl.rows if r['OBJECTID'] == 5] == [1704067200123]
+    assert sync.diff(incoming([{'item_id': '2', 'id': 10, 'latest_item_date': newer}]))[1].empty
@@ -0,0 +1,129 @@
+import pandas as pd
+import numpy as np
+import os
+
+
+class AnomalyDetector(object):
+    """
+    Streaming detector of sharp shifts in a country's tone or Goldstein scale.
+
+    Every (action geo country, quad class) key keeps an exponentially weighted mean & variance of
+    its per-slice average avgtone & goldsteinscale. A slice average more than `threshold` standard
+    deviations away from the baseline of a key with at least `min_periods` observations is reported
+    as an anomaly before the baseline is updated. State is O(1) per key & persisted to a .csv file,
+    so the cost of a run only depends on the size of the slice.
+    """
+
+    stats = ['avgtone', 'goldsteinscale']
+    keys  = ['actiongeo_countrycode', 'quadclass']
+
+    def __init__(self, path, alpha=0.05, threshold=3.0, min_periods=48, min_events=5):
+
+        self.path        = path
+        self.alpha       = alpha
+        self.threshold   = threshold
+        self.min_periods = min_periods
+        self.min_events  = min_events
+        self.anomalies   = pd.DataFrame()
+
+        self.state = self.load()
+
+    def empty_state(self):
+
+        columns = ['periods'] + [f'{s}_{m}' for s in self.stats for m in ['mean', 'var']]
+
+        state = pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=self.keys), dtype='float64')
+        state['last_update'] = pd.Series(dtype='datetime64[ns]')
+
+        return state
+
+    def load(self):
+
+        if not os.path.exists(self.path):
+            return self.empty_state()
+
+        state = pd.read_csv(self.path, dtype={'actiongeo_countrycode': str, 'quadclass': str},
+                            keep_default_na=False, na_values=[''])
+        state['last_update'] = pd.to_datetime(state['last_update'])
+
+        print(f'Loaded Anomaly Baselines for {len(state)} Keys')
+
+        return state.set_index(self.keys)
+
+    def save(self):
+
+        self.state.reset_index().to_csv(self.path, index=False)
+
+    def slice_means(self, df):
+        """
+        Average the raw event frame per key; keys with fewer than min_events events are skipped.
+        """
+
+        df = df.dropna(subset=['actiongeo_countrycode'])
+        keys = [df['actiongeo_countrycode'].astype(str), df['quadclass'].astype(str)]
+
+        grouped = df[self.stats].astype('float64').groupby(keys)
+        means = grouped.mean()
+        means['events'] = grouped.size()
+        means.index.names = self.keys
+
+        return means[means['events'] >= self.min_events]
+
+    def update(self, df, extracted_date):
+        """
+        Score a raw event frame against the baselines, keep the anomalies in self.anomalies & fold
+        the slice into the baselines. Slices that are not newer than the last update are ignored.
+        """
+
+        extracted_date = pd.to_datetime(extracted_date)
+        self.anomalies = pd.DataFrame()
+
+        if len(self.state) and extracted_date <= self.state['last_update'].max():
+            print(f'Anomaly Baselines Already Include {extracted_date}')
+            return self.anomalies
+
+        means = self.slice_means(df)
+        state = self.state.reindex(self.state.index.union(means.index))
+        state['periods'] = state['periods'].fillna(0)
+
+        found = []
+        for stat in self.stats:
+            value = means[stat].reindex(state.index)
+            mean, var = state[f'{stat}_mean'], state[f'{stat}_var']
+
+            # Score Against the Baseline Before the Slice is Added to it
+            with np.errstate(divide='ignore', invalid='ignore'):
+                zscore = (value - mean) / np.sqrt(var)
+
+            flagged = (state['periods'] >= self.min_periods) & (zscore.abs() >= self.threshold) & np.isfinite(zscore)
+            if flagged.any():
+                found.append(pd.DataFrame({
+                    'stat': stat,
+                    'value': value[flagged].round(2),
+                    'baseline': mean[flagged].round(2),
+                    'std': np.sqrt(var[flagged]).round(2),
+                    'zscore': zscore[flagged].round(2),
+                    'events': means['events'].reindex(state.index)[flagged]
+                }))
+
+            # Exponentially Weighted Update; New Keys Start From Their First Value With No Variance
+            observed = value.notna()
+            diff = (value - mean).fillna(0)
+            incr = self.alpha * diff
+            state.loc[observed, f'{stat}_var'] = ((1 - self.alpha) * (var + diff * incr)).fillna(0)[observed]
+            state.loc[observed, f'{stat}_mean'] = (mean + incr).fillna(value)[observed]
+
+        observed = state.index.isin(means.index)
+        state.loc[observed, 'periods'] += 1
+        state.loc[observed, 'last_update'] = extracted_date
+
+        self.state = state
+        self.save()
+
+        if found:
+            self.anomalies = pd.concat(found).reset_index()
+            self.anomalies['extracted_date'] = extracted_date
+
+        print(f'Scored {len(means)} Country/Quad Class Keys: {len(self.anomalies)} Anomalies')
+
+        return self.anomalies
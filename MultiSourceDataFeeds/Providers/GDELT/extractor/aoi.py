@@ -0,0 +1,219 @@
+from arcgis.features import GeoAccessor
+
+import pandas as pd
+import numpy as np
+import json
+
+
+class Polygon(object):
+    """
+    Polygon prepared for vectorized point-in-polygon tests. All rings are kept as one array of edges
+    and tested with the even-odd rule, so holes (GeoJSON interior rings, Esri counter-clockwise rings)
+    are handled without knowing which ring is which.
+    """
+
+    # Max Number of Point/Edge Pairs Compared at Once
+    block_size = 2000000
+
+    def __init__(self, rings):
+
+        rings = [np.asarray(r, dtype='float64')[:, :2] for r in rings if len(r)]
+        rings = [r if np.array_equal(r[0], r[-1]) else np.vstack([r, r[:1]]) for r in rings]
+
+        # Skip Degenerate Rings (Fewer Than 3 Distinct Vertices Enclose No Area)
+        rings = [r for r in rings if len(np.unique(r[:-1], axis=0)) > 2]
+
+        if not rings:
+            raise ValueError('AOI Polygon Has No Ring With at Least 3 Distinct Vertices')
+
+        edges = np.vstack([np.hstack([r[:-1], r[1:]]) for r in rings])
+        self.x1, self.y1, self.x2, self.y2 = edges.T
+
+        points = np.vstack(rings)
+        self.extent = (points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max())
+
+    def contains(self, x, y):
+        """
+        Return a boolean mask of the points that fall inside the polygon.
+        """
+
+        inside = np.zeros(len(x), dtype=bool)
+
+        step = max(self.block_size // len(self.x1), 1)
+
+        for i in range(0, len(x), step):
+            px = x[i:i + step, None]
+            py = y[i:i + step, None]
+
+            # Count Edge Crossings of a Ray Cast East From Each Point
+            with np.errstate(divide='ignore', invalid='ignore'):
+                crosses = ((self.y1 > py) != (self.y2 > py)) & \
+                          (px < (self.x2 - self.x1) * (py - self.y1) / (self.y2 - self.y1) + self.x1)
+
+            inside[i:i + step] = np.count_nonzero(crosses, axis=1) % 2 == 1
+
+        return inside
+
+
+class AreaOfInterest(object):
+    """
+    Area of interest used to discard GDELT events before they are decoded, flattened and enriched.
+
+    The area is the union of any number of bounding boxes, polygons (GeoJSON or shapefile, in WGS84)
+    and countries. Countries are matched on the raw FIPS 10-4 actiongeo_countrycode values; see
+    lookups/country_fips.txt. Polygons are registered in a grid index of cell_size degrees so each
+    point is only tested against the polygons whose extent overlaps its cell.
+    """
+
+    def __init__(self, cell_size=1.0):
+
+        self.cell_size = cell_size
+        self.n_rows    = int(np.ceil(180 / cell_size)) + 1
+        self.polygons  = []
+        self.countries = set()
+        self.index     = {}
+
+    @classmethod
+    def from_config(cls, config, section='AOI'):
+        """
+        Build an area of interest from a config.ini section. Returns None if nothing is configured.
+
+            bbox      = xmin, ymin, xmax, ymax; xmin, ymin, xmax, ymax
+            geojson   = C:\\Temp\\GDELT\\aoi.geojson
+            shapefile = C:\\Temp\\GDELT\\aoi.shp
+            countries = US, CA, MX
+        """
+
+        if not config.has_section(section):
+            return None
+
+        aoi = cls(cell_size=config.getfloat(section, 'cell_size', fallback=1.0))
+
+        for bbox in config.get(section, 'bbox', fallback='').split(';'):
+            if bbox.strip():
+                aoi.add_bbox(*[float(v) for v in bbox.split(',')])
+
+        for path in config.get(section, 'geojson', fallback='').split(';'):
+            if path.strip():
+                aoi.add_geojson(path.strip())
+
+        for path in config.get(section, 'shapefile', fallback='').split(';'):
+            if path.strip():
+                aoi.add_shapefile(path.strip())
+
+        aoi.add_countries([c for c in config.get(section, 'countries', fallback='').split(',') if c.strip()])
+
+        if not aoi.polygons and not aoi.countries:
+            return None
+
+        return aoi
+
+    def add_countries(self, country_codes):
+
+        self.countries.update(c.strip().upper() for c in country_codes)
+
+    def add_bbox(self, xmin, ymin, xmax, ymax):
+
+        self.add_polygon([[[xmin, ymin], [xmin, ymax], [xmax, ymax], [xmax, ymin], [xmin, ymin]]])
+
+    def add_geojson(self, path):
+        """
+        Add every Polygon & MultiPolygon from a GeoJSON geometry, feature or feature collection.
+        """
+
+        with open(path) as geojson:
+            obj = json.load(geojson)
+
+        if obj.get('type') == 'FeatureCollection':
+            geometries = [f['geometry'] for f in obj['features']]
+        elif obj.get('type') == 'Feature':
+            geometries = [obj['geometry']]
+        else:
+            geometries = [obj]
+
+        for geom in geometries:
+            if not geom:
+                continue
+            if geom['type'] == 'Polygon':
+                self.add_polygon(geom['coordinates'])
+            elif geom['type'] == 'MultiPolygon':
+                for coords in geom['coordinates']:
+                    self.add_polygon(coords)
+            else:
+                print(f"Skipping Unsupported AOI Geometry: {geom['type']}")
+
+    def add_shapefile(self, path):
+        """
+        Add every polygon from a shapefile or feature class.
+        """
+
+        sdf = pd.DataFrame.spatial.from_featureclass(path)
+
+        for geom in sdf['SHAPE']:
+            if geom and geom.get('rings'):
+                self.add_polygon(geom['rings'])
+
+    def add_polygon(self, rings):
+
+        polygon = Polygon(rings)
+        self.polygons.append(polygon)
+
+        # Register the Polygon in Every Grid Cell its Extent Touches
+        xmin, ymin, xmax, ymax = polygon.extent
+        cols = range(self.cell_col(xmin), self.cell_col(xmax) + 1)
+        rows = range(self.cell_row(ymin), self.cell_row(ymax) + 1)
+
+        for col in cols:
+            for row in rows:
+                self.index.setdefault(col * self.n_rows + row, []).append(polygon)
+
+    def cell_col(self, x):
+
+        return int(np.floor((np.clip(x, -180, 180) + 180) / self.cell_size))
+
+    def cell_row(self, y):
+
+        return int(np.floor((np.clip(y, -90, 90) + 90) / self.cell_size))
+
+    def contains(self, x, y):
+        """
+        Return a boolean mask of the points that fall inside any of the polygons.
+        """
+
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        inside = np.zeros(len(x), dtype=bool)
+
+        if not self.polygons or not len(x):
+            return inside
+
+        cols = np.floor((np.clip(x, -180, 180) + 180) / self.cell_size).astype('int64')
+        rows = np.floor((np.clip(y, -90, 90) + 90) / self.cell_size).astype('int64')
+        cells = cols * self.n_rows + rows
+
+        # Group Points by Grid Cell & Only Test the Polygons Registered to That Cell
+        order = np.argsort(cells, kind='stable')
+        unique_cells, starts = np.unique(cells[order], return_index=True)
+
+        for cell, idx in zip(unique_cells, np.split(order, starts[1:])):
+            for polygon in self.index.get(cell, []):
+                idx = idx[~inside[idx]]
+                if not len(idx):
+                    break
+                inside[idx] = polygon.contains(x[idx], y[idx])
+
+        return inside
+
+    def filter(self, df, x_field='actiongeo_long', y_field='actiongeo_lat', country_field='actiongeo_countrycode'):
+        """
+        Return the rows of the data frame that fall inside the area of interest.
+        """
+
+        keep = self.contains(df[x_field].values, df[y_field].values)
+
+        if self.countries:
+            keep |= df[country_field].isin(self.countries).values
+
+        print(f'AOI Filter Dropped {len(df) - keep.sum()} of {len(df)} Records')
+
+        return df[keep]
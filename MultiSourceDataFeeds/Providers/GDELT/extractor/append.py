@@ -0,0 +1,154 @@
+import pandas as pd
+import tempfile
+import time
+import os
+
+
+class AppendSink(object):
+    """
+    Bulk loader for large GDELT loads (catch-up runs, backfills). Instead of pushing features through
+    applyEdits in chunks of 500, the batch is written once to a CSV with x/y columns, uploaded as a
+    single item and loaded with the layer's append operation. Rows are upserted on upsert_field,
+    which needs a unique index on the layer; prepare adds it the first time the sink appends to a layer.
+    A layer already holding duplicate upsert_field values can't be indexed; the duplicates are reported
+    and the layer is left to the regular edit path.
+
+    Loads smaller than threshold rows are left to the regular edit path. The sink only talks to the
+    GIS through content.add/content.analyze, the uploaded item and FeatureLayer.query/append, so a local
+    stand-in layer server (tests/standin.py) can be used in place of a portal.
+    """
+
+    def __init__(self, gis, threshold=5000, upsert_field='sourceurl', x_field='actiongeo_long', y_field='actiongeo_lat'):
+
+        self.gis          = gis
+        self.threshold    = threshold
+        self.upsert_field = upsert_field
+        self.x_field      = x_field
+        self.y_field      = y_field
+        self.prepared     = dict()
+
+    def use_append(self, lyr, df):
+        """
+        Return True if the load is large enough for append & the layer supports it and can be upserted into.
+        """
+
+        if len(df) < self.threshold or not lyr.properties.get('supportsAppend', False):
+            return False
+
+        return self.ready(lyr)
+
+    def ready(self, lyr):
+        """
+        Return True if the layer has (or was just given) the unique index upserts need. Each layer is only
+        prepared once per sink.
+        """
+
+        if lyr.url not in self.prepared:
+            self.prepared[lyr.url] = self.prepare(lyr)
+
+        return self.prepared[lyr.url]
+
+    def indexed(self, lyr):
+        """
+        Return True if the layer has a unique index on the upsert field.
+        """
+
+        if self.prepared.get(lyr.url):
+            return True
+
+        return any(index['fields'].lower() == self.upsert_field.lower() and index.get('isUnique')
+                   for index in lyr.properties.get('indexes', []))
+
+    def duplicates(self, lyr):
+        """
+        Return the upsert field values held by more than one feature of the layer.
+        """
+
+        values = lyr.query(out_fields=self.upsert_field, return_geometry=False).sdf[self.upsert_field].dropna()
+
+        return values[values.duplicated()].unique()
+
+    def prepare(self, lyr):
+        """
+        Make sure the upsert field has a unique index; append can only upsert on a uniquely indexed field.
+        Returns False, after reporting them, if the layer already has duplicate values the index would reject.
+        """
+
+        if self.indexed(lyr):
+            return True
+
+        duplicates = self.duplicates(lyr)
+
+        if len(duplicates):
+            print(f'Cannot Add Unique Index on {self.upsert_field}: {len(duplicates)} Values Are Duplicated '
+                  f'(i.e. {", ".join(str(v) for v in duplicates[:5])}). Remove Them to Use Append on {lyr.url}')
+            return False
+
+        print(f'Adding Unique Index on {self.upsert_field}')
+
+        lyr.manager.add_to_definition({
+            'indexes': [{
+                'name': f'{self.upsert_field}_unique',
+                'fields': self.upsert_field,
+                'isUnique': True,
+                'isAscending': True,
+                'description': f'Unique {self.upsert_field} for append upserts'
+            }]
+        })
+
+        return True
+
+    def write_csv(self, df, temp_dir):
+        """
+        Write the data frame to a CSV in the temp directory. Geometry is carried by the x/y columns and
+        datetimes are written in UTC.
+        """
+
+        out_df = df.drop(columns=[c for c in ['SHAPE'] if c in df.columns])
+
+        for col in out_df.columns:
+            if pd.api.types.is_datetime64_any_dtype(out_df[col]):
+                if getattr(out_df[col].dt, 'tz', None) is not None:
+                    out_df[col] = out_df[col].dt.tz_convert('UTC')
+                out_df[col] = out_df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        csv_path = os.path.join(temp_dir, f'GDELT_Append_{round(time.time())}.csv')
+        out_df.to_csv(csv_path, index=False)
+
+        return csv_path
+
+    def append(self, lyr, df):
+        """
+        Upload the data frame once & upsert it into the layer. Returns True if the append job succeeded.
+        """
+
+        # Any Layer the Sink Writes to Needs the Unique Index, Not Only One Created by build_v2
+        if not self.ready(lyr):
+            return False
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            csv_path = self.write_csv(df, temp_dir)
+            print(f'Uploading {len(df)} Rows for Append: {os.path.getsize(csv_path) / 1e6:.1f} MB')
+
+            item = self.gis.content.add({'type': 'CSV', 'title': os.path.basename(csv_path), 'tags': 'GDELT'}, data=csv_path)
+
+        try:
+            source_info = self.gis.content.analyze(item=item.id, file_type='csv', location_type='coordinates')['publishParameters']
+            source_info.update({
+                'locationType': 'coordinates',
+                'longitudeFieldName': self.x_field,
+                'latitudeFieldName': self.y_field
+            })
+
+            return lyr.append(
+                item_id=item.id,
+                upload_format='csv',
+                source_info=source_info,
+                upsert=True,
+                upsert_matching_field=self.upsert_field,
+                update_geometry=True
+            )
+
+        finally:
+            item.delete()
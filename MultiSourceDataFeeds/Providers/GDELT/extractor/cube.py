@@ -0,0 +1,184 @@
+from .schema import v2_header
+
+import pandas as pd
+import numpy as np
+import json
+import os
+
+
+class EventCube(object):
+    """
+    Long-horizon summary of GDELT events kept in fixed-shape NumPy arrays memory-mapped from disk.
+
+    The cube is day x country x CAMEO root code x quad class and stores the event count, the sum of
+    avgtone & the sum of goldsteinscale for every cell. Countries are the FIPS 10-4 action geo country
+    codes, plus a last bucket for unknown codes. Days are kept in a ring of `days` slots, so the
+    files never grow; a slot is cleared when a newer day takes it over.
+
+    The cube is updated from raw (undecoded) event frames, so it can be fed by every process_df run
+    and by backfills of historical exports (see update_from_csv). Updates that name their slice are
+    only applied once; a slice that is not newer than the last one added is ignored.
+    """
+
+    roots = [str(r).zfill(2) for r in range(1, 21)]
+    quads = ['1', '2', '3', '4']
+    stats = {'count': 'uint32', 'tone': 'float32', 'goldstein': 'float32'}
+
+    def __init__(self, directory, countries, days=400):
+
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self.meta_path  = os.path.join(directory, 'cube.json')
+        self.last_slice = None
+
+        # Existing Cubes Keep Their Own Layout so Cell Positions Never Move
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as meta:
+                meta = json.load(meta)
+            countries, days, self.last_slice = meta['countries'], meta['days'], meta.get('last_slice')
+
+        self.countries = pd.Index(list(countries) + ['Unknown'])
+        self.days      = days
+        self.save_meta()
+        self.shape     = (days, len(self.countries), len(self.roots), len(self.quads))
+
+        self.slot_days = self.open_array('slot_days', 'int64', (days,), fill=-1)
+        self.arrays    = {stat: self.open_array(stat, dtype, self.shape) for stat, dtype in self.stats.items()}
+
+    def open_array(self, name, dtype, shape, fill=None):
+
+        path = os.path.join(self.directory, f'{name}.dat')
+
+        if os.path.exists(path):
+            return np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+
+        arr = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+        if fill is not None:
+            arr[:] = fill
+
+        return arr
+
+    @staticmethod
+    def day_numbers(sqldates):
+        """
+        Convert YYYYMMDD integers to days since 1970-01-01.
+        """
+
+        return pd.to_datetime(pd.Series(sqldates).astype(str), format='%Y%m%d', errors='coerce') \
+            .values.astype('datetime64[D]').astype('int64')
+
+    def save_meta(self):
+
+        with open(self.meta_path, 'w') as meta:
+            json.dump({'countries': list(self.countries[:-1]), 'days': self.days, 'last_slice': self.last_slice}, meta)
+
+    def update(self, df, slice_name=None):
+        """
+        Add a raw event frame (sqldate, actiongeo_countrycode, eventrootcode, quadclass, avgtone,
+        goldsteinscale) to the cube. With a slice name (i.e. 20240101000000), a slice that is not newer
+        than the last one added is skipped so a rerun never counts its events twice.
+        """
+
+        if slice_name is not None and self.last_slice is not None and str(slice_name) <= self.last_slice:
+            print(f'Event Cube Already Includes {slice_name}')
+            return
+
+        days  = self.day_numbers(df['sqldate'].values)
+        roots = pd.Index(self.roots).get_indexer(df['eventrootcode'].astype(str).str.zfill(2))
+        quads = pd.Index(self.quads).get_indexer(df['quadclass'].astype(str))
+
+        countries = self.countries.get_indexer(df['actiongeo_countrycode'])
+        countries[countries < 0] = len(self.countries) - 1
+
+        keep = (roots >= 0) & (quads >= 0) & (days > 0)
+        days, roots, quads, countries = days[keep], roots[keep], quads[keep], countries[keep]
+        tone = df['avgtone'].values[keep].astype('float64')
+        goldstein = df['goldsteinscale'].values[keep].astype('float64')
+
+        slots = days % self.days
+
+        # Claim Slots for Newer Days; Rows Older Than the Day Held by Their Slot Fell Out of the Ring
+        for slot, day in set(zip(slots.tolist(), days.tolist())):
+            if day > self.slot_days[slot]:
+                self.slot_days[slot] = day
+                for arr in self.arrays.values():
+                    arr[slot] = 0
+
+        current = self.slot_days[slots] == days
+        cells = (slots[current], countries[current], roots[current], quads[current])
+
+        np.add.at(self.arrays['count'], cells, 1)
+        np.add.at(self.arrays['tone'], cells, np.nan_to_num(tone[current]).astype('float32'))
+        np.add.at(self.arrays['goldstein'], cells, np.nan_to_num(goldstein[current]).astype('float32'))
+
+        self.flush()
+
+        if slice_name is not None:
+            self.last_slice = str(slice_name)
+            self.save_meta()
+
+        print(f'Added {current.sum()} Events to Event Cube')
+
+    def update_from_csv(self, csv_file, header=v2_header, chunksize=500000):
+        """
+        Backfill the cube from a GDELT export, reading only the columns the cube needs.
+        """
+
+        columns = ['sqldate', 'actiongeo_countrycode', 'eventrootcode', 'quadclass', 'avgtone', 'goldsteinscale']
+        dtypes  = {'actiongeo_countrycode': str, 'eventrootcode': str, 'quadclass': str}
+
+        for chunk in pd.read_csv(csv_file, sep='\t', names=header, usecols=columns, dtype=dtypes, chunksize=chunksize):
+            self.update(chunk)
+
+    def flush(self):
+
+        self.slot_days.flush()
+
+        for arr in self.arrays.values():
+            arr.flush()
+
+    def query(self, start, end, stat='count', countries=None, roots=None, quads=None, by=('day',)):
+        """
+        Slice the cube & return a data frame of the stat summed over every dimension not listed in by.
+
+        start/end are dates (inclusive). stat is count, tone, goldstein, avg_tone or avg_goldstein.
+        countries (FIPS codes), roots & quads restrict the cells; by is any of day, country, root & quad.
+        Raises KeyError for a country, root or quad the cube has no cells for.
+        """
+
+        days = np.arange(np.datetime64(pd.Timestamp(start).date(), 'D').astype('int64'),
+                         np.datetime64(pd.Timestamp(end).date(), 'D').astype('int64') + 1)
+        days = days[self.slot_days[days % self.days] == days]
+
+        labels = {
+            'day': pd.to_datetime(days, unit='D'),
+            'country': self.countries if countries is None else pd.Index(countries),
+            'root': pd.Index(self.roots if roots is None else [str(r).zfill(2) for r in roots]),
+            'quad': pd.Index(self.quads if quads is None else [str(q) for q in quads])
+        }
+
+        index = [days % self.days]
+
+        # get_indexer Returns -1 for Unknown Keys, Which Would Silently Select the Last Cell
+        for dim, known in [('country', self.countries), ('root', pd.Index(self.roots)), ('quad', pd.Index(self.quads))]:
+            positions = known.get_indexer(labels[dim])
+            if (positions < 0).any():
+                raise KeyError(f'Unknown {dim} in Cube Query: {", ".join(labels[dim][positions < 0].astype(str))}')
+            index.append(positions)
+
+        def select(arr):
+            sub = arr[np.ix_(*index)].astype('float64')
+            axes = tuple(i for i, dim in enumerate(['day', 'country', 'root', 'quad']) if dim not in by)
+            return sub.sum(axis=axes)
+
+        if stat.startswith('avg_'):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = select(self.arrays[stat[4:]]) / select(self.arrays['count'])
+        else:
+            values = select(self.arrays[stat])
+
+        dims = [dim for dim in ['day', 'country', 'root', 'quad'] if dim in by]
+        multi_index = pd.MultiIndex.from_product([labels[d] for d in dims], names=dims)
+
+        return pd.DataFrame({stat: values.ravel()}, index=multi_index).reset_index()
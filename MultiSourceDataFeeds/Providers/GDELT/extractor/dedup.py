@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import numpy as np
+import os
+
+
+class DedupIndex(object):
+    """
+    Time-windowed index of GDELT keys that were already published to the hosted feature layer.
+
+    Each processed slice (15 minute export) keeps one sorted array of 64-bit hashes of its sourceurl,
+    globaleventid and (with syndication) canonical url values. Slices older than max_age hours are expired, so the index covers the same
+    retention window as the layer. The whole index is persisted to a single .npz file between runs.
+    """
+
+    def __init__(self, path, max_age=24, fields=('sourceurl', 'globaleventid', 'canonical_url'), mode='drop'):
+
+        self.path    = path
+        self.max_age = max_age
+        self.fields  = list(fields)
+        self.mode    = mode
+        self.slices  = {}
+        self._all    = None
+
+        self.load()
+
+    @staticmethod
+    def slice_date(slice_name):
+
+        return datetime.strptime(slice_name[:14], '%Y%m%d%H%M%S')
+
+    @staticmethod
+    def hash_values(field, values):
+
+        return pd.util.hash_array((f'{field}\x1f' + pd.Series(values, dtype=object).astype(str)).values)
+
+    def hash_keys(self, df):
+        """
+        Return a list with one array of uint64 hashes per indexed field in the data frame.
+        """
+
+        return [self.hash_values(field, df[field].values) for field in self.fields if field in df.columns]
+
+    def all_hashes(self):
+
+        if self._all is None:
+            self._all = np.unique(np.concatenate(list(self.slices.values()))) if self.slices \
+                else np.array([], dtype='uint64')
+
+        return self._all
+
+    def seen(self, df):
+        """
+        Return a boolean mask of the rows whose sourceurl or globaleventid was published in an earlier slice.
+        """
+
+        mask = np.zeros(len(df), dtype=bool)
+        known = self.all_hashes()
+
+        if len(known):
+            for hashes in self.hash_keys(df):
+                mask |= np.isin(hashes, known)
+
+        return mask
+
+    def add(self, slice_name, df):
+        """
+        Record the keys of a published slice. Missing values (i.e. the globaleventid of a url that only
+        stands for a cluster member) are skipped.
+        """
+
+        hashes = [self.hash_values(field, df[field].dropna().values) for field in self.fields if field in df.columns]
+        new = np.unique(np.concatenate(hashes)) if hashes else np.array([], dtype='uint64')
+
+        if slice_name in self.slices:
+            new = np.union1d(self.slices[slice_name], new)
+
+        self.slices[slice_name] = new
+        self._all = None
+
+    def expire(self, now=None):
+        """
+        Drop slices older than max_age hours.
+        """
+
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=self.max_age)
+        expired = [name for name in self.slices if self.slice_date(name) < cutoff]
+
+        for name in expired:
+            del self.slices[name]
+
+        if expired:
+            self._all = None
+            print(f'Expired {len(expired)} Slices from Dedup Index')
+
+    def load(self):
+
+        if os.path.exists(self.path):
+            with np.load(self.path) as npz:
+                self.slices = {name[1:]: npz[name] for name in npz.files}
+            print(f'Loaded Dedup Index: {len(self.slices)} Slices, {len(self.all_hashes())} Keys')
+
+    def save(self):
+
+        # Keys Are Prefixed so Slice Names Are Valid Array Names
+        np.savez_compressed(self.path, **{f's{name}': hashes for name, hashes in self.slices.items()})
@@ -1,14 +1,13 @@
 from .schema import v2_header, v1_header, article_columns, stat_names, aggregates, dtype_map, quad_class_domains, group_by_columns
+from .featureset import to_edit_json, apply_edits
+from .enrichment import EnrichmentPool
+from .syndication import canonicalize, cluster_articles
 
 from arcgis.features import GeoAccessor
 from arcgis.gis import GIS
 
-from multiprocessing import Pool, cpu_count
 from datetime import datetime, timedelta
-from urllib.parse import urlparse
 from bs4 import BeautifulSoup
-from newspaper import Article
-from itertools import chain
 from functools import wraps
 import pandas as pd
 import numpy as np
@@ -20,7 +19,6 @@ import shutil
 import pytz
 import time
 import os
-import re
 
 import warnings
 warnings.filterwarnings("ignore")
@@ -50,6 +48,38 @@ class Extractor(object):
         self.delimiter = ';'
         self.flatten   = True
 
+        # Optional Long-Lived Enrichment Pool; See enrichment.py & Daemon Mode in v2_runner.py
+        self.enrichment_pool = None
+
+        # Optional Bulk Loader for Large Loads; See append.py
+        self.append_sink = None
+
+        # Optional Area of Interest & Attribute Filters Applied Before Any Decoding or Enrichment; See aoi.py & filters.py
+        self.aoi = None
+        self.attribute_filter = None
+
+        # Optional Index of Already Published Keys & the Duplicates Removed From the Last Slice; See dedup.py
+        self.dedup      = None
+        self.duplicates = None
+
+        # Collapse URL Variants & Cluster Syndicated (Wire) Stories Into One Feature; See syndication.py
+        # The Member urls of Each Published Cluster in the Last Slice Are Kept so All of Them Reach the Dedup Index
+        self.syndication = False
+        self.syndicated  = None
+
+        # Optional Long-Horizon Event Cube & Country Interaction Graph Fed With Every Raw Slice; See cube.py & graph.py
+        self.cube  = None
+        self.graph = None
+
+        # Optional Streaming Tone/Goldstein Anomaly Detector Fed With Every Raw Slice; See anomaly.py
+        self.anomaly = None
+
+        # Optional Index of Published Events Refreshed From the Mentions Stream; See mentions.py
+        self.mentions = None
+
+        # Optional Additional Targets Receiving Every Processed Slice Concurrently; See targets.py
+        self.fan_out = None
+
     @staticmethod
     def get_v2_urls():
 
@@ -150,44 +180,10 @@ class Extractor(object):
         else:
             print('No Records Found for Deletion')
 
-    @staticmethod
-    def batch_process_articles(article_list):
-        """
-        Enrichment function to parse and article metadata and extend into GDELT event data.
-        """
-
-        print(f"Subprocess Handling {len(article_list)} Articles")
-
-        processed_data = []
-
-        for event_article in article_list:
-
-            try:
-                # Parse GDELT Source
-                article = Article(event_article)
-                article.download()
-                article.parse()
-                article.nlp()
-
-                # Unpack Article Properties & Replace Special Characters
-                title     = article.title.replace("'", '')
-                site      = urlparse(article.source_url).netloc
-                summary   = '{} . . . '.format(article.summary.replace("'", '')[:500])
-                keywords = '; '.join(sorted([re.sub('[^a-zA-Z0-9 \n]', '', key) for key in article.keywords]))
-                meta_keys = '; '.join(sorted([re.sub('[^a-zA-Z0-9 \n]', '', key) for key in article.meta_keywords]))
-
-                processed_data.append([event_article, title, site, summary, keywords, meta_keys])
-
-            except:
-                processed_data.append([event_article, None, None, None, None, None])
-
-        return processed_data
-
     def handle_updates(self, all_lyr, all_sdf, new_sdf, id_field):
 
         if not len(all_sdf):
-            res = all_lyr.edit_features(adds=new_sdf.spatial.to_featureset(), rollback_on_failure=False)['addResults']
-            print(f"Added {len([i for i in res if i['success']])} rows")
+            self.process_edits(all_lyr, new_sdf, 'add')
 
         else:
             merged = all_sdf.merge(new_sdf, on=id_field, how='outer', indicator=True)
@@ -210,23 +206,279 @@ class Extractor(object):
             if len(upds):
                 self.process_edits(all_lyr, upds, 'update')
 
-    def process_edits(self, feature_layer, data_frame, operation):
+    def process_edits(self, feature_layer, data_frame, operation, batch_size=500):
         """
-        Push edits from SDF to hosted feature layer.
+        Push edits from SDF to hosted feature layer. Returns a boolean array marking the rows that were
+        applied; a batch that fails as a whole is reported & counted as failed without stopping the rest.
         """
 
         print(f"Running {operation.upper()} on Hosted Feature Layer")
 
-        # Chunk edits into lists of 500 items. Python API can only push so many updates; item sized based on bytes.
-        update_sets = list(self.batch_it(data_frame.spatial.to_featureset().features, 500))
+        # Chunk edits into JSON batches of 500 items. Python API can only push so many updates; item sized based on bytes.
+        # Features are encoded straight from the data frame columns; geometry comes from the action coordinates.
+        update_sets = to_edit_json(data_frame, 'actiongeo_long', 'actiongeo_lat', batch_size=batch_size)
+
+        applied = np.zeros(len(data_frame), dtype=bool)
+
+        for start, edits in zip(range(0, len(data_frame), batch_size), update_sets):
+            try:
+                if operation == 'update':
+                    res = apply_edits(feature_layer, updates=edits)['updateResults']
+                    print(f"Updated {len([i for i in res if i['success']])} rows of {len(res)}")
+                else:
+                    res = apply_edits(feature_layer, adds=edits)['addResults']
+                    print(f"Added {len([i for i in res if i['success']])} rows of {len(res)}")
+            except Exception as gen_exc:
+                print(f'{operation.title()} Batch Failed: {gen_exc}')
+                continue
+
+            applied[start:start + len(res)] = [i['success'] for i in res]
+
+        return applied
+
+    def publish_graph(self, item_id, top_n=100):
+        """
+        Replace the features of a line hosted feature layer with the top N edges of the interaction graph.
+        The new edges are added first & the previous ones deleted afterwards; if any edge fails to add, the
+        edges that were added are removed again & the previous edges stay in place.
+        """
+
+        graph_lyr = self.get_gis_item(item_id, self.gis).layers[0]
+        graph_sdf = self.graph.to_sdf(top_n, labels=self.country)
+
+        stale = graph_lyr.query(where='1=1', return_ids_only=True).get('objectIds') or []
+
+        added, failed = [], 0
+        for adds in to_edit_json(graph_sdf):
+            try:
+                res = apply_edits(graph_lyr, adds=adds)['addResults']
+            except Exception as gen_exc:
+                print(f'Graph Edge Batch Failed: {gen_exc}')
+                failed += 1
+                continue
+            added += [i['objectId'] for i in res if i['success']]
+            failed += len([i for i in res if not i['success']])
+            print(f"Added {len([i for i in res if i['success']])} Graph Edges of {len(res)}")
+
+        # Keep the Previous Edges Unless the Whole New Set Made it
+        remove = added if failed else stale
+        if failed:
+            print('Graph Edges Not Fully Added - Keeping the Previous Edges')
+
+        for oids in self.batch_it(remove, 1000):
+            res = apply_edits(graph_lyr, deletes=','.join(str(i) for i in oids))['deleteResults']
+            print(f"Deleted {len([i for i in res if i['success']])} Graph Edges of {len(res)}")
+
+    def publish_anomalies(self, item_id):
+        """
+        Add the anomalies found in the last slice to a hosted table. The anomalies are cleared once they
+        are sent, so a run that finds its slice already extracted does not add them again.
+        """
+
+        anomalies = self.anomaly.anomalies
+
+        if not len(anomalies):
+            return
+
+        anomalies = anomalies.assign(
+            country=anomalies['actiongeo_countrycode'].map(self.country_fips),
+            quadclass=anomalies['quadclass'].replace(quad_class_domains)
+        )
 
-        for edits in update_sets:
-            if operation == 'update':
-                res = feature_layer.edit_features(updates=edits, rollback_on_failure=False)['updateResults']
-                print(f"Updated {len([i for i in res if i['success']])} rows of {len(edits)}")
+        anomaly_tbl = self.get_gis_item(item_id, self.gis).tables[0]
+
+        for adds in to_edit_json(anomalies, geometry_field=None):
+            res = apply_edits(anomaly_tbl, adds=adds)['addResults']
+            print(f"Added {len([i for i in res if i['success']])} Anomalies of {len(res)}")
+
+        self.anomaly.anomalies = pd.DataFrame()
+
+    def route_duplicates(self, feature_layer):
+        """
+        Send the previously published records set aside by process_df as attribute updates to the features
+        already in the layer. Does nothing unless the dedup index is in update mode; in drop mode they are discarded.
+        """
+
+        if self.duplicates is None or not len(self.duplicates) or self.dedup.mode != 'update':
+            return
+
+        key = 'sourceurl' if self.flatten else 'globaleventid'
+        dup_df = self.duplicates.drop_duplicates(key)
+
+        # Flattened Features Summarize Every Slice an Article Appeared in, so the Slices Are Merged
+        merge_fields = [c for c in list(aggregates) + group_by_columns if c in dup_df.columns] if self.flatten else []
+
+        exist_df = self.query_oids(feature_layer, key, dup_df[key].unique().tolist(), merge_fields)
+
+        if not len(exist_df):
+            return
+
+        upd_df = self.merge_aggregates(dup_df.merge(exist_df, on=key, suffixes=('', '_published')), merge_fields)
+        self.process_edits(feature_layer, upd_df, 'update')
+
+    def merge_aggregates(self, df, fields):
+        """
+        Combine the aggregates of a new slice with the published values in the <field>_published columns.
+        Max/min fields keep the extreme, mean fields average the two (each slice weighs the same) and
+        delimited value lists are unioned.
+        """
+
+        for col in fields:
+            new = df[col]
+            old = df.pop(f'{col}_published')
+
+            if col in group_by_columns:
+                df[col] = [f'{self.delimiter} '.join(sorted({v.strip() for v in f'{a}{self.delimiter}{b}'.split(self.delimiter)
+                                                            if v.strip() and v.strip() != 'None'}))
+                           for a, b in zip(new.fillna(''), old.fillna(''))]
+                continue
+
+            new = pd.to_numeric(new, errors='coerce')
+            old = pd.to_numeric(old, errors='coerce')
+
+            if aggregates[col] == 'max':
+                df[col] = np.fmax(new, old)
+            elif aggregates[col] == 'min':
+                df[col] = np.fmin(new, old)
             else:
-                res = feature_layer.edit_features(adds=edits, rollback_on_failure=False)['addResults']
-                print(f"Added {len([i for i in res if i['success']])} rows of {len(edits)}")
+                df[col] = round(pd.concat([new, old], axis=1).mean(axis=1), 1)
+
+        return df
+
+    def published_keys(self, df):
+        """
+        Return the keys to record in the dedup index for the published rows: their sourceurl & globaleventid,
+        the member urls of their syndication clusters and, with syndication, the canonical form of every url.
+        """
+
+        keys = df[[c for c in ['sourceurl', 'globaleventid'] if c in df.columns]].astype(object)
+
+        if self.syndicated is not None:
+            members = self.syndicated.loc[self.syndicated['sourceurl'].isin(df['sourceurl']), ['syndicated_url']]
+            keys = pd.concat([keys, members.rename(columns={'syndicated_url': 'sourceurl'})], ignore_index=True)
+
+        if self.syndication:
+            keys['canonical_url'] = canonicalize(keys['sourceurl'])
+
+        return keys
+
+    def query_oids(self, feature_layer, key, values, fields=()):
+        """
+        Return a data frame with the object ID, key & any other requested fields of the features whose key is in values.
+        """
+
+        oid = feature_layer.properties.objectIdField
+        columns = [oid, key] + list(fields)
+
+        # Look up the Object IDs of the Published Features in Batches to Keep Where Clauses Short
+        exist_dfs = [pd.DataFrame(columns=columns)]
+        for keys in self.batch_it(values, 100):
+            where = '{} IN ({})'.format(key, ','.join("'{}'".format(str(k).replace("'", "''")) for k in keys))
+            exist_dfs.append(feature_layer.query(where=where, out_fields=','.join(columns), return_geometry=False).sdf)
+
+        return pd.concat(exist_dfs)[columns]
+
+    def refresh_mentions(self, feature_layer, temp_dir):
+        """
+        Stream the latest mentions export, add the new mentions to the indexed events & send attribute-only
+        updates of nummentions & numsources to the features that changed. The export is counted under its
+        own slice name, which can differ from the events export processed in the same run.
+        """
+
+        mentions_url = self.fetch_last_v2_url('mentions')
+        mentions_zip = os.path.join(temp_dir, mentions_url.split('/')[-1])
+        mentions_slice = os.path.basename(mentions_url).split('.')[0]
+
+        # Skip the Download When This Mentions Export Was Already Counted
+        if mentions_slice == self.mentions.last_slice:
+            print(f'Mentions Already Counted for {mentions_slice}')
+            return
+
+        with requests.get(mentions_url, stream=True) as response, open(mentions_zip, 'wb') as file:
+            shutil.copyfileobj(response.raw, file)
+
+        changed = self.mentions.update(mentions_zip, mentions_slice)
+
+        self.mentions.expire()
+        self.mentions.save()
+
+        if not len(changed):
+            return
+
+        # Only Flattened Layers Carry the Per-URL Means; Unflattened Layers Take the Event Totals
+        key = 'sourceurl'
+        if not self.flatten:
+            key = 'globaleventid'
+            changed = self.mentions.events.loc[self.mentions.events['sourceurl'].isin(changed['sourceurl'])] \
+                [['nummentions', 'numsources']].reset_index()
+
+        oid = feature_layer.properties.objectIdField
+        upd_df = self.query_oids(feature_layer, key, changed[key].tolist()).merge(changed, on=key)[[oid, 'nummentions', 'numsources']]
+
+        for edits in to_edit_json(upd_df, geometry_field=None):
+            res = apply_edits(feature_layer, updates=edits)['updateResults']
+            print(f"Refreshed Mention Counts of {len([i for i in res if i['success']])} rows of {len(res)}")
+
+    def push(self, feature_layer, data_frame):
+        """
+        Push new events to a hosted feature layer. Loads large enough for the append sink (if one is attached)
+        are uploaded once & upserted; smaller deltas, or a failed append, fall back to edit batches.
+        Returns a boolean array marking the rows that were added or updated.
+
+        A layer with the sink's unique index rejects adds of keys it already has, so rows already published
+        are upserted in both paths. They keep the extracted_date they were first published with, which
+        the max age delete is based on.
+        """
+
+        sink = self.append_sink
+        use_append = bool(sink) and sink.use_append(feature_layer, data_frame)
+
+        published = None
+        if sink and (use_append or sink.indexed(feature_layer)):
+            published = self.published_rows(feature_layer, data_frame, sink.upsert_field)
+            keys = data_frame[sink.upsert_field].astype(str)
+
+        if use_append:
+            append_df = data_frame
+            if len(published):
+                dates = pd.Series(pd.to_datetime(published['extracted_date'].reindex(keys).to_numpy(), utc=True), index=data_frame.index)
+                append_df = data_frame.assign(extracted_date=dates.fillna(data_frame['extracted_date']))
+            try:
+                if sink.append(feature_layer, append_df):
+                    print(f'Appended {len(data_frame)} rows')
+                    return np.ones(len(data_frame), dtype=bool)
+                print('Append Job Failed - Falling Back to Edits')
+            except Exception as gen_exc:
+                print(f'Append Job Failed - Falling Back to Edits: {gen_exc}')
+
+        if published is None or not len(published):
+            return self.process_edits(feature_layer, data_frame, 'add')
+
+        # Send Rows Already in the Layer as Updates of Those Features; Only New Keys Are Added
+        existing = keys.isin(published.index).to_numpy()
+        oid = feature_layer.properties.objectIdField
+
+        applied = np.zeros(len(data_frame), dtype=bool)
+
+        upd_df = data_frame[existing].drop(columns=['extracted_date'])
+        upd_df[oid] = published[oid].reindex(keys[existing]).to_numpy()
+        applied[existing] = self.process_edits(feature_layer, upd_df, 'update')
+
+        if not existing.all():
+            applied[~existing] = self.process_edits(feature_layer, data_frame[~existing], 'add')
+
+        return applied
+
+    def published_rows(self, feature_layer, data_frame, key):
+        """
+        Return the object ID & extracted_date of the features already holding a key of the data frame,
+        indexed by the key as text.
+        """
+
+        published = self.query_oids(feature_layer, key, data_frame[key].dropna().unique().tolist(), ['extracted_date'])
+        published.index = published[key].astype(str)
+
+        return published[~published.index.duplicated()]
 
     def temp_handler(func):
         """
@@ -260,19 +512,18 @@ class Extractor(object):
 
     def article_enrichment(self, article_list):
         """
-        Multi-processing function that handles the article enrichment of GDELT events.
+        Multi-processing function that handles the article enrichment of GDELT events. Uses the
+        persistent enrichment pool if one is attached, otherwise a pool is created for this call.
+        Returns a data frame of article content; see schema.article_columns.
         """
 
-        batches = list(self.batch_it(article_list, int(len(article_list) / cpu_count() - 1)))
+        print(f'Enriching {len(article_list)} Articles')
 
-        # Create Pool & Run Records
-        pool = Pool(processes=cpu_count() - 1)
-        data = pool.map(self.batch_process_articles, batches)
-        pool.close()
-        pool.join()
-
-        return list(chain(*data))
+        if self.enrichment_pool:
+            return pd.DataFrame(self.enrichment_pool.imap(article_list), columns=article_columns)
 
+        with EnrichmentPool() as pool:
+            return pd.DataFrame(pool.imap(article_list), columns=article_columns)
 
     def collect_geometry(self, all_df):
 
@@ -358,10 +609,11 @@ class Extractor(object):
         This is used to process content from GDELT 1.0 and 2.0. By default, event links are
         are enriched using the newspaper3k library.
 
-        NOTE: any events that do not have coordinates are dropped.
+        NOTE: any events that do not have coordinates, fail the attribute filters or fall outside the area of interest
+        (if set) are dropped.
 
         Process Methadology:
-        1. Drop all records that don't have lat/long coordinates 
+        1. Drop all records that don't have lat/long coordinates, fail the attribute filters or are outside the area of interest
         2. Swap key/value pairs with lookup dictionary/tables
         3. Build out Group-by dataframes: Flattening rows based on source URL and semi-colon list of unique values for select attributes
         4. Get statistics on select attributes with integer values
@@ -370,16 +622,37 @@ class Extractor(object):
         """
 
         print(f'Received {len(df)} GDELT Records')
+        self.syndicated = None
         # Put Timestamp for Deleting & Identifying Gaps in Later Runs
         df['extracted_date'] = pd.to_datetime(extracted_date).replace(tzinfo=pytz.UTC)
 
+        # Summarize Every Raw Event (Before Any Filtering or Lookups) Into the Event Cube
+        if self.cube is not None:
+            self.cube.update(df, extracted_date)
+
+        # Accumulate Actor1 -> Actor2 Country Dyads (Raw CAMEO Codes) Into the Interaction Graph
+        if self.graph is not None:
+            self.graph.update(df, extracted_date)
+
+        # Score Country/Quad Class Averages Against Their Rolling Baselines
+        if self.anomaly is not None:
+            self.anomaly.update(df, extracted_date)
+
         # Discard Anything Without Coordinates or with Country Resolution
         df.dropna(subset=['actiongeo_long', 'actiongeo_lat'], inplace=True)
         df = df[df['actiongeo_type'] > 1]
 
+        # Discard Anything Not Matching the Attribute Filters (Raw Codes, Before Lookups)
+        if self.attribute_filter:
+            df = self.attribute_filter.filter(df)
+
+        # Discard Anything Outside the Area of Interest
+        if self.aoi:
+            df = self.aoi.filter(df)
+
         # Replace all nan in group_by_columns list; See schema.py for more info
         # Ensure "nan" Does Not Appear in Aggregate Output Fields
-        [df[col].replace(np.nan, '', regex=True, inplace=True) for col in group_by_columns]
+        df[group_by_columns] = df[group_by_columns].fillna('')
 
         # swap key/value pairs with lookup dictionary/tables
         df.replace({'eventcode': self.cameo}, inplace=True)
@@ -392,44 +665,74 @@ class Extractor(object):
         df.replace({'actor2geo_countrycode': self.country_fips}, inplace=True)
         df.replace({'actiongeo_countrycode': self.country_fips}, inplace=True)
 
+        # Group AMP/Mobile/Tracking Variants of the Same Article by Their Canonical url; sourceurl Keeps the Real url
+        # & Each Group is Published Under the First of its Real urls
+        group_key = 'sourceurl'
+        if self.syndication:
+            df['canonical_url'] = canonicalize(df['sourceurl'])
+            if self.flatten:
+                group_key = 'canonical_url'
+                first_urls = df.groupby('canonical_url')['sourceurl'].first()
+
+        # Remember Which Feature Each Event Ends Up In so its Mention Counts Can be Refreshed Later
+        if self.mentions is not None:
+            self.mentions.add(df.assign(sourceurl=df['canonical_url'].map(first_urls)) if group_key != 'sourceurl' else df,
+                              extracted_date)
+
         # Flatten GDELT records If Specified
         if self.flatten:
 
             # Identify the most frequently occuring values for Quadclass and Coordinates.  
-            df = self.groupby_return_top_value(['sourceurl', 'quadclass'], 'quadclass', 'sourceurl', df)
-            df = self.groupby_return_top_value(['sourceurl', 'actiongeo_lat', 'actiongeo_long'], 'actiongeo_lat', 'sourceurl', df)
+            df = self.groupby_return_top_value([group_key, 'quadclass'], 'quadclass', group_key, df)
+            df = self.groupby_return_top_value([group_key, 'actiongeo_lat', 'actiongeo_long'], 'actiongeo_lat', group_key, df)
             # self.collect_geometry(df)
 
             # Group By selected attributes and return unique values for each source URL
             for col in group_by_columns:
-                df = self.process_groupby('sourceurl', col, df)
+                df = self.process_groupby(group_key, col, df)
 
             # Add GoldsteinScale Max/Min columns
             df['goldsteinscale_max'] = df['goldsteinscale']
             df['goldsteinscale_min'] = df['goldsteinscale']
 
             # Aggregate numeric values based on statistics maintined in aggregates dictionary. See schema.py for more info
-            num_gb = df.groupby('sourceurl').aggregate(aggregates).reset_index()
+            num_gb = df.groupby(group_key).aggregate(aggregates).reset_index()
             for k, v in aggregates.items():
                 if v == 'mean':
                     num_gb[k] = round(num_gb[k], 1)
 
             # Keep Only 1 Unique Row Based sourceurl - We Only Need the Coordinate Attributes Now
-            df.drop_duplicates('sourceurl', inplace=True)
+            df.drop_duplicates(group_key, inplace=True)
             print(f'Processing {len(df)} articles')
 
             # Drop Columns Before Adding Aggregated Versions of the Same Attribute
             df.drop(columns=[k for k in aggregates.keys()], inplace=True)
 
             # Bring Grouped Data Back to Data Frame
-            df = df.merge(num_gb, on='sourceurl')
+            df = df.merge(num_gb, on=group_key)
+
+            if group_key != 'sourceurl':
+                df['sourceurl'] = df[group_key].map(first_urls)
+
+        # Set Aside Anything Published in an Earlier Slice so it is Not Enriched or Added Again
+        if self.dedup:
+            seen = self.dedup.seen(df)
+            self.duplicates = df[seen]
+            df = df[~seen]
+            print(f'Set Aside {seen.sum()} Previously Published Records')
 
         # Process and Append Article Information If Specified
         if self.articles:
-            article_data = self.article_enrichment(df['sourceurl'].values.tolist())
-            a_df = pd.DataFrame(article_data, columns=article_columns)
+            a_df = self.article_enrichment(df['sourceurl'].unique().tolist())
             df = df.merge(a_df, on='sourceurl')
 
+            # Publish Each Cluster of Near-Duplicate Articles Once
+            if self.syndication and self.flatten:
+                df, self.syndicated = cluster_articles(df)
+
+        # The Canonical url is Not a Layer Field; See published_keys
+        df = df.drop(columns=['canonical_url'], errors='ignore')
+
         # Build Geometry
         df = df.spatial.from_xy(df, 'actiongeo_long', 'actiongeo_lat')
 
@@ -437,14 +740,15 @@ class Extractor(object):
 
         return df
 
-    def fetch_last_v2_url(self):
+    def fetch_last_v2_url(self, kind='export'):
         """
         Grab the V2 export .csv from the latest update URL. The url contains a list of three
         packages that can be downloaded.  This function will return the export package in
-        the list.  This represents the newest events in the 15 minute dump.
+        the list (or the mentions/gkg package when kind is set).  This represents the newest
+        events in the 15 minute dump.
         """
         response = requests.get(self.v2_urls.get('last_update'))
-        last_url = [r for r in response.text.split('\n')[0].split(' ') if 'export' in r][0]
+        last_url = [r for line in response.text.split('\n') for r in line.split(' ') if f'.{kind}.' in r][0]
 
         return last_url
 
@@ -539,6 +843,10 @@ class Extractor(object):
         # Publish as Hosted Feature Layer
         full_hfl = df.spatial.to_featurelayer(f'V2_{csv_name}', gis=self.gis)
 
+        # Upserts Through the Append Sink Need a Unique Index on the Upsert Field
+        if self.append_sink:
+            self.append_sink.prepare(full_hfl.layers[0])
+
         if folder:
 
             self.gis.content.create_folder(folder)
@@ -572,23 +880,43 @@ class Extractor(object):
             csv_file, csv_name = self.collect_v2_csv(temp_dir)
             csv_date = pd.to_datetime(csv_name).replace(tzinfo=pytz.UTC)
 
-            # Skip Anything Already Processed
+            # Skip Anything Already Processed; Targets Still Catch Up on Slices They Failed Earlier
             if len(all_sdf) > 0 and np.datetime64(csv_date) in all_sdf['extracted_date'].unique():
                 print(f'Data Already Extracted for Current Date: {csv_date}')
+                if self.fan_out:
+                    self.fan_out.submit()
                 return
 
             # Convert Current 15 Minute GDELT Data to Spatial Data Frame
             new_df = self.get_v2_sdf(csv_file, csv_name)
 
+            # Start Pushing the Same Slice to the Additional Targets While the Main Layer is Updated
+            if self.fan_out:
+                self.fan_out.submit(new_df, csv_name)
+
             # Remove Data Older Than Max Age from GDELT 2.0 hosted feature layer table.
             # Return If Date Already Processed
             if len(all_sdf):
                 self.delete(all_lyr, all_sdf, 'extracted_date', all_lyr.properties.objectIdField, past_date)
 
             # Push New Data
-            self.process_edits(all_lyr, new_df, 'add')
+            added_df = new_df[self.push(all_lyr, new_df)]
+
+            # Update Previously Published Records & Remember What Was Pushed (Rows That Failed Are Tried Again Next Slice)
+            if self.dedup:
+                self.route_duplicates(all_lyr)
+                self.dedup.add(csv_name, self.published_keys(added_df))
+                self.dedup.expire()
+                self.dedup.save()
+
+            # Refresh the Mention Counts of Events Published in Earlier Slices
+            if self.mentions is not None:
+                self.refresh_mentions(all_lyr, temp_dir)
 
         finally:
+            if self.fan_out and self.fan_out.futures:
+                self.fan_out.wait()
+
             print(f'Ran V2 Solution: {round((time.time() - start) / 60, 2)}')
 
     @temp_handler
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class AttributeFilter(object):
+    """
+    Declarative filter over the raw GDELT event columns. Every configured condition is compiled into a
+    vectorized boolean mask over the undecoded code/integer columns, so it can run before lookups,
+    flattening & enrichment in process_df. Conditions are combined with AND; within a condition any
+    listed value matches.
+
+        root_codes      - CAMEO root codes (eventrootcode), i.e. 14, 18, 19
+        quad_classes    - quad classes (quadclass), 1-4; see schema.quad_class_domains
+        min_numarticles - minimum numarticles
+        min_nummentions - minimum nummentions
+        actor_countries - CAMEO country codes matched against actor1countrycode or actor2countrycode
+    """
+
+    def __init__(self, root_codes=None, quad_classes=None, min_numarticles=None, min_nummentions=None, actor_countries=None):
+
+        self.root_codes      = [str(c).strip().zfill(2) for c in root_codes or []]
+        self.quad_classes    = [str(c).strip() for c in quad_classes or []]
+        self.min_numarticles = min_numarticles
+        self.min_nummentions = min_nummentions
+        self.actor_countries = [str(c).strip().upper() for c in actor_countries or []]
+
+    @classmethod
+    def from_config(cls, config, section='Filters'):
+        """
+        Build a filter from a config.ini section. Returns None if no condition is configured.
+        """
+
+        if not config.has_section(section):
+            return None
+
+        def get_list(key):
+            return [v for v in config.get(section, key, fallback='').split(',') if v.strip()]
+
+        def get_int(key):
+            val = config.get(section, key, fallback='').strip()
+            return int(val) if val else None
+
+        attr_filter = cls(
+            root_codes=get_list('root_codes'),
+            quad_classes=get_list('quad_classes'),
+            min_numarticles=get_int('min_numarticles'),
+            min_nummentions=get_int('min_nummentions'),
+            actor_countries=get_list('actor_countries')
+        )
+
+        return attr_filter if attr_filter.conditions() else None
+
+    def conditions(self):
+        """
+        Return a list of (description, mask function) pairs for the configured conditions.
+        """
+
+        conditions = []
+
+        if self.root_codes:
+            conditions.append(('eventrootcode', lambda df: df['eventrootcode'].isin(self.root_codes).values))
+
+        if self.quad_classes:
+            conditions.append(('quadclass', lambda df: df['quadclass'].isin(self.quad_classes).values))
+
+        if self.min_numarticles is not None:
+            conditions.append(('numarticles', lambda df: df['numarticles'].values >= self.min_numarticles))
+
+        if self.min_nummentions is not None:
+            conditions.append(('nummentions', lambda df: df['nummentions'].values >= self.min_nummentions))
+
+        if self.actor_countries:
+            conditions.append(('actor countries', lambda df: df['actor1countrycode'].isin(self.actor_countries).values |
+                                                              df['actor2countrycode'].isin(self.actor_countries).values))
+
+        return conditions
+
+    def mask(self, df):
+
+        keep = np.ones(len(df), dtype=bool)
+
+        for _, condition in self.conditions():
+            keep &= condition(df)
+
+        return keep
+
+    def filter(self, df):
+        """
+        Return the rows of the data frame that pass every condition.
+        """
+
+        keep = self.mask(df)
+
+        print(f'Attribute Filter Dropped {len(df) - keep.sum()} of {len(df)} Records')
+
+        return df[keep]
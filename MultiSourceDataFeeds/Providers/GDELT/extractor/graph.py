@@ -0,0 +1,201 @@
+from arcgis.features import GeoAccessor
+from arcgis.geometry import Polyline
+from datetime import datetime, timedelta
+from scipy import sparse
+
+import pandas as pd
+import numpy as np
+import glob
+import os
+
+
+class InteractionGraph(object):
+    """
+    Incremental actor1 -> actor2 country interaction graph.
+
+    Every time bucket (bucket_hours wide) holds one sparse country x country matrix per stat: event
+    count, sum of avgtone & sum of goldsteinscale. Matrices are built from the raw CAMEO country codes
+    of each slice and added into their bucket. Buckets older than max_buckets are expired, and every
+    bucket is persisted as compressed .npz files. A running mean of actor locations per country gives
+    the end points used to draw the edges as lines. A slice that is not newer than the last one added
+    is ignored, so a rerun never counts its dyads twice.
+    """
+
+    stats = ['count', 'tone', 'goldstein']
+
+    def __init__(self, directory, countries, bucket_hours=24, max_buckets=30):
+
+        self.directory    = directory
+        self.countries    = pd.Index(countries)
+        self.bucket_hours = bucket_hours
+        self.max_buckets  = max_buckets
+        self.size         = len(self.countries)
+        self.buckets      = {}
+        self.changed      = set()
+        self.last_slice   = None
+
+        # Sum of Longitude, Latitude & Number of Located Actors per Country
+        self.locations = np.zeros((3, self.size))
+
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    def bucket_name(self, date):
+
+        date = pd.Timestamp(date)
+        if date.tzinfo:
+            date = date.tz_convert(None)
+
+        hours = (date - datetime(1970, 1, 1)) // timedelta(hours=self.bucket_hours) * self.bucket_hours
+
+        return (datetime(1970, 1, 1) + timedelta(hours=hours)).strftime('%Y%m%d%H')
+
+    def matrix(self, rows, cols, values):
+
+        # Duplicate (Row, Col) Pairs are Summed When Converting From COO
+        return sparse.coo_matrix((values, (rows, cols)), shape=(self.size, self.size)).tocsr()
+
+    def update(self, df, extracted_date):
+        """
+        Add the dyads of a raw event frame to the bucket of its extraction date.
+        """
+
+        if self.last_slice is not None and str(extracted_date) <= self.last_slice:
+            print(f'Interaction Graph Already Includes {extracted_date}')
+            return
+
+        actor1 = self.countries.get_indexer(df['actor1countrycode'])
+        actor2 = self.countries.get_indexer(df['actor2countrycode'])
+        keep = (actor1 >= 0) & (actor2 >= 0)
+
+        rows, cols = actor1[keep], actor2[keep]
+        tone = np.nan_to_num(df['avgtone'].values[keep].astype('float64'))
+        goldstein = np.nan_to_num(df['goldsteinscale'].values[keep].astype('float64'))
+
+        name = self.bucket_name(extracted_date)
+        new = {
+            'count': self.matrix(rows, cols, np.ones(len(rows))),
+            'tone': self.matrix(rows, cols, tone),
+            'goldstein': self.matrix(rows, cols, goldstein)
+        }
+
+        if name in self.buckets:
+            new = {stat: self.buckets[name][stat] + new[stat] for stat in self.stats}
+        self.buckets[name] = new
+        self.changed.add(name)
+
+        # Track Where Each Country's Actors Are Located
+        for prefix, idx in [('actor1', actor1), ('actor2', actor2)]:
+            lon = df[f'{prefix}geo_long'].values.astype('float64')
+            lat = df[f'{prefix}geo_lat'].values.astype('float64')
+            located = (idx >= 0) & np.isfinite(lon) & np.isfinite(lat)
+            self.locations[0] += np.bincount(idx[located], weights=lon[located], minlength=self.size)
+            self.locations[1] += np.bincount(idx[located], weights=lat[located], minlength=self.size)
+            self.locations[2] += np.bincount(idx[located], minlength=self.size)
+
+        self.last_slice = str(extracted_date)
+        self.save()
+
+        print(f'Added {keep.sum()} Dyads to Interaction Graph Bucket {name}')
+
+    def expire(self):
+
+        for name in sorted(self.buckets)[:-self.max_buckets]:
+            del self.buckets[name]
+            for path in glob.glob(os.path.join(self.directory, f'{name}_*.npz')):
+                os.remove(path)
+
+    def load(self):
+
+        for path in glob.glob(os.path.join(self.directory, '*_count.npz')):
+            name = os.path.basename(path).split('_')[0]
+            self.buckets[name] = {stat: sparse.load_npz(os.path.join(self.directory, f'{name}_{stat}.npz')) for stat in self.stats}
+
+        locations = os.path.join(self.directory, 'locations.npy')
+        if os.path.exists(locations):
+            self.locations = np.load(locations)
+
+        last_slice = os.path.join(self.directory, 'last_slice.txt')
+        if os.path.exists(last_slice):
+            with open(last_slice) as f:
+                self.last_slice = f.read().strip() or None
+
+    def save(self):
+        """
+        Expire old buckets & write the buckets changed since the last save.
+        """
+
+        self.expire()
+
+        for name in self.changed.intersection(self.buckets):
+            for stat, matrix in self.buckets[name].items():
+                sparse.save_npz(os.path.join(self.directory, f'{name}_{stat}.npz'), matrix)
+
+        self.changed = set()
+
+        np.save(os.path.join(self.directory, 'locations.npy'), self.locations)
+
+        if self.last_slice is not None:
+            with open(os.path.join(self.directory, 'last_slice.txt'), 'w') as f:
+                f.write(self.last_slice)
+
+    def totals(self, start=None, end=None):
+        """
+        Return one matrix per stat summed over the buckets between the start & end dates (inclusive).
+        """
+
+        start = self.bucket_name(start) if start else ''
+        end = self.bucket_name(end) if end else '9999'
+
+        totals = {stat: sparse.csr_matrix((self.size, self.size)) for stat in self.stats}
+        for name, bucket in self.buckets.items():
+            if start <= name <= end:
+                for stat in self.stats:
+                    totals[stat] = totals[stat] + bucket[stat]
+
+        return totals
+
+    def top_edges(self, n=100, start=None, end=None, labels=None):
+        """
+        Return a data frame of the n country pairs with the most events (self loops excluded) with their
+        average tone & Goldstein scale & the end point coordinates of the edge.
+        """
+
+        totals = self.totals(start, end)
+
+        counts = totals['count'].tocoo()
+        off_diagonal = counts.row != counts.col
+        rows, cols, values = counts.row[off_diagonal], counts.col[off_diagonal], counts.data[off_diagonal]
+
+        top = np.argsort(values)[::-1][:n]
+        rows, cols, values = rows[top], cols[top], values[top]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lon, lat = self.locations[0] / self.locations[2], self.locations[1] / self.locations[2]
+
+        codes = self.countries.values
+        labels = labels or {}
+
+        return pd.DataFrame({
+            'actor1countrycode': [labels.get(c, c) for c in codes[rows]],
+            'actor2countrycode': [labels.get(c, c) for c in codes[cols]],
+            'events': values.astype('int64'),
+            'avgtone': np.round(np.asarray(totals['tone'][rows, cols]).ravel() / values, 1),
+            'goldsteinscale': np.round(np.asarray(totals['goldstein'][rows, cols]).ravel() / values, 1),
+            'x1': lon[rows], 'y1': lat[rows],
+            'x2': lon[cols], 'y2': lat[cols]
+        })
+
+    def to_sdf(self, n=100, start=None, end=None, labels=None):
+        """
+        Return the top n edges as a spatially enabled data frame of lines between country locations.
+        """
+
+        df = self.top_edges(n, start, end, labels)
+        df = df.dropna(subset=['x1', 'y1', 'x2', 'y2']).reset_index(drop=True)
+
+        df['SHAPE'] = [Polyline({'paths': [[[x1, y1], [x2, y2]]], 'spatialReference': {'wkid': 4326}})
+                       for x1, y1, x2, y2 in df[['x1', 'y1', 'x2', 'y2']].values]
+        df.spatial.set_geometry('SHAPE')
+
+        return df.drop(columns=['x1', 'y1', 'x2', 'y2'])
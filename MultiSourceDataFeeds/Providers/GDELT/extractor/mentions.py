@@ -0,0 +1,119 @@
+from .schema import mentions_header
+
+from datetime import datetime, timedelta
+import pandas as pd
+import os
+
+
+class MentionsIndex(object):
+    """
+    Index of published GDELT events used to refresh their mention counts from the mentions stream.
+
+    Every published event keeps its globaleventid, sourceurl, nummentions & numsources along with the
+    slice it was published in. Each mentions export is streamed in chunks; mentions made after the event
+    (mentiontimedate > eventtimedate) of indexed events are counted & added to the event totals. Only the
+    sourceurl features whose averages changed are returned, matching the flattened layer aggregates.
+    Events older than max_age hours are expired & the index is persisted to a pickle between runs.
+    """
+
+    columns = ['globaleventid', 'eventtimedate', 'mentiontimedate', 'mentionsourcename']
+
+    def __init__(self, path, max_age=24, chunksize=250000):
+
+        self.path       = path
+        self.max_age    = max_age
+        self.chunksize  = chunksize
+        self.last_slice = None
+
+        self.events = pd.DataFrame(
+            {'sourceurl': pd.Series(dtype=str), 'nummentions': pd.Series(dtype='int64'),
+             'numsources': pd.Series(dtype='int64'), 'slice_date': pd.Series(dtype='datetime64[ns]')},
+            index=pd.Index([], dtype=str, name='globaleventid')
+        )
+
+        self.load()
+
+    def add(self, df, slice_name):
+        """
+        Index the events of a raw (unflattened) frame published in the slice.
+        """
+
+        new = df[['globaleventid', 'sourceurl', 'nummentions', 'numsources']].drop_duplicates('globaleventid')
+        new = new.astype({'globaleventid': str, 'nummentions': 'int64', 'numsources': 'int64'})
+        new['slice_date'] = pd.to_datetime(slice_name)
+
+        new = new.set_index('globaleventid')
+        self.events = pd.concat([self.events[~self.events.index.isin(new.index)], new])
+
+    def count(self, mentions_file):
+        """
+        Stream a mentions export & return the new mention & source counts per indexed globaleventid.
+        """
+
+        counts = []
+        dtypes = {'globaleventid': str, 'eventtimedate': 'int64', 'mentiontimedate': 'int64', 'mentionsourcename': str}
+
+        for chunk in pd.read_csv(mentions_file, sep='\t', names=mentions_header, usecols=self.columns, dtype=dtypes,
+                                 compression='zip' if mentions_file.endswith('.zip') else None,
+                                 chunksize=self.chunksize):
+
+            # Mentions in the Slice the Event Was Found Are Already Part of its Export Counts
+            chunk = chunk[(chunk['mentiontimedate'] > chunk['eventtimedate']) & chunk['globaleventid'].isin(self.events.index)]
+
+            if len(chunk):
+                counts.append(chunk.groupby('globaleventid').agg(
+                    nummentions=('mentiontimedate', 'size'),
+                    numsources=('mentionsourcename', 'nunique')
+                ))
+
+        if not counts:
+            return pd.DataFrame(columns=['nummentions', 'numsources'], dtype='int64')
+
+        return pd.concat(counts).groupby(level=0).sum()
+
+    def update(self, mentions_file, slice_name):
+        """
+        Add the mentions of a slice to the indexed events & return a data frame of sourceurl, nummentions
+        & numsources for every feature whose averages changed. A slice is only counted once.
+
+        NOTE: numsources is the sum of distinct sources per slice, so a source mentioning an event again in
+        a later slice is counted again.
+        """
+
+        if slice_name == self.last_slice:
+            print(f'Mentions Already Counted for {slice_name}')
+            return pd.DataFrame(columns=['sourceurl', 'nummentions', 'numsources'])
+
+        counts = self.count(mentions_file)
+        self.last_slice = slice_name
+
+        self.events.loc[counts.index, 'nummentions'] += counts['nummentions'].values
+        self.events.loc[counts.index, 'numsources'] += counts['numsources'].values
+
+        # Recompute the Per-URL Means (as in process_df) for the URLs That Have Updated Events
+        urls = self.events.loc[counts.index, 'sourceurl'].unique()
+        changed = self.events[self.events['sourceurl'].isin(urls)] \
+            .groupby('sourceurl')[['nummentions', 'numsources']].mean().round(1).reset_index()
+
+        print(f'Counted {int(counts["nummentions"].sum())} New Mentions of {len(counts)} Events in {len(changed)} Articles')
+
+        return changed
+
+    def expire(self, now=None):
+
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=self.max_age)
+        expired = self.events['slice_date'] < cutoff
+
+        if expired.any():
+            self.events = self.events[~expired]
+            print(f'Expired {expired.sum()} Events from Mentions Index')
+
+    def load(self):
+
+        if os.path.exists(self.path):
+            self.events, self.last_slice = pd.read_pickle(self.path)
+            print(f'Loaded Mentions Index: {len(self.events)} Events')
+
+    def save(self):
+
+        pd.to_pickle((self.events, self.last_slice), self.path)
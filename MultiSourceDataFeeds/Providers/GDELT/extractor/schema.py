@@ -123,6 +123,25 @@ v1_header = [
     'sourceurl'
 ]
 
+mentions_header = [
+    'globaleventid',
+    'eventtimedate',
+    'mentiontimedate',
+    'mentiontype',
+    'mentionsourcename',
+    'mentionidentifier',
+    'sentenceid',
+    'actor1charoffset',
+    'actor2charoffset',
+    'actioncharoffset',
+    'inrawtext',
+    'confidence',
+    'mentiondoclen',
+    'mentiondoctone',
+    'mentiondoctranslationinfo',
+    'extras'
+]
+
 article_columns = [
     'sourceurl',
     'title',
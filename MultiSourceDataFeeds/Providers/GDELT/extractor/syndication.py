@@ -0,0 +1,202 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from itertools import combinations
+
+import pandas as pd
+import numpy as np
+import re
+
+
+# Query Parameters That Only Track the Click & Never Change the Article
+tracking_params = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ocid', 'cmpid', 'cmp', 'ncid', 'ref', 'ref_src',
+    'src', 'smid', 'smtyp', 'ito', 'amp', 'outputtype', 'output', 'rss', 'feed', 'cid', 'icid'
+}
+
+word_pattern = re.compile(r'[a-z0-9]+')
+
+# Text Newspaper Returns for Error Pages, Paywalls & Consent Walls Instead of the Article
+boilerplate_texts = [
+    '404 page not found the page you are looking for does not exist or has been moved',
+    'access denied you do not have permission to access this page on this server',
+    'subscribe to continue reading this article is for subscribers only already a subscriber sign in',
+    'please enable javascript and cookies to continue this site requires javascript to be enabled',
+    'we use cookies to improve your experience by continuing to browse you agree to our use of cookies',
+    'are you a robot please verify you are a human to continue',
+]
+
+
+def canonicalize_url(url):
+    """
+    Return a canonical form of an article url so AMP, mobile and tracking variants of the same
+    story collapse to a single url.
+    """
+
+    try:
+        parts = urlsplit(str(url).strip())
+    except ValueError:
+        return url
+
+    if not parts.netloc:
+        return url
+
+    host = parts.netloc.lower()
+    for prefix in ['www.', 'amp.', 'm.', 'mobile.']:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    path = re.sub(r'(/amp|\.amp)(?=/?$|\.html?$)', '', parts.path)
+    path = re.sub(r'/amp/', '/', path)
+    path = path.rstrip('/') or '/'
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith('utm_') and k.lower() not in tracking_params]
+
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+
+def canonicalize(urls):
+    """
+    Canonicalize a series of urls; each distinct url is only parsed once.
+    """
+
+    unique_urls = urls.unique()
+
+    return urls.map(dict(zip(unique_urls, [canonicalize_url(u) for u in unique_urls])))
+
+
+def simhash(text, shingle_size=3):
+    """
+    Return the 64-bit SimHash signature of a text built from hashed word shingles.
+    """
+
+    words = word_pattern.findall(str(text).lower())
+
+    if not words:
+        return None
+
+    shingles = [' '.join(words[i:i + shingle_size]) for i in range(max(len(words) - shingle_size + 1, 1))]
+    hashes = pd.util.hash_array(np.array(shingles, dtype=object))
+
+    # One Row of 64 Bits per Shingle; Each Bit Votes +1/-1 & the Majority Sets the Signature Bit
+    bits = np.unpackbits(hashes.astype('>u8').view(np.uint8).reshape(-1, 8), axis=1)
+    votes = (bits.astype('int64') * 2 - 1).sum(axis=0)
+
+    return int(np.packbits(votes > 0).view('>u8')[0])
+
+
+boilerplate_signatures = [simhash(t) for t in boilerplate_texts]
+
+
+def fingerprint(text, min_words=8, max_distance=6):
+    """
+    Return the SimHash signature of an article text, or None when the text is too short to tell
+    stories apart or is within max_distance bits of known boilerplate. Such texts would share one
+    signature & pull unrelated stories into one cluster.
+    """
+
+    if len(word_pattern.findall(str(text).lower())) < min_words:
+        return None
+
+    signature = simhash(text)
+
+    if any(bin(signature ^ b).count('1') <= max_distance for b in boilerplate_signatures):
+        return None
+
+    return signature
+
+
+class UnionFind(object):
+
+    def __init__(self, size):
+
+        self.parent = np.arange(size)
+
+    def find(self, i):
+
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+
+        return i
+
+    def union(self, i, j):
+
+        root_i, root_j = self.find(i), self.find(j)
+
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def cluster_articles(df, text_fields=('title', 'summary'), max_distance=6, bands=8, delimiter=';', max_length=2000,
+                     min_words=8, max_bucket=50):
+    """
+    Group near-duplicate (syndicated) articles & return one row per cluster.
+
+    Signatures are SimHash values of the title & summary text; texts shorter than min_words or matching
+    known boilerplate get none and stay on their own. Candidate pairs come from an LSH index that splits
+    the 64 signature bits into bands; with bands > max_distance any two signatures within max_distance
+    bits share at least one band. Articles with identical signatures are joined directly; buckets holding
+    more than max_bucket distinct signatures are skipped, since comparing every pair in them is
+    quadratic. Candidates are confirmed on their Hamming distance.
+
+    The row with the most articles is kept for each cluster, with a syndication_count and the member
+    urls in syndicated_urls (cut to max_length characters). Also returns a data frame pairing the
+    sourceurl of every kept row with each of its member urls (syndicated_url), uncut.
+    """
+
+    df = df.reset_index(drop=True)
+    text = df[list(text_fields)].fillna('').astype(str).agg(' '.join, axis=1)
+    signatures = [fingerprint(t, min_words, max_distance) for t in text]
+
+    uf = UnionFind(len(df))
+    band_bits = 64 // bands
+    band_mask = (1 << band_bits) - 1
+
+    # LSH Buckets Keyed by (Band Number, Band Value)
+    buckets = {}
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        for band in range(bands):
+            buckets.setdefault((band, (sig >> (band * band_bits)) & band_mask), []).append(i)
+
+    skipped = 0
+    for members in buckets.values():
+
+        # Identical Signatures Are Joined Directly; Only Distinct Ones Are Compared Pairwise
+        distinct = {}
+        for i in members:
+            uf.union(distinct.setdefault(signatures[i], i), i)
+        members = list(distinct.values())
+
+        if len(members) > max_bucket:
+            skipped += 1
+            continue
+
+        for i, j in combinations(members, 2):
+            if uf.find(i) != uf.find(j) and bin(signatures[i] ^ signatures[j]).count('1') <= max_distance:
+                uf.union(i, j)
+
+    if skipped:
+        print(f'Skipped {skipped} LSH Buckets With More Than {max_bucket} Articles')
+
+    df['cluster'] = [uf.find(i) for i in range(len(df))]
+
+    clusters = df.groupby('cluster')['sourceurl'].agg(
+        syndication_count='count',
+        syndicated_urls=lambda urls: f'{delimiter} '.join(urls)[:max_length]
+    ).reset_index()
+
+    # Keep the Best Covered Article of Each Cluster
+    if 'numarticles' in df.columns:
+        df = df.sort_values('numarticles', ascending=False, kind='stable')
+    kept = df.drop_duplicates('cluster')
+
+    members = df[['cluster', 'sourceurl']].rename(columns={'sourceurl': 'syndicated_url'}) \
+        .merge(kept[['cluster', 'sourceurl']], on='cluster')[['sourceurl', 'syndicated_url']]
+
+    df = kept.merge(clusters, on='cluster').drop(columns=['cluster'])
+
+    print(f'Clustered Articles into {len(df)} Stories')
+
+    return df, members
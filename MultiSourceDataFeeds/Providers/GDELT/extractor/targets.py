@@ -0,0 +1,238 @@
+from .featureset import to_edit_json, apply_edits
+
+from arcgis.features import GeoAccessor
+from arcgis.gis import GIS
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pandas as pd
+import traceback
+import time
+import os
+
+
+class FeatureLayerTarget(object):
+    """
+    Hosted feature layer in any portal or organization. Every target keeps its own GIS connection &
+    batch size, so one slow or failing organization does not hold up the others. The connection is
+    made on the first publish, inside the target's own thread, so a failed login only fails that
+    target & is tried again with the next slice.
+    """
+
+    def __init__(self, name, item_id, url, username, password, batch_size=500, max_age=24):
+
+        self.name       = name
+        self.item_id    = item_id
+        self.url        = url
+        self.username   = username
+        self.password   = password
+        self.batch_size = batch_size
+        self.max_age    = max_age
+        self.gis        = None
+
+    def connect(self):
+
+        if self.gis is None:
+            self.gis = GIS(self.url, self.username, self.password)
+
+        return self.gis
+
+    def publish(self, df, csv_name):
+
+        item = self.connect().content.get(self.item_id)
+
+        if not item:
+            raise Exception(f'Input Item ID Not Found in GIS: {self.item_id}')
+
+        lyr = item.layers[0]
+
+        # Skip Slices the Target Already Has in Full (i.e. a Rerun After Another Target Failed)
+        slice_date = datetime.strptime(csv_name, '%Y%m%d%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
+        slice_where = f"extracted_date = timestamp '{slice_date}'"
+        existing = lyr.query(where=slice_where, return_count_only=True)
+        if existing >= len(df):
+            return f'Data Already Extracted for {slice_date}'
+
+        # A Slice Left Partly Added by an Earlier Failure is Removed & Added Again as a Whole
+        if existing:
+            print(f'Target {self.name} Has {existing} of {len(df)} Rows for {slice_date} - Replacing the Slice')
+            lyr.delete_features(where=slice_where)
+
+        # Remove Data Older Than Max Age
+        past_date = (datetime.utcnow() - timedelta(hours=self.max_age)).strftime('%Y-%m-%d %H:%M:%S')
+        lyr.delete_features(where=f"extracted_date < timestamp '{past_date}'")
+
+        added = 0
+        for adds in to_edit_json(df, 'actiongeo_long', 'actiongeo_lat', batch_size=self.batch_size):
+            added += len([i for i in apply_edits(lyr, adds=adds)['addResults'] if i['success']])
+
+        # Rejected Rows Fail the Slice, so it is Sent Again (& the Partial Slice Replaced) With the Next Run
+        if added < len(df):
+            raise Exception(f'Added {added} rows of {len(df)} for {slice_date}')
+
+        return f'Added {added} rows of {len(df)}'
+
+
+class GeodatabaseTarget(object):
+    """
+    File geodatabase receiving one feature class per slice (V2_<slice>), like the GDELT 1.0 runner.
+    """
+
+    def __init__(self, name, gdb_path):
+
+        self.name     = name
+        self.gdb_path = gdb_path
+
+    def publish(self, df, csv_name):
+
+        fc = df.spatial.to_featureclass(os.path.join(self.gdb_path, f'V2_{csv_name}'), overwrite=True)
+
+        return f'Created Local Feature Class: {fc}'
+
+
+def targets_from_config(config, max_age=24):
+    """
+    Build a target for every [Target:<name>] section of the configuration file. Hosted feature layer
+    targets (type = hfl) take item_id, agol_url, username, password & batch_size; file geodatabase
+    targets (type = gdb) take gdb_path.
+    """
+
+    targets = []
+
+    for section in config.sections():
+        if not section.startswith('Target:'):
+            continue
+
+        name = section.split(':', 1)[1]
+        kind = config.get(section, 'type', fallback='hfl')
+
+        if kind == 'gdb':
+            targets.append(GeodatabaseTarget(name, config.get(section, 'gdb_path')))
+        else:
+            targets.append(FeatureLayerTarget(
+                name,
+                config.get(section, 'item_id'),
+                config.get(section, 'agol_url'),
+                config.get(section, 'username'),
+                config.get(section, 'password'),
+                batch_size=config.getint(section, 'batch_size', fallback=500),
+                max_age=max_age
+            ))
+
+    return targets
+
+
+class FanOut(object):
+    """
+    Publish one processed slice to several targets at once. Each target runs in its own thread & its
+    failures are caught & reported without affecting the other targets.
+
+    Slices a target failed to publish are kept (up to max_age hours old) & sent to it again, oldest
+    first, with the next submit, so a target catches up once it is reachable again. Calling submit
+    without a slice only sends those (i.e. when the main layer already has the current slice). With a
+    path, the failed slices are also written to <path>/<target>/<slice>.pkl and read back on start, so
+    runs started by a scheduled task catch up as well.
+    """
+
+    def __init__(self, targets, max_workers=None, max_age=24, path=None):
+
+        self.targets  = targets
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or max(len(targets), 1))
+        self.max_age  = max_age
+        self.path     = path
+        self.futures  = {}
+        self.failed   = self.load()
+
+    def load(self):
+        """
+        Return {target name: {slice: data frame}} with the failed slices saved by earlier runs.
+        """
+
+        failed = {}
+
+        if not self.path:
+            return failed
+
+        for t in self.targets:
+            folder = os.path.join(self.path, t.name)
+            if os.path.isdir(folder):
+                failed[t.name] = {f[:-4]: pd.read_pickle(os.path.join(folder, f))
+                                  for f in sorted(os.listdir(folder)) if f.endswith('.pkl')}
+
+        return failed
+
+    def save(self):
+        """
+        Write the failed slices not saved yet & remove the files of slices that were published or expired.
+        """
+
+        if not self.path:
+            return
+
+        for name, slices in self.failed.items():
+            folder = os.path.join(self.path, name)
+            os.makedirs(folder, exist_ok=True)
+
+            for f in os.listdir(folder):
+                if f.endswith('.pkl') and f[:-4] not in slices:
+                    os.remove(os.path.join(folder, f))
+
+            for csv_name, df in slices.items():
+                if not os.path.exists(os.path.join(folder, f'{csv_name}.pkl')):
+                    df.to_pickle(os.path.join(folder, f'{csv_name}.pkl'))
+
+    @staticmethod
+    def run_target(target, slices):
+
+        start = time.time()
+        messages, done = [], []
+
+        try:
+            for csv_name, df in slices:
+                messages.append(target.publish(df, csv_name))
+                done.append(csv_name)
+            return True, '; '.join(messages), done, time.time() - start
+        except Exception:
+            return False, traceback.format_exc(), done, time.time() - start
+
+    def submit(self, df=None, csv_name=None):
+        """
+        Start publishing the slice, after any slice the target failed earlier, to every target & return immediately.
+        """
+
+        cutoff = (datetime.utcnow() - timedelta(hours=self.max_age)).strftime('%Y%m%d%H%M%S')
+
+        self.futures = {}
+        for t in self.targets:
+            slices = {name: sdf for name, sdf in self.failed.get(t.name, {}).items() if name >= cutoff}
+            if df is not None:
+                slices[csv_name] = df
+            self.failed[t.name] = slices
+
+            if slices:
+                self.futures[t.name] = self.executor.submit(self.run_target, t, sorted(slices.items(), key=lambda s: s[0]))
+
+    def wait(self):
+        """
+        Wait for the submitted slices & return {target name: (success, message, seconds)}.
+        """
+
+        results = {}
+
+        for name, future in self.futures.items():
+            success, message, done, seconds = future.result()
+
+            # Published Slices Are Dropped; the Rest Are Sent Again With the Next Submit
+            for csv_name in done:
+                self.failed[name].pop(csv_name, None)
+
+            results[name] = (success, message, seconds)
+            print(f"Target {name} {'Succeeded' if success else 'Failed'} in {round(seconds, 1)}s: {message}")
+
+            if self.failed[name]:
+                print(f'Target {name} Has {len(self.failed[name])} Slice(s) to Catch Up')
+
+        self.futures = {}
+        self.save()
+
+        return results
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Runners & the extractor Package are Imported From the GDELT Folder, the Way the .bat Files Run Them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
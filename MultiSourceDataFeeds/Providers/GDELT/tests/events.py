@@ -0,0 +1,28 @@
+from extractor.schema import v2_header, dtype_map
+
+import pandas as pd
+import io
+
+
+defaults = {
+    'sqldate': 20240101, 'monthyear': 202401, 'year': 2024, 'fractiondate': 2024.0,
+    'actor1code': 'USA', 'actor1name': 'UNITED STATES', 'actor1countrycode': 'USA',
+    'actor2code': 'FRA', 'actor2name': 'FRANCE', 'actor2countrycode': 'FRA',
+    'isrootevent': '1', 'eventcode': '010', 'eventbasecode': '010', 'eventrootcode': '01', 'quadclass': '1',
+    'goldsteinscale': 0.0, 'nummentions': 1, 'numsources': 1, 'numarticles': 1, 'avgtone': 0.0,
+    'actor1geo_type': 1, 'actor2geo_type': 1,
+    'actiongeo_type': 4, 'actiongeo_fullname': 'Paris, France', 'actiongeo_countrycode': 'FR',
+    'actiongeo_lat': 48.85, 'actiongeo_long': 2.35, 'dateadded': '20240101000000',
+}
+
+
+def raw_slice(rows):
+    """
+    Build a raw GDELT 2.0 export slice the way get_v2_sdf reads one; every row is a dict of the values
+    that differ from the defaults.
+    """
+
+    records = [{**defaults, 'globaleventid': str(i + 1), 'sourceurl': f'https://news.example/{i}', **row} for i, row in enumerate(rows)]
+    tsv = pd.DataFrame(records, columns=v2_header).to_csv(sep='\t', header=False, index=False)
+
+    return pd.read_csv(io.StringIO(tsv), sep='\t', names=v2_header, dtype=dtype_map)
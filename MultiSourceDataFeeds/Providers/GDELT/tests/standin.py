@@ -0,0 +1,198 @@
+import pandas as pd
+import itertools
+import json
+import re
+import io
+
+
+class Properties(dict):
+    """
+    Layer properties readable as keys or attributes, like the arcgis PropertyMap.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class StandInConnection(object):
+    """
+    Connection of a stand-in layer. applyEdits posts are decoded & handed to the layer's edit_features.
+    """
+
+    def __init__(self, lyr):
+
+        self.lyr   = lyr
+        self.posts = []
+
+    def post_multipart(self, path, postdata=None):
+
+        self.posts.append((path, postdata))
+
+        return self.lyr.edit_features(
+            adds=json.loads(postdata['adds']) if 'adds' in postdata else None,
+            updates=json.loads(postdata['updates']) if 'updates' in postdata else None,
+            deletes=postdata.get('deletes'),
+            rollback_on_failure=postdata['rollbackOnFailure'] == 'true'
+        )
+
+
+class StandInItem(object):
+
+    def __init__(self, gis, item_id, properties, data):
+
+        self.gis        = gis
+        self.id         = item_id
+        self.properties = properties
+        self.data       = data
+
+    def delete(self):
+
+        self.gis.items.pop(self.id, None)
+        return True
+
+
+class StandInContent(object):
+
+    def __init__(self, gis):
+
+        self.gis = gis
+
+    def add(self, item_properties, data=None):
+
+        # The Caller May Remove the File Right After the Upload, So Keep its Contents
+        with open(data, 'rb') as f:
+            item = StandInItem(self.gis, f'item{next(self.gis.ids)}', item_properties, f.read())
+
+        self.gis.items[item.id] = item
+        return item
+
+    def analyze(self, item=None, file_type=None, location_type=None):
+
+        columns = pd.read_csv(io.BytesIO(self.gis.items[item].data), nrows=0).columns
+        return {'publishParameters': {'type': file_type, 'columnNames': list(columns), 'locationType': location_type}}
+
+
+class StandInManager(object):
+
+    def __init__(self, lyr):
+
+        self.lyr = lyr
+
+    def add_to_definition(self, json_dict):
+
+        self.lyr.properties['indexes'] = self.lyr.properties.get('indexes', []) + json_dict.get('indexes', [])
+        return {'success': True}
+
+
+class StandInResult(object):
+
+    def __init__(self, sdf):
+
+        self.sdf = sdf
+
+
+class StandInLayer(object):
+    """
+    Feature layer kept in a data frame. append upserts uploaded CSV rows on a uniquely indexed field
+    and fails like a hosted layer when the field has no unique index. query understands `<field> IN (...)`
+    where clauses; edit_features rejects adds of a value a unique index already holds.
+    """
+
+    def __init__(self, gis, url='https://standin/FeatureServer/0', rows=None, supports_append=True):
+
+        self.gis        = gis
+        self.url        = url
+        self.rows       = pd.DataFrame(rows or [])
+        self.properties = Properties(supportsAppend=supports_append, indexes=[], objectIdField='objectid')
+        self.manager    = StandInManager(self)
+        self._con       = StandInConnection(self)
+        self.oids       = itertools.count(1)
+        self.appends    = []
+
+        if len(self.rows):
+            self.rows['objectid'] = [next(self.oids) for _ in range(len(self.rows))]
+
+    def unique(self, field):
+
+        return any(i['fields'].lower() == field.lower() and i.get('isUnique') for i in self.properties['indexes'])
+
+    def query(self, where='1=1', out_fields='*', return_geometry=True):
+
+        rows = self.rows
+        match = re.match(r"(\w+) IN \((.*)\)$", where or '1=1')
+
+        if match and len(rows):
+            values = [v.replace("''", "'") for v in re.findall(r"'((?:[^']|'')*)'", match.group(2))]
+            rows = rows[rows[match.group(1)].astype(str).isin(values)]
+
+        if out_fields != '*':
+            rows = rows.reindex(columns=out_fields.split(','))
+
+        return StandInResult(rows.reset_index(drop=True))
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+
+        add_results = []
+        for feature in adds or []:
+            attributes = feature['attributes']
+            taken = [f for f in attributes if self.unique(f) and f in self.rows and (self.rows[f] == attributes[f]).any()]
+            if taken:
+                add_results.append({'objectId': None, 'success': False})
+                continue
+            oid = next(self.oids)
+            self.rows = pd.concat([self.rows, pd.DataFrame([dict(attributes, objectid=oid)])], ignore_index=True)
+            add_results.append({'objectId': oid, 'success': True})
+
+        update_results = []
+        for feature in updates or []:
+            attributes = dict(feature['attributes'])
+            oid = attributes.pop('objectid')
+            match = self.rows['objectid'] == oid
+            for field, value in attributes.items():
+                self.rows.loc[match, field] = value
+            update_results.append({'objectId': oid, 'success': bool(match.any())})
+
+        return {'addResults': add_results, 'updateResults': update_results, 'deleteResults': []}
+
+    def append(self, item_id=None, upload_format=None, source_info=None, upsert=True,
+               upsert_matching_field=None, update_geometry=True):
+
+        if upsert and not self.unique(upsert_matching_field):
+            raise Exception(f'Upsert Field {upsert_matching_field} Has No Unique Index')
+
+        df = pd.read_csv(io.BytesIO(self.gis.items[item_id].data))
+        df['x'] = df[source_info['longitudeFieldName']]
+        df['y'] = df[source_info['latitudeFieldName']]
+        self.appends.append(len(df))
+
+        # Upserted Features Keep Their Object ID
+        oids = {}
+        if upsert and len(self.rows):
+            replaced = self.rows[upsert_matching_field].isin(df[upsert_matching_field])
+            oids = self.rows[replaced].set_index(upsert_matching_field)['objectid'].to_dict()
+            self.rows = self.rows[~replaced]
+
+        df['objectid'] = [oids[k] if k in oids else next(self.oids) for k in df[upsert_matching_field]]
+
+        self.rows = pd.concat([self.rows, df], ignore_index=True)
+        return True
+
+
+class StandInGIS(object):
+    """
+    Local stand-in for the parts of a portal the append sink uses: content.add, content.analyze,
+    item.delete & FeatureLayer.append.
+    """
+
+    def __init__(self):
+
+        self.ids     = itertools.count(1)
+        self.items   = {}
+        self.content = StandInContent(self)
+
+    def layer(self, **kwargs):
+
+        return StandInLayer(self, **kwargs)
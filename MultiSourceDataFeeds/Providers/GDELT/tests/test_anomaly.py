@@ -0,0 +1,75 @@
+import pandas as pd
+
+from extractor import Extractor
+from extractor.anomaly import AnomalyDetector
+from events import raw_slice
+from standin import StandInConnection
+
+
+def slice_events(tone, count=5):
+    return raw_slice([{'actiongeo_countrycode': 'FR', 'quadclass': '1', 'avgtone': tone + i % 2} for i in range(count)])
+
+
+def slice_name(i):
+    return (pd.Timestamp('2024-01-01') + pd.Timedelta(minutes=15 * i)).strftime('%Y%m%d%H%M%S')
+
+
+def trained(path, periods=4):
+    detector = AnomalyDetector(path, alpha=0.5, threshold=3.0, min_periods=periods)
+    for i in range(periods):
+        detector.update(slice_events(0.0 + (i % 2) * 0.5), slice_name(i))
+    return detector
+
+
+def test_sharp_shift_is_flagged(tmp_path):
+    detector = trained(str(tmp_path / 'anomaly.csv'))
+
+    anomalies = detector.update(slice_events(-20.0), slice_name(10))
+
+    assert anomalies['stat'].tolist() == ['avgtone']
+    assert anomalies['actiongeo_countrycode'].tolist() == ['FR']
+    assert anomalies['zscore'].iloc[0] < -3
+
+
+def test_old_slices_and_small_keys_are_ignored(tmp_path):
+    path = str(tmp_path / 'anomaly.csv')
+    detector = trained(path)
+
+    # Baselines Are Reloaded & a Slice That is Not Newer is Skipped
+    detector = AnomalyDetector(path, alpha=0.5, min_periods=4)
+    assert not len(detector.update(slice_events(-20.0), slice_name(3)))
+    assert detector.state['periods'].tolist() == [4]
+
+    assert not len(detector.update(slice_events(-20.0, count=2), slice_name(11)))
+
+
+class Table(object):
+
+    def __init__(self):
+        self.rows = []
+        self.url = 'https://standin/FeatureServer/0'
+        self._con = StandInConnection(self)
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+        self.rows += adds
+        return {'addResults': [{'success': True} for _ in adds]}
+
+
+def test_anomalies_are_published_once(tmp_path, monkeypatch):
+    e = Extractor()
+    e.anomaly = trained(str(tmp_path / 'anomaly.csv'))
+    e.anomaly.update(slice_events(-20.0), slice_name(10))
+
+    table = Table()
+
+    class Item(object):
+        tables = [table]
+
+    monkeypatch.setattr(Extractor, 'get_gis_item', staticmethod(lambda item_id, gis: Item()))
+
+    # The Next Daemon Loop Finds its Slice Already Extracted & Publishes Again
+    e.publish_anomalies('anomalies')
+    e.publish_anomalies('anomalies')
+
+    assert len(table.rows) == 1
+    assert table.rows[0]['attributes']['country'] == e.country_fips['FR']
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from extractor.aoi import AreaOfInterest, Polygon
+
+
+def test_polygon_with_hole():
+    outer = [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]]
+    hole = [[4, 4], [6, 4], [6, 6], [4, 6]]
+    polygon = Polygon([outer, hole])
+
+    inside = polygon.contains(np.array([1.0, 5.0, 11.0]), np.array([1.0, 5.0, 5.0]))
+
+    assert inside.tolist() == [True, False, False]
+
+
+def test_degenerate_rings_are_skipped():
+    square = [[0, 0], [0, 1], [1, 1], [1, 0]]
+    polygon = Polygon([[[5, 5], [6, 6]], [[7, 7], [8, 8], [7, 7]], square])
+
+    assert polygon.contains(np.array([0.5]), np.array([0.5])).tolist() == [True]
+    assert polygon.extent == (0, 0, 1, 1)
+
+
+@pytest.mark.parametrize('rings', [[], [[]], [[[0, 0], [1, 1]]], [[[0, 0], [1, 1], [0, 0]]]])
+def test_polygon_without_valid_ring_raises(rings):
+    with pytest.raises(ValueError, match='3 Distinct Vertices'):
+        Polygon(rings)
+
+
+def test_area_of_interest_filter():
+    aoi = AreaOfInterest()
+    aoi.add_bbox(-10, -10, 10, 10)
+    aoi.add_countries(['fr'])
+
+    df = pd.DataFrame({
+        'actiongeo_long': [0.0, 50.0, 50.0],
+        'actiongeo_lat': [0.0, 50.0, 50.0],
+        'actiongeo_countrycode': ['US', 'FR', 'GM'],
+    })
+
+    assert aoi.filter(df).index.tolist() == [0, 1]
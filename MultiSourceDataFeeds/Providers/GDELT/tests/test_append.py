@@ -0,0 +1,112 @@
+import pandas as pd
+
+from extractor import Extractor
+from extractor.append import AppendSink
+from standin import StandInGIS
+
+
+def slice_df(urls, tone):
+    return pd.DataFrame({
+        'sourceurl': urls,
+        'avgtone': [tone] * len(urls),
+        'actiongeo_long': [10.0] * len(urls),
+        'actiongeo_lat': [20.0] * len(urls),
+        'extracted_date': pd.Timestamp('2024-01-01', tz='UTC'),
+    })
+
+
+def test_append_adds_unique_index_and_upserts():
+    gis = StandInGIS()
+    lyr = gis.layer()
+    sink = AppendSink(gis, threshold=2)
+
+    assert sink.append(lyr, slice_df(['a', 'b'], 1.0))
+    assert sink.append(lyr, slice_df(['b', 'c'], 2.0))
+
+    # Index Added Once, on the First Append to the Layer
+    assert [i['fields'] for i in lyr.properties['indexes']] == ['sourceurl']
+    assert sorted(lyr.rows['sourceurl']) == ['a', 'b', 'c']
+    assert lyr.rows.set_index('sourceurl')['avgtone'].to_dict() == {'a': 1.0, 'b': 2.0, 'c': 2.0}
+    assert lyr.rows['extracted_date'].iloc[0] == '2024-01-01 00:00:00'
+
+    # Uploaded Items Are Removed After Each Job
+    assert gis.items == {}
+
+
+def test_prepare_skips_existing_index():
+    gis = StandInGIS()
+    lyr = gis.layer()
+    lyr.properties['indexes'] = [{'fields': 'SourceURL', 'isUnique': True}]
+
+    AppendSink(gis).prepare(lyr)
+
+    assert len(lyr.properties['indexes']) == 1
+
+
+def test_use_append_threshold_and_support():
+    gis = StandInGIS()
+    sink = AppendSink(gis, threshold=3)
+    df = slice_df(['a', 'b', 'c'], 1.0)
+
+    assert sink.use_append(gis.layer(), df)
+    assert not sink.use_append(gis.layer(), df.head(2))
+    assert not sink.use_append(gis.layer(supports_append=False), df)
+
+
+def test_push_falls_back_to_edits(monkeypatch):
+    gis = StandInGIS()
+    lyr = gis.layer()
+    e = Extractor()
+    e.append_sink = AppendSink(gis, threshold=1)
+
+    edits = []
+    monkeypatch.setattr(e, 'process_edits', lambda l, df, operation: edits.append((operation, len(df))))
+    monkeypatch.setattr(lyr, 'append', lambda **kwargs: False)
+
+    e.push(lyr, slice_df(['a', 'b'], 1.0))
+
+    assert edits == [('add', 2)]
+
+
+def test_prepare_reports_duplicates_instead_of_indexing(capsys):
+    gis = StandInGIS()
+    lyr = gis.layer(rows=[{'sourceurl': 'a'}, {'sourceurl': 'a'}, {'sourceurl': 'b'}])
+    sink = AppendSink(gis, threshold=1)
+
+    assert not sink.use_append(lyr, slice_df(['c'], 1.0))
+    assert not sink.append(lyr, slice_df(['c'], 1.0))
+
+    # Reported Once, Not Tried Again for Every Slice
+    assert lyr.properties['indexes'] == []
+    assert capsys.readouterr().out.count('1 Values Are Duplicated (i.e. a)') == 1
+
+
+def test_push_sends_published_urls_as_updates():
+    gis = StandInGIS()
+    lyr = gis.layer(rows=[{'sourceurl': 'a', 'avgtone': 1.0, 'extracted_date': 1700000000000}])
+    lyr.properties['indexes'] = [{'fields': 'sourceurl', 'isUnique': True}]
+    e = Extractor()
+    e.append_sink = AppendSink(gis, threshold=100)
+
+    applied = e.push(lyr, slice_df(['b', 'a'], 2.0))
+
+    # The Repeated URL Updates its Feature & Keeps the Date it Was First Published With
+    assert applied.tolist() == [True, True]
+    assert len(lyr.rows) == 2
+    assert lyr.rows.set_index('sourceurl')['avgtone'].to_dict() == {'a': 2.0, 'b': 2.0}
+    assert lyr.rows.set_index('sourceurl')['extracted_date']['a'] == 1700000000000
+
+
+def test_append_keeps_first_extracted_date():
+    gis = StandInGIS()
+    lyr = gis.layer()
+    e = Extractor()
+    e.append_sink = AppendSink(gis, threshold=2)
+
+    e.push(lyr, slice_df(['a', 'b'], 1.0))
+    later = slice_df(['b', 'c'], 2.0).assign(extracted_date=pd.Timestamp('2024-01-02', tz='UTC'))
+    assert e.push(lyr, later).all()
+
+    dates = lyr.rows.set_index('sourceurl')['extracted_date'].to_dict()
+    assert dates == {'a': '2024-01-01 00:00:00', 'b': '2024-01-01 00:00:00', 'c': '2024-01-02 00:00:00'}
+    assert lyr.rows.set_index('sourceurl')['avgtone'].to_dict() == {'a': 1.0, 'b': 2.0, 'c': 2.0}
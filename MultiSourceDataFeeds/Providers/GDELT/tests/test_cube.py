@@ -0,0 +1,58 @@
+import pytest
+
+from extractor.cube import EventCube
+from events import raw_slice
+
+
+def slice_events():
+    return raw_slice([
+        {'actiongeo_countrycode': 'FR', 'eventrootcode': '14', 'quadclass': '3', 'avgtone': -2.0},
+        {'actiongeo_countrycode': 'FR', 'eventrootcode': '14', 'quadclass': '3', 'avgtone': -4.0},
+        {'actiongeo_countrycode': 'XX', 'eventrootcode': '01', 'quadclass': '1', 'avgtone': 1.0},
+    ])
+
+
+def test_update_and_query(tmp_path):
+    cube = EventCube(str(tmp_path), ['FR', 'US'], days=10)
+    cube.update(slice_events(), '20240101000000')
+
+    by_country = cube.query('2024-01-01', '2024-01-01', by=('country',)).set_index('country')['count']
+    assert by_country.to_dict() == {'FR': 2, 'US': 0, 'Unknown': 1}
+
+    tone = cube.query('2024-01-01', '2024-01-01', stat='avg_tone', countries=['FR'], roots=[14], by=('day',))
+    assert tone['avg_tone'].tolist() == [-3.0]
+
+
+def test_query_rejects_unknown_keys(tmp_path):
+    cube = EventCube(str(tmp_path), ['FR', 'US'], days=10)
+    cube.update(slice_events(), '20240101000000')
+
+    # Unknown Keys Must Not Fall Through to the Last (Unknown) Cell
+    with pytest.raises(KeyError, match='XX'):
+        cube.query('2024-01-01', '2024-01-01', countries=['XX'])
+    with pytest.raises(KeyError, match='99'):
+        cube.query('2024-01-01', '2024-01-01', roots=[14, 99])
+    with pytest.raises(KeyError, match='quad'):
+        cube.query('2024-01-01', '2024-01-01', quads=[7])
+
+
+def test_slice_is_only_added_once(tmp_path):
+    cube = EventCube(str(tmp_path), ['FR', 'US'], days=10)
+    cube.update(slice_events(), '20240101000000')
+    cube.update(slice_events(), '20240101000000')
+
+    # The Guard Survives a Restart; a Newer Slice is Still Added
+    cube = EventCube(str(tmp_path), [])
+    cube.update(slice_events(), '20240101000000')
+    assert cube.query('2024-01-01', '2024-01-01', by=('day',))['count'].tolist() == [3]
+
+    cube.update(slice_events(), '20240101001500')
+    assert cube.query('2024-01-01', '2024-01-01', by=('day',))['count'].tolist() == [6]
+
+
+def test_ring_reuses_slots(tmp_path):
+    cube = EventCube(str(tmp_path), ['FR'], days=2)
+    cube.update(raw_slice([{'sqldate': 20240101}]))
+    cube.update(raw_slice([{'sqldate': 20240103}, {'sqldate': 20240103}]))
+
+    assert cube.query('2024-01-01', '2024-01-03', by=('day',))['count'].tolist() == [2]
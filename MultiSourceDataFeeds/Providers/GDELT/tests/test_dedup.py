@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from extractor import Extractor
+from extractor.dedup import DedupIndex
+from standin import Properties, StandInConnection
+
+
+def articles(urls, ids):
+    return pd.DataFrame({'sourceurl': urls, 'globaleventid': ids})
+
+
+def test_seen_add_expire_and_persist(tmp_path):
+    path = str(tmp_path / 'dedup.npz')
+    index = DedupIndex(path, max_age=24)
+
+    index.add('20240101000000', articles(['a', 'b'], [1, 2]))
+    index.add('20240102000000', pd.DataFrame({'sourceurl': ['c', 'c-mirror'], 'globaleventid': [3, None]}, dtype=object))
+
+    seen = index.seen(articles(['a', 'x', 'y', 'c-mirror'], [9, 9, 3, 9]))
+    assert seen.tolist() == [True, False, True, True]
+
+    index.expire(now=datetime(2024, 1, 2, 12))
+    index.save()
+
+    reloaded = DedupIndex(path)
+    assert list(reloaded.slices) == ['20240102000000']
+    assert reloaded.seen(articles(['a', 'c'], [1, 0])).tolist() == [False, True]
+
+
+class FakeLayer(object):
+
+    def __init__(self, published=None, fail_batches=(), reject=()):
+        self.properties = Properties(objectIdField='objectid')
+        self.published = published
+        self.fail_batches = fail_batches
+        self.reject = reject
+        self.batches = 0
+        self.updates = []
+        self.url = 'https://standin/FeatureServer/0'
+        self._con = StandInConnection(self)
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+        self.batches += 1
+        if self.batches in self.fail_batches:
+            raise Exception('Request Timed Out')
+        if updates:
+            self.updates += updates
+            return {'updateResults': [{'success': True} for _ in updates]}
+        return {'addResults': [{'success': f['attributes']['sourceurl'] not in self.reject} for f in adds]}
+
+    def query(self, where=None, out_fields=None, return_geometry=False):
+        class Result(object):
+            sdf = self.published[out_fields.split(',')]
+        return Result()
+
+
+def slice_df(urls):
+    return pd.DataFrame({
+        'sourceurl': urls,
+        'globaleventid': range(len(urls)),
+        'actiongeo_long': 1.0,
+        'actiongeo_lat': 2.0,
+    })
+
+
+def test_only_added_rows_are_recorded(monkeypatch):
+    e = Extractor()
+    lyr = FakeLayer(fail_batches=[2], reject=['b'])
+
+    applied = e.process_edits(lyr, slice_df(['a', 'b', 'c', 'd', 'e']), 'add', batch_size=2)
+
+    # Batch 2 (c, d) Raised & b Was Rejected
+    assert applied.tolist() == [True, False, False, False, True]
+
+
+def test_cluster_members_are_recorded(tmp_path):
+    e = Extractor()
+    e.dedup = DedupIndex(str(tmp_path / 'dedup.npz'))
+    e.syndicated = pd.DataFrame({'sourceurl': ['a', 'a', 'b'], 'syndicated_url': ['a', 'a2', 'b']})
+
+    e.dedup.add('20240101000000', e.published_keys(slice_df(['a'])))
+
+    assert e.dedup.seen(slice_df(['a2', 'b'])).tolist() == [True, False]
+    assert e.dedup.seen(pd.DataFrame({'globaleventid': [0, 1]})).tolist() == [True, False]
+
+
+def test_update_mode_merges_published_aggregates(tmp_path):
+    e = Extractor()
+    e.dedup = DedupIndex(str(tmp_path / 'dedup.npz'), mode='update')
+    e.duplicates = pd.DataFrame({
+        'sourceurl': ['a'],
+        'goldsteinscale': [2.0],
+        'goldsteinscale_max': [5.0],
+        'goldsteinscale_min': [1.0],
+        'avgtone': [np.nan],
+        'actor1code': ['USA; FRA'],
+        'extracted_date': ['new'],
+        'actiongeo_long': 1.0,
+        'actiongeo_lat': 2.0,
+    })
+    lyr = FakeLayer(published=pd.DataFrame({
+        'objectid': [7],
+        'sourceurl': ['a'],
+        'goldsteinscale': [4.0],
+        'goldsteinscale_max': [3.0],
+        'goldsteinscale_min': [-2.0],
+        'avgtone': [-1.5],
+        'actor1code': ['GBR; USA'],
+    }))
+
+    e.route_duplicates(lyr)
+
+    attributes = lyr.updates[0]['attributes']
+    assert attributes['objectid'] == 7
+    assert attributes['goldsteinscale'] == 3.0
+    assert attributes['goldsteinscale_max'] == 5.0
+    assert attributes['goldsteinscale_min'] == -2.0
+    assert attributes['avgtone'] == -1.5
+    assert attributes['actor1code'] == 'FRA; GBR; USA'
+    assert attributes['extracted_date'] == 'new'
@@ -0,0 +1,95 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from extractor import featureset
+from extractor.featureset import apply_edits, encode_column, encode_features, to_edit_json
+from standin import StandInConnection
+
+
+class FakeLayer(object):
+
+    def __init__(self):
+        self.url = 'https://standin/FeatureServer/0'
+        self._con = StandInConnection(self)
+        self.calls = []
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=True):
+        self.calls.append({'adds': adds, 'updates': updates, 'deletes': deletes, 'rollback': rollback_on_failure})
+        return {'addResults': [{'success': True} for _ in adds or []]}
+
+
+def frame():
+    return pd.DataFrame({
+        'name': ['a', None, 'a', 'quote "q"'],
+        'count': [1, 2, 3, 4],
+        'score': [1.5, np.nan, np.inf, -2.0],
+        'flag': [True, False, True, False],
+        'date': pd.to_datetime(['2024-01-01 00:00:00', None, '2024-01-01 00:00:01', '2024-01-02 00:00:00']).tz_localize('UTC'),
+        'lon': [10.0, 20.0, np.nan, 40.0],
+        'lat': [1.0, 2.0, 3.0, 4.0],
+    })
+
+
+def test_encode_column_matches_json():
+    assert list(encode_column(pd.Series(['a', None, 'a']))) == ['"a"', 'null', '"a"']
+    assert list(encode_column(pd.Series([1.5, np.nan, np.inf]))) == ['1.5', 'null', 'null']
+    assert list(encode_column(pd.Series([True, False]))) == ['true', 'false']
+    assert list(encode_column(pd.Series(pd.to_datetime(['1970-01-01 00:00:01', None])))) == ['1000', 'null']
+
+
+def test_encode_features_are_valid_esri_json():
+    features = [json.loads(f) for f in encode_features(frame(), 'lon', 'lat', geometry_field=None)]
+
+    assert features[0]['attributes'] == {
+        'name': 'a', 'count': 1, 'score': 1.5, 'flag': True, 'date': 1704067200000, 'lon': 10.0, 'lat': 1.0
+    }
+    assert features[1]['attributes']['name'] is None and features[1]['attributes']['date'] is None
+    assert features[3]['attributes']['name'] == 'quote "q"'
+    assert features[0]['geometry'] == {'x': 10.0, 'y': 1.0, 'spatialReference': {'wkid': 4326}}
+    assert features[2]['geometry']['x'] is None
+
+
+def test_to_edit_json_respects_count_and_size():
+    df = pd.DataFrame({'text': ['x' * 100] * 10})
+
+    by_count = list(to_edit_json(df, batch_size=4, geometry_field=None))
+    assert [len(json.loads(b)) for b in by_count] == [4, 4, 2]
+
+    by_size = list(to_edit_json(df, batch_size=100, max_bytes=400, geometry_field=None))
+    assert all(len(b.encode('utf-8')) <= 400 for b in by_size)
+    assert sum(len(json.loads(b)) for b in by_size) == 10
+
+
+def test_apply_edits_posts_the_encoded_json():
+    lyr = FakeLayer()
+    adds = next(to_edit_json(frame(), 'lon', 'lat', geometry_field=None))
+
+    res = apply_edits(lyr, adds=adds, rollback_on_failure=True)
+
+    assert len(res['addResults']) == 4
+    assert res['updateResults'] == [] and res['deleteResults'] == []
+
+    # The Batch is Posted as Encoded, Not Decoded & Encoded Again
+    path, params = lyr._con.posts[0]
+    assert path == 'https://standin/FeatureServer/0/applyEdits'
+    assert params['adds'] is adds and 'updates' not in params
+    assert lyr.calls[0]['rollback'] is True
+
+
+def test_vendored_copies_are_identical():
+    providers = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(featureset.__file__))))
+
+    copies = [
+        os.path.join(providers, 'GDELT', 'extractor', 'featureset.py'),
+        os.path.join(providers, 'Factal', 'factal', 'featureset.py'),
+    ]
+
+    sources = set()
+    for path in copies:
+        with open(path, 'rb') as f:
+            sources.add(f.read())
+
+    assert len(sources) == 1
@@ -0,0 +1,40 @@
+from configparser import ConfigParser
+
+import pandas as pd
+
+from extractor.filters import AttributeFilter
+
+
+def events():
+    return pd.DataFrame({
+        'eventrootcode': ['14', '18', '01', '19'],
+        'quadclass': ['3', '4', '1', '4'],
+        'numarticles': [1, 5, 10, 2],
+        'nummentions': [3, 10, 20, 4],
+        'actor1countrycode': ['USA', 'FRA', 'USA', ''],
+        'actor2countrycode': ['', 'USA', '', 'GBR'],
+    })
+
+
+def test_conditions_are_combined_with_and():
+    attr_filter = AttributeFilter(root_codes=[14, '18', 19], min_numarticles=2, actor_countries=['usa'])
+
+    assert attr_filter.filter(events()).index.tolist() == [1]
+
+
+def test_from_config():
+    config = ConfigParser()
+    config.read_string('[Filters]\nquad_classes = 3, 4\nmin_nummentions = 4\nroot_codes =\n')
+
+    attr_filter = AttributeFilter.from_config(config)
+
+    assert attr_filter.root_codes == []
+    assert attr_filter.mask(events()).tolist() == [False, True, False, True]
+
+
+def test_from_config_without_conditions():
+    config = ConfigParser()
+    config.read_string('[Filters]\nroot_codes =\n')
+
+    assert AttributeFilter.from_config(config) is None
+    assert AttributeFilter.from_config(ConfigParser()) is None
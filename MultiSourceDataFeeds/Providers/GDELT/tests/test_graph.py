@@ -0,0 +1,117 @@
+from extractor import Extractor
+from extractor.graph import InteractionGraph
+from events import raw_slice
+from standin import Properties, StandInConnection
+
+
+def dyads():
+    return raw_slice([
+        {'actor1countrycode': 'USA', 'actor2countrycode': 'FRA', 'avgtone': -2.0,
+         'actor1geo_long': -77.0, 'actor1geo_lat': 38.9, 'actor2geo_long': 2.35, 'actor2geo_lat': 48.85},
+        {'actor1countrycode': 'USA', 'actor2countrycode': 'FRA', 'avgtone': 4.0},
+        {'actor1countrycode': 'FRA', 'actor2countrycode': 'FRA'},
+    ])
+
+
+def test_top_edges_and_persistence(tmp_path):
+    graph = InteractionGraph(str(tmp_path), ['USA', 'FRA'])
+    graph.update(dyads(), '20240101000000')
+
+    graph = InteractionGraph(str(tmp_path), ['USA', 'FRA'])
+    edges = graph.top_edges(labels={'USA': 'United States'})
+
+    assert len(edges) == 1
+    edge = edges.iloc[0]
+    assert (edge['actor1countrycode'], edge['actor2countrycode'], edge['events'], edge['avgtone']) == ('United States', 'FRA', 2, 1.0)
+    assert (edge['x1'], edge['y2']) == (-77.0, 48.85)
+
+
+def test_slice_is_only_added_once(tmp_path):
+    graph = InteractionGraph(str(tmp_path), ['USA', 'FRA'])
+    graph.update(dyads(), '20240101000000')
+    graph.update(dyads(), '20240101000000')
+
+    graph = InteractionGraph(str(tmp_path), ['USA', 'FRA'])
+    graph.update(dyads(), '20240101000000')
+    assert graph.top_edges()['events'].tolist() == [2]
+
+    graph.update(dyads(), '20240101001500')
+    assert graph.top_edges()['events'].tolist() == [4]
+
+
+class GraphLayer(object):
+
+    def __init__(self, oids, fail=False):
+        self.properties = Properties(objectIdField='objectid')
+        self.oids = list(oids)
+        self.fail = fail
+        self.next_oid = 100
+        self.url = 'https://standin/FeatureServer/0'
+        self._con = StandInConnection(self)
+
+    def query(self, where=None, return_ids_only=False):
+        return {'objectIds': list(self.oids)}
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+        if deletes:
+            deleted = [int(i) for i in deletes.split(',')]
+            self.oids = [i for i in self.oids if i not in deleted]
+            return {'deleteResults': [{'objectId': i, 'success': True} for i in deleted]}
+        results = []
+        for _ in adds:
+            self.next_oid += 1
+            self.oids.append(self.next_oid)
+            results.append({'objectId': self.next_oid, 'success': True})
+        if self.fail:
+            results[-1]['success'] = False
+            self.oids.pop()
+        return {'addResults': results}
+
+
+class Item(object):
+
+    def __init__(self, lyr):
+        self.layers = [lyr]
+
+
+class Content(object):
+
+    def __init__(self, lyr):
+        self.lyr = lyr
+
+    def get(self, item_id):
+        return Item(self.lyr)
+
+
+class GIS(object):
+
+    def __init__(self, lyr):
+        self.content = Content(lyr)
+
+
+def extractor_with_graph(tmp_path, lyr):
+    e = Extractor()
+    e.gis = GIS(lyr)
+    e.graph = InteractionGraph(str(tmp_path), ['USA', 'FRA', 'GBR'])
+    e.graph.update(raw_slice([
+        {'actor1countrycode': 'USA', 'actor2countrycode': 'FRA',
+         'actor1geo_long': -77.0, 'actor1geo_lat': 38.9, 'actor2geo_long': 2.35, 'actor2geo_lat': 48.85},
+        {'actor1countrycode': 'GBR', 'actor2countrycode': 'FRA', 'actor1geo_long': -0.1, 'actor1geo_lat': 51.5},
+    ]), '20240101000000')
+    return e
+
+
+def test_publish_graph_adds_before_deleting(tmp_path):
+    lyr = GraphLayer([1, 2, 3])
+
+    extractor_with_graph(tmp_path, lyr).publish_graph('graph')
+
+    assert lyr.oids == [101, 102]
+
+
+def test_publish_graph_keeps_previous_edges_on_failure(tmp_path):
+    lyr = GraphLayer([1, 2, 3], fail=True)
+
+    extractor_with_graph(tmp_path, lyr).publish_graph('graph')
+
+    assert lyr.oids == [1, 2, 3]
@@ -0,0 +1,102 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from extractor import Extractor
+from extractor.mentions import MentionsIndex
+from extractor.schema import mentions_header
+from standin import Properties, StandInConnection
+
+
+def published():
+    return pd.DataFrame({
+        'globaleventid': ['1', '2', '3'],
+        'sourceurl': ['a', 'a', 'b'],
+        'nummentions': [2, 4, 1],
+        'numsources': [1, 1, 1],
+    })
+
+
+def mentions_zip(path, rows):
+    df = pd.DataFrame([dict({c: '' for c in mentions_header}, **row) for row in rows], columns=mentions_header)
+    with zipfile.ZipFile(path, 'w') as z:
+        z.writestr('mentions.CSV', df.to_csv(sep='\t', header=False, index=False))
+    return str(path)
+
+
+def mention(event_id, source, later=True):
+    return {'globaleventid': event_id, 'eventtimedate': 20240101000000,
+            'mentiontimedate': 20240101001500 if later else 20240101000000, 'mentionsourcename': source}
+
+
+def test_update_counts_later_mentions_per_url(tmp_path):
+    index = MentionsIndex(str(tmp_path / 'mentions.pkl'))
+    index.add(published(), '20240101000000')
+
+    path = mentions_zip(tmp_path / 'm.zip', [mention('1', 'x'), mention('1', 'y'), mention('1', 'x', later=False), mention('9', 'x')])
+    changed = index.update(path, '20240101001500')
+
+    assert changed.to_dict('records') == [{'sourceurl': 'a', 'nummentions': 4.0, 'numsources': 2.0}]
+    assert not len(index.update(path, '20240101001500'))
+
+
+class Response(object):
+
+    def __init__(self, path):
+        self.raw = open(path, 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.raw.close()
+
+
+class Layer(object):
+
+    properties = Properties(objectIdField='objectid')
+
+    def __init__(self):
+        self.updates = []
+        self.url = 'https://standin/FeatureServer/0'
+        self._con = StandInConnection(self)
+
+    def query(self, where=None, out_fields=None, return_geometry=False):
+        class Result(object):
+            sdf = pd.DataFrame({'objectid': [10], 'sourceurl': ['a']})
+        return Result()
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+        self.updates += updates
+        return {'updateResults': [{'success': True} for _ in updates]}
+
+
+def test_refresh_uses_the_slice_of_the_mentions_export(tmp_path, monkeypatch):
+    source = mentions_zip(tmp_path / 'source.zip', [mention('1', 'x')])
+    downloads = []
+
+    def get(url, stream=True):
+        downloads.append(url)
+        return Response(source)
+
+    urls = iter(['http://data.gdeltproject.org/gdeltv2/20240101001500.mentions.CSV.zip'] * 2 +
+                ['http://data.gdeltproject.org/gdeltv2/20240101003000.mentions.CSV.zip'])
+
+    e = Extractor()
+    e.mentions = MentionsIndex(str(tmp_path / 'mentions.pkl'))
+    e.mentions.add(published(), pd.Timestamp.utcnow().strftime('%Y%m%d%H%M%S'))
+    monkeypatch.setattr(e, 'fetch_last_v2_url', lambda kind='export': next(urls))
+    monkeypatch.setattr('extractor.extractor.requests.get', get)
+
+    lyr = Layer()
+    for _ in range(3):
+        e.refresh_mentions(lyr, str(tmp_path))
+
+    # The Second Run Saw the Same Mentions Export & Neither Downloaded nor Counted it Again
+    assert len(downloads) == 2
+    assert e.mentions.last_slice == '20240101003000'
+    assert [u['attributes'] for u in lyr.updates] == [
+        {'objectid': 10, 'nummentions': 3.5, 'numsources': 1.5},
+        {'objectid': 10, 'nummentions': 4.0, 'numsources': 2.0},
+    ]
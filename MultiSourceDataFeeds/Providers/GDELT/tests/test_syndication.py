@@ -0,0 +1,82 @@
+import pandas as pd
+
+from extractor import Extractor
+from extractor.syndication import canonicalize_url, cluster_articles, simhash
+from events import raw_slice
+
+
+def test_canonicalize_url_collapses_variants():
+    canonical = 'https://news.example/world/story?id=7'
+
+    assert canonicalize_url('http://www.news.example/world/story/amp?id=7&utm_source=x') == canonical
+    assert canonicalize_url('https://m.news.example/world/story/?fbclid=abc&id=7') == canonical
+    assert canonicalize_url('not a url') == 'not a url'
+
+
+def test_simhash_of_near_duplicates_is_close():
+    text = 'Heavy rain floods the river valley and thousands leave their homes on Sunday'
+
+    a, b = simhash(text), simhash(text + ' morning')
+    c = simhash('Central bank raises interest rates for the third time this year')
+
+    assert bin(a ^ b).count('1') < bin(a ^ c).count('1')
+    assert simhash('') is None
+
+
+def test_cluster_articles_keeps_best_covered_story_and_members():
+    story = 'Heavy rain floods the river valley and thousands leave their homes'
+    df = pd.DataFrame({
+        'sourceurl': ['a', 'b', 'c'],
+        'title': [story, story, 'Central bank raises interest rates'],
+        'summary': [story, story + ' today', 'Rates rise again'],
+        'numarticles': [1, 5, 2],
+    })
+
+    clustered, members = cluster_articles(df)
+
+    assert sorted(clustered['sourceurl']) == ['b', 'c']
+    assert clustered.set_index('sourceurl')['syndication_count'].to_dict() == {'b': 2, 'c': 1}
+    assert sorted(map(tuple, members.values.tolist())) == [('b', 'a'), ('b', 'b'), ('c', 'c')]
+
+
+def test_process_df_keeps_the_real_sourceurl():
+    e = Extractor()
+    e.articles = False
+    e.syndication = True
+
+    df = raw_slice([
+        {'sourceurl': 'http://www.news.example/story/amp?utm_source=feed', 'avgtone': 1.0},
+        {'sourceurl': 'https://m.news.example/story', 'avgtone': 3.0},
+        {'sourceurl': 'https://other.example/story', 'avgtone': 5.0},
+    ])
+
+    out = e.process_df(df, '20240101000000')
+
+    assert sorted(out['sourceurl']) == ['http://www.news.example/story/amp?utm_source=feed', 'https://other.example/story']
+    assert out.set_index('sourceurl').loc['http://www.news.example/story/amp?utm_source=feed', 'avgtone'] == 2.0
+    assert 'canonical_url' not in out.columns
+
+
+def test_short_and_boilerplate_texts_are_not_clustered():
+    df = pd.DataFrame({
+        'sourceurl': ['a', 'b', 'c', 'd'],
+        'title': ['Error', 'Error', 'Subscribe to continue reading', 'Subscribe to continue reading'],
+        'summary': ['', '', 'This article is for subscribers only. Already a subscriber? Sign in',
+                    'This article is for subscribers only. Already a subscriber? Sign in'],
+    })
+
+    clustered, members = cluster_articles(df)
+
+    assert clustered['syndication_count'].tolist() == [1, 1, 1, 1]
+
+
+def test_crowded_buckets_are_capped(capsys):
+    story = 'Heavy rain floods the river valley and thousands leave their homes'
+    texts = [story] * 30 + [f'{story} alpha update {i}' for i in range(20)]
+    df = pd.DataFrame({'sourceurl': [str(i) for i in range(len(texts))], 'title': texts, 'summary': ''})
+
+    # Identical Copies Still Form One Story When the Distinct Variants Exceed the Cap
+    clustered, members = cluster_articles(df, max_bucket=5)
+    assert 'Skipped' in capsys.readouterr().out
+    assert clustered.set_index('sourceurl')['syndication_count']['0'] == 30
+    assert clustered['syndication_count'].sum() == len(df)
@@ -0,0 +1,206 @@
+from configparser import ConfigParser
+from datetime import datetime, timedelta
+import re
+
+import pandas as pd
+import pytest
+
+from extractor import Extractor
+from extractor import targets
+from extractor.targets import FanOut, targets_from_config
+from standin import StandInConnection
+
+
+def slice_name(hours_ago=0):
+    return (datetime.utcnow() - timedelta(hours=hours_ago)).strftime('%Y%m%d%H%M%S')
+
+
+class FlakyTarget(object):
+
+    def __init__(self, name, failures=0):
+        self.name = name
+        self.failures = failures
+        self.published = []
+
+    def publish(self, df, csv_name):
+        if self.failures:
+            self.failures -= 1
+            raise Exception('Portal Unavailable')
+        self.published.append(csv_name)
+        return f'Added {len(df)} rows'
+
+
+def test_targets_log_in_on_first_publish(monkeypatch):
+    def login(url, username, password):
+        raise Exception('Invalid Username or Password')
+
+    monkeypatch.setattr(targets, 'GIS', login)
+
+    config = ConfigParser()
+    config.read_string('[Target:Partner]\nitem_id = abc\nagol_url = https://partner\nusername = u\npassword = p\n')
+
+    partner = targets_from_config(config)[0]
+    fan_out = FanOut([partner, FlakyTarget('Archive')])
+    fan_out.submit(pd.DataFrame({'a': [1]}), slice_name())
+    results = fan_out.wait()
+
+    assert results['Partner'][0] is False and 'Invalid Username' in results['Partner'][1]
+    assert results['Archive'][0] is True
+
+
+def test_failed_slices_are_sent_again_in_order():
+    flaky, steady = FlakyTarget('Flaky', failures=1), FlakyTarget('Steady')
+    fan_out = FanOut([flaky, steady])
+    first, second = slice_name(1), slice_name()
+
+    fan_out.submit(pd.DataFrame({'a': [1]}), first)
+    fan_out.wait()
+    fan_out.submit(pd.DataFrame({'a': [1, 2]}), second)
+    fan_out.wait()
+
+    assert flaky.published == [first, second]
+    assert steady.published == [first, second]
+    assert fan_out.failed == {'Flaky': {}, 'Steady': {}}
+
+
+def test_old_failed_slices_expire():
+    flaky = FlakyTarget('Flaky', failures=1)
+    fan_out = FanOut([flaky], max_age=24)
+
+    fan_out.submit(pd.DataFrame({'a': [1]}), slice_name(30))
+    fan_out.wait()
+    fan_out.submit()
+
+    assert fan_out.futures == {}
+    assert flaky.published == []
+
+
+class Query(object):
+
+    def __init__(self, sdf):
+        self.sdf = sdf
+
+
+class Layer(object):
+
+    def __init__(self, dates):
+        self.dates = dates
+
+    def query(self, out_fields=None, return_geometry=False):
+        return Query(pd.DataFrame({'extracted_date': self.dates}))
+
+
+def test_run_v2_catches_targets_up_when_the_slice_is_already_extracted(monkeypatch):
+    current = '20240101001500'
+
+    class Item(object):
+        layers = [Layer(pd.to_datetime([current]))]
+
+    e = Extractor()
+    monkeypatch.setattr(Extractor, 'get_gis_item', staticmethod(lambda item_id, gis: Item()))
+    monkeypatch.setattr(e, 'collect_v2_csv', lambda temp_dir: ('export.csv', current))
+    monkeypatch.setattr(e, 'get_v2_sdf', lambda *args: pytest.fail('Slice Processed Again'))
+
+    flaky = FlakyTarget('Flaky')
+    e.fan_out = FanOut([flaky])
+    e.fan_out.failed = {'Flaky': {slice_name(): pd.DataFrame({'a': [1]})}}
+
+    e.run_v2('hfl')
+
+    assert len(flaky.published) == 1
+    assert e.fan_out.failed == {'Flaky': {}}
+
+
+class TargetLayer(object):
+    """
+    Hosted layer of a target; rows are attribute dictionaries with extracted_date in epoch milliseconds.
+    """
+
+    def __init__(self, rows=(), reject=()):
+        self.url = 'https://partner/FeatureServer/0'
+        self._con = StandInConnection(self)
+        self.rows = list(rows)
+        self.reject = reject
+
+    @staticmethod
+    def matches(row, where):
+        op, value = re.match(r"extracted_date ([=<]) timestamp '([^']+)'", where).groups()
+        epoch = int(pd.Timestamp(value, tz='UTC').value // 10 ** 6)
+        return row['extracted_date'] == epoch if op == '=' else row['extracted_date'] < epoch
+
+    def query(self, where=None, return_count_only=False):
+        return len([r for r in self.rows if self.matches(r, where)])
+
+    def delete_features(self, where=None):
+        self.rows = [r for r in self.rows if not self.matches(r, where)]
+
+    def edit_features(self, adds=None, updates=None, deletes=None, rollback_on_failure=False):
+        accepted = [f['attributes']['globaleventid'] not in self.reject for f in adds]
+        self.rows += [f['attributes'] for f, ok in zip(adds, accepted) if ok]
+        return {'addResults': [{'success': ok} for ok in accepted]}
+
+
+def partner(lyr, monkeypatch):
+    class Content(object):
+        def get(self, item_id):
+            return type('Item', (object,), {'layers': [lyr]})()
+
+    target = targets.FeatureLayerTarget('Partner', 'abc', 'https://partner', 'u', 'p', batch_size=2)
+    monkeypatch.setattr(target, 'connect', lambda: type('GIS', (object,), {'content': Content()})())
+    return target
+
+
+def target_slice(csv_name, count=3):
+    return pd.DataFrame({
+        'globaleventid': list(range(count)),
+        'actiongeo_long': [10.0] * count,
+        'actiongeo_lat': [20.0] * count,
+        'extracted_date': pd.to_datetime(csv_name).tz_localize('UTC'),
+    })
+
+
+def test_target_replaces_a_partial_slice(monkeypatch):
+    csv_name = slice_name()
+    df = target_slice(csv_name)
+    epoch = int(df['extracted_date'].iloc[0].value // 10 ** 6)
+    lyr = TargetLayer(rows=[{'globaleventid': 0, 'extracted_date': epoch}])
+
+    assert partner(lyr, monkeypatch).publish(df, csv_name) == 'Added 3 rows of 3'
+    assert sorted(r['globaleventid'] for r in lyr.rows) == [0, 1, 2]
+
+    # A Complete Slice is Skipped
+    assert partner(lyr, monkeypatch).publish(df, csv_name).startswith('Data Already Extracted')
+
+
+def test_target_fails_the_slice_when_rows_are_rejected(monkeypatch):
+    csv_name = slice_name()
+    lyr = TargetLayer(reject={2})
+    fan_out = FanOut([partner(lyr, monkeypatch)])
+
+    fan_out.submit(target_slice(csv_name), csv_name)
+    assert fan_out.wait()['Partner'][0] is False
+    assert list(fan_out.failed['Partner']) == [csv_name]
+
+    # The Next Run Replaces the Two Rows Added Earlier & Adds the Whole Slice
+    lyr.reject = ()
+    fan_out.submit()
+    assert fan_out.wait()['Partner'][0] is True
+    assert sorted(r['globaleventid'] for r in lyr.rows) == [0, 1, 2]
+
+
+def test_failed_slices_survive_a_restart(tmp_path):
+    first = slice_name()
+    fan_out = FanOut([FlakyTarget('Flaky', failures=1)], path=str(tmp_path))
+    fan_out.submit(pd.DataFrame({'a': [1, 2]}), first)
+    fan_out.wait()
+
+    assert (tmp_path / 'Flaky' / f'{first}.pkl').exists()
+
+    # A New Process (i.e. the Next Scheduled Run) Catches Up on the Saved Slice
+    flaky = FlakyTarget('Flaky')
+    fan_out = FanOut([flaky], path=str(tmp_path))
+    fan_out.submit()
+    fan_out.wait()
+
+    assert flaky.published == [first]
+    assert not (tmp_path / 'Flaky' / f'{first}.pkl').exists()
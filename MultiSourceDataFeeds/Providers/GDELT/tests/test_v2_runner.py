@@ -0,0 +1,65 @@
+from configparser import ConfigParser
+from contextlib import contextmanager
+
+import pytest
+
+import v2_runner
+
+
+class Stop(Exception):
+    pass
+
+
+class FlakyExtractor(object):
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.runs = 0
+        self.graph = None
+        self.anomaly = None
+        self.enrichment_pool = None
+
+    def run_v2(self, hfl_id):
+        self.runs += 1
+        if self.runs <= self.failures:
+            raise RuntimeError('Service Unavailable')
+
+
+def test_daemon_survives_failed_runs(monkeypatch, capsys):
+
+    @contextmanager
+    def pool():
+        yield 'pool'
+
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            raise Stop()
+
+    monkeypatch.setattr(v2_runner, 'EnrichmentPool', pool)
+    monkeypatch.setattr(v2_runner.time, 'sleep', sleep)
+
+    e = FlakyExtractor(failures=2)
+    with pytest.raises(Stop):
+        v2_runner.run_daemon(e, 'hfl', ConfigParser(), interval=15)
+
+    # Both Failures Were Logged & the Third Run Still Happened
+    assert e.runs == 3
+    assert e.enrichment_pool == 'pool'
+    assert capsys.readouterr().out.count('Run Failed') == 2
+    assert all(0 < s <= 15 * 60 for s in sleeps)
+
+
+def test_state_dir_defaults_to_data_folder(tmp_path):
+
+    path = v2_runner.state_dir(ConfigParser(), str(tmp_path))
+
+    assert path == str(tmp_path / 'data')
+    assert (tmp_path / 'data').is_dir()
+
+    config = ConfigParser()
+    config.read_string(f'[State]\ndir = {tmp_path / "state"}\n')
+    assert v2_runner.state_dir(config, str(tmp_path)) == str(tmp_path / 'state')
+    assert (tmp_path / 'state').is_dir()
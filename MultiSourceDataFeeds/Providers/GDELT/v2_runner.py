@@ -1,7 +1,20 @@
 from extractor import Extractor
+from extractor.enrichment import EnrichmentPool
+from extractor.append import AppendSink
+from extractor.aoi import AreaOfInterest
+from extractor.filters import AttributeFilter
+from extractor.dedup import DedupIndex
+from extractor.cube import EventCube
+from extractor.graph import InteractionGraph
+from extractor.anomaly import AnomalyDetector
+from extractor.mentions import MentionsIndex
+from extractor.targets import FanOut, targets_from_config
 
 from configparser import ConfigParser
+import argparse
+import traceback
 import json
+import time
 import os
 
 
@@ -24,8 +37,61 @@ def update_wm_time_widget(v2_hfl, v2_map, gis):
     map_itm.update(data=json.dumps(map_data))
 
 
+def state_dir(config, this_dir):
+    """
+    Return the folder holding the runner's state files (indexes, missed slices), creating it if needed.
+    """
+
+    path = config.get('State', 'dir', fallback='') or os.path.join(this_dir, 'data')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def run_once(e, v2_hfl, config):
+    """
+    Run the V2 solution & publish the optional products built from the slice.
+    """
+
+    e.run_v2(v2_hfl)
+
+    # Replace the Interaction Graph Layer With the Current Top Edges
+    if e.graph is not None and config.get('Graph', 'graph_hfl', fallback=''):
+        e.publish_graph(config.get('Graph', 'graph_hfl'), config.getint('Graph', 'top_n', fallback=100))
+
+    # Add Tone/Goldstein Anomalies of the Slice to the Anomaly Table
+    if e.anomaly is not None and config.get('Anomaly', 'anomaly_hft', fallback=''):
+        e.publish_anomalies(config.get('Anomaly', 'anomaly_hft'))
+
+
+def run_daemon(e, v2_hfl, config, interval):
+    """
+    Keep the extractor and a warm enrichment pool alive between runs & trigger run_v2 every interval minutes.
+    """
+
+    with EnrichmentPool() as pool:
+
+        e.enrichment_pool = pool
+
+        while True:
+            start = time.time()
+
+            # A Failed Run Must Not Stop the Daemon; Log it & Try Again Next Interval
+            try:
+                run_once(e, v2_hfl, config)
+            except Exception:
+                print(f'Run Failed: {traceback.format_exc()}')
+
+            # Sleep Whatever is Left of the Interval
+            time.sleep(max(interval * 60 - (time.time() - start), 0))
+
+
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description='Extract GDELT 2.0 events & push them to a hosted feature layer.')
+    parser.add_argument('--daemon', action='store_true', help='Keep running & pull the latest export every interval')
+    parser.add_argument('--interval', type=int, default=15, help='Minutes between runs in daemon mode')
+    args = parser.parse_args()
+
     # Get Current Directory
     this_dir = os.path.split(os.path.realpath(__file__))[0]
 
@@ -42,12 +108,75 @@ if __name__ == "__main__":
     v2_map   = config.get('AGOL', 'v2_map')
     v1_hft   = config.get('AGOL', 'v1_hft')
 
+    # Indexes & Other State Files Are Kept Out of the Script Folder
+    data_dir = state_dir(config, this_dir)
+
     e = Extractor()
 
     e.connect(agol_url, username, password)
 
+    # Only Keep Events Inside the Area of Interest (If Configured)
+    e.aoi = AreaOfInterest.from_config(config)
+    e.attribute_filter = AttributeFilter.from_config(config)
+
+    # Cluster Syndicated Stories (Requires a Layer Built With the Same Setting for the Added Fields)
+    e.syndication = config.getboolean('Syndication', 'enabled', fallback=False)
+
+    # Summarize Every Slice Into the Long-Horizon Event Cube
+    if config.get('Cube', 'path', fallback=''):
+        e.cube = EventCube(config.get('Cube', 'path'), list(e.country_fips.keys()), config.getint('Cube', 'days', fallback=400))
+
+    # Accumulate the Country Interaction Graph
+    if config.get('Graph', 'path', fallback=''):
+        e.graph = InteractionGraph(
+            config.get('Graph', 'path'),
+            list(e.country.keys()),
+            bucket_hours=config.getint('Graph', 'bucket_hours', fallback=24),
+            max_buckets=config.getint('Graph', 'max_buckets', fallback=30)
+        )
+
+    # Detect Sharp Tone/Goldstein Shifts per Country & Quad Class
+    if config.get('Anomaly', 'path', fallback=''):
+        e.anomaly = AnomalyDetector(
+            config.get('Anomaly', 'path'),
+            alpha=config.getfloat('Anomaly', 'alpha', fallback=0.05),
+            threshold=config.getfloat('Anomaly', 'threshold', fallback=3.0),
+            min_periods=config.getint('Anomaly', 'min_periods', fallback=48)
+        )
+
+    # Keep Articles Published in Earlier Slices From Being Added Again
+    if config.get('Dedup', 'mode', fallback=''):
+        e.dedup = DedupIndex(
+            config.get('Dedup', 'path', fallback='') or os.path.join(data_dir, 'dedup_index.npz'),
+            max_age=e.max_age,
+            mode=config.get('Dedup', 'mode')
+        )
+
+    # Refresh Mention Counts of Published Events From the Mentions Stream
+    if config.getboolean('Mentions', 'enabled', fallback=False):
+        e.mentions = MentionsIndex(
+            config.get('Mentions', 'path', fallback='') or os.path.join(data_dir, 'mentions_index.pkl'),
+            max_age=e.max_age
+        )
+
+    # Publish Every Processed Slice to the Additional [Target:<name>] Sections as Well
+    targets = targets_from_config(config, e.max_age)
+    if targets:
+        e.fan_out = FanOut(targets, max_age=e.max_age, path=os.path.join(data_dir, 'targets'))
+
+    # Bulk Load Large Slices with Append (Upsert) Instead of Edit Batches
+    if config.get('Append', 'threshold', fallback=''):
+        e.append_sink = AppendSink(
+            e.gis,
+            threshold=config.getint('Append', 'threshold'),
+            upsert_field='sourceurl' if e.flatten else 'globaleventid'
+        )
+
     # Update AGOL Features
-    e.run_v2(v2_hfl)
+    if args.daemon:
+        run_daemon(e, v2_hfl, config, args.interval)
+    else:
+        run_once(e, v2_hfl, config)
 
     # update_wm_time_widget(v2_hfl, v2_map, e.gis)
 